@@ -0,0 +1,127 @@
+"""
+Bitmap Index
+One packed bitset per field value over the rows of the animal snapshot
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+WORD_BITS = 64
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(words: np.ndarray) -> int:
+        return int(np.bitwise_count(words).sum())
+else:  # NumPy < 2.0
+    _BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(words: np.ndarray) -> int:
+        return int(_BYTE_COUNTS[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+def words_for(rows: int) -> int:
+    return (rows + WORD_BITS - 1) // WORD_BITS
+
+
+def pack(mask: np.ndarray, n_words: int) -> np.ndarray:
+    """Boolean row mask -> bitset of n_words 64-bit words (bit i = row i)"""
+    padded = np.zeros(n_words * WORD_BITS, dtype=bool)
+    padded[:mask.size] = mask
+    return np.packbits(padded, bitorder='little').view('<u8')
+
+
+def rows_of(bits: np.ndarray, limit: Optional[int] = None) -> np.ndarray:
+    """Row numbers of the set bits, ascending (the first `limit` of them)"""
+    words = np.flatnonzero(bits)
+    if limit is not None:
+        # Every non-zero word holds at least one row
+        words = words[:limit]
+    unpacked = np.unpackbits(bits[words].view(np.uint8), bitorder='little').reshape(-1, WORD_BITS)
+    word_index, bit = np.nonzero(unpacked)
+    return (words[word_index] * WORD_BITS + bit)[:limit]
+
+
+class BitmapIndex:
+    """Bitsets per (field, value code), one bit per row
+
+    Rows are 1 bit each, so a million animals take 122 KB per value and a
+    filter is a handful of word-wise AND/OR/NOT over ~16k words. Codes are
+    small integers (dictionary codes, age band numbers, 0/1 flags).
+    """
+
+    def __init__(self, fields: Iterable[str], n_words: int = 0):
+        self.n_words = n_words
+        self.alive = np.zeros(n_words, dtype='<u8')
+        self.bitmaps: Dict[str, List[np.ndarray]] = {field: [] for field in fields}
+
+    @classmethod
+    def build(cls, columns: Dict[str, np.ndarray], alive: np.ndarray, n_words: int) -> 'BitmapIndex':
+        """Index code columns (code -1 = no value) in bulk"""
+        index = cls(columns, n_words)
+        index.alive = pack(alive, n_words)
+        for field, codes in columns.items():
+            live_codes = codes[alive & (codes >= 0)]
+            n_values = int(live_codes.max()) + 1 if live_codes.size else 0
+            index.bitmaps[field] = [pack(alive & (codes == code), n_words) for code in range(n_values)]
+        return index
+
+    def grow(self, n_words: int):
+        def widened(bits):
+            new = np.zeros(n_words, dtype='<u8')
+            new[:bits.size] = bits
+            return new
+        self.alive = widened(self.alive)
+        for field, bitmaps in self.bitmaps.items():
+            self.bitmaps[field] = [widened(bits) for bits in bitmaps]
+        self.n_words = n_words
+
+    def _bitmap(self, field: str, code: int) -> np.ndarray:
+        bitmaps = self.bitmaps[field]
+        while len(bitmaps) <= code:
+            bitmaps.append(np.zeros(self.n_words, dtype='<u8'))
+        return bitmaps[code]
+
+    def set(self, row: int, field: str, code: int):
+        if code >= 0:
+            self._bitmap(field, code)[row >> 6] |= np.uint64(1 << (row & 63))
+
+    def clear(self, row: int, field: str, code: int):
+        if 0 <= code < len(self.bitmaps[field]):
+            self.bitmaps[field][code][row >> 6] &= ~np.uint64(1 << (row & 63))
+
+    def set_alive(self, row: int, alive: bool):
+        if alive:
+            self.alive[row >> 6] |= np.uint64(1 << (row & 63))
+        else:
+            self.alive[row >> 6] &= ~np.uint64(1 << (row & 63))
+
+    # Combination
+
+    def empty(self) -> np.ndarray:
+        return np.zeros(self.n_words, dtype='<u8')
+
+    def any_of(self, field: str, codes: Iterable[int]) -> np.ndarray:
+        """OR of the bitsets of several values of one field (unknown codes match nothing)"""
+        result = self.empty()
+        bitmaps = self.bitmaps[field]
+        for code in codes:
+            if code is not None and 0 <= code < len(bitmaps):
+                result |= bitmaps[code]
+        return result
+
+    def select(self, include: Dict[str, List[int]], exclude: Dict[str, List[int]] = None) -> np.ndarray:
+        """Rows having one of the listed codes for every included field (AND across
+        fields, OR within a field) and none of the excluded ones (AND NOT)"""
+        result = self.alive.copy()
+        for field, codes in include.items():
+            result &= self.any_of(field, codes)
+        for field, codes in (exclude or {}).items():
+            result &= ~self.any_of(field, codes)
+        return result
+
+    def counts(self, field: str, within: np.ndarray) -> List[int]:
+        """Popcount of each value's bitset intersected with `within`, by code"""
+        return [popcount(bits & within) for bits in self.bitmaps[field]]
+
+    def nbytes(self) -> int:
+        return self.alive.nbytes + sum(bits.nbytes for bitmaps in self.bitmaps.values() for bits in bitmaps)
@@ -0,0 +1,105 @@
+"""
+Animal Facets
+Filter counts per value and matching ids, from the bitmap index or MongoDB
+"""
+
+from typing import Dict, List, Optional
+
+from backend.animal_filters import AnimalFilter
+from backend.analytics.snapshot import (
+    get_animal_snapshot, FACET_FIELDS, CATEGORY_FIELDS, AGE_BAND_LABELS, AGE_BAND_EDGES
+)
+
+
+def age_band_expression(age: str = '$age') -> dict:
+    """Aggregation expression for the age band label of an age field (same bands as the snapshot)"""
+    return {'$switch': {
+        'branches': [{'case': {'$lte': [{'$ifNull': [age, 0]}, float(edge)]}, 'then': label}
+                     for edge, label in zip(AGE_BAND_EDGES, AGE_BAND_LABELS)],
+        'default': AGE_BAND_LABELS[-1],
+    }}
+
+
+# Same banding and flag as the snapshot, computed per document
+_FACET_PROJECTION = {
+    **{field: 1 for field in CATEGORY_FIELDS},
+    'age_band': age_band_expression(),
+    'has_volunteer': {'$cond': [{'$gt': [{'$size': {'$ifNull': ['$assigned_volunteers', []]}}, 0]},
+                                'true', 'false']},
+}
+
+
+def parse_exclusions(items: Optional[List[str]]) -> Dict[str, List[str]]:
+    """["status:Adopted", "species:Bird"] -> {'status': ['Adopted'], 'species': ['Bird']}
+
+    Raises:
+        ValueError: For entries without a colon or with an unknown field
+    """
+    exclude: Dict[str, List[str]] = {}
+    for item in items or []:
+        field, sep, value = item.partition(':')
+        if not sep or field not in FACET_FIELDS:
+            raise ValueError(f"Invalid exclude '{item}', expected field:value with field one of {', '.join(FACET_FIELDS)}")
+        exclude.setdefault(field, []).append(value)
+    return exclude
+
+
+def _mongo_match(filters: dict, exclude: dict) -> dict:
+    def values(v):
+        v = v if isinstance(v, (list, tuple, set)) else [v]
+        return [str(x).lower() if isinstance(x, bool) else x for x in v]
+    match = {field: {'$in': values(v)} for field, v in filters.items()}
+    for field, v in exclude.items():
+        match.setdefault(field, {})['$nin'] = values(v)
+    return match
+
+
+def facet_pipeline(filters: dict, exclude: dict, ids_limit: int = 0, base: Optional[dict] = None) -> list:
+    """One $facet aggregation: total, counts per value of every facet field, and ids
+
+    `base` (e.g. age and intake ranges) applies to every count, before the
+    facet fields are projected.
+    """
+    facets = {'total': [{'$match': _mongo_match(filters, exclude)}, {'$count': 'n'}]}
+    for field in FACET_FIELDS:
+        others = {f: v for f, v in filters.items() if f != field}
+        facets[field] = [
+            {'$match': _mongo_match(others, exclude)},
+            {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}},
+        ]
+    if ids_limit:
+        facets['ids'] = [{'$match': _mongo_match(filters, exclude)}, {'$limit': ids_limit}, {'$project': {'_id': 1}}]
+    stages = [{'$match': base}] if base else []
+    return stages + [{'$project': _FACET_PROJECTION}, {'$facet': facets}]
+
+
+def animal_facets(db, spec: AnimalFilter, facet_filters: Optional[dict] = None,
+                  exclude: Optional[dict] = None, ids_limit: int = 0) -> dict:
+    """Total, per-facet value counts and (optionally) matching ids for a filter
+
+    `spec` is the shared animal filter; `facet_filters` adds the facet-only
+    fields (age_band, has_volunteer) and `exclude` maps facet fields to
+    values to leave out. Answered from the snapshot's bitmaps when loaded
+    and the filter has no intake range, otherwise with one $facet aggregation.
+    """
+    filters = {**spec.values, **{f: v for f, v in (facet_filters or {}).items() if v is not None and v != []}}
+    exclude = exclude or {}
+
+    snapshot = get_animal_snapshot()
+    if snapshot is not None and spec.in_snapshot:
+        result = snapshot.facets(filters, exclude, spec.age_range)
+        if ids_limit:
+            result['ids'] = snapshot.ids(filters, exclude, limit=ids_limit, age_range=spec.age_range)
+        result['source'] = 'bitmap'
+        return result
+
+    row = next(db.animals.aggregate(facet_pipeline(filters, exclude, ids_limit, base=spec.range_query())))
+    result = {
+        'total': row['total'][0]['n'] if row['total'] else 0,
+        'facets': {field: {group['_id']: group['count'] for group in row[field] if group['_id'] is not None}
+                   for field in FACET_FIELDS},
+    }
+    if ids_limit:
+        result['ids'] = [str(doc['_id']) for doc in row['ids']]
+    result['source'] = 'mongodb'
+    return result
@@ -0,0 +1,239 @@
+"""
+Forecasting
+Monthly adoption, intake and medical visit counts per species, forecast with
+a moving average or additive Holt-Winters fitted in NumPy
+"""
+
+import itertools
+import time
+from datetime import datetime
+from typing import List, Literal, Optional
+
+import numpy as np
+
+from backend.analytics.timeseries import bucket_expression, bucket_labels, bucket_range, with_date_condition
+from backend.analytics.versions import VersionedCache
+
+# Metric -> (collection, date field, species read from the animal)
+METRICS = {
+    'adoptions': ('adoptions', 'adoption_date', True),
+    'intakes': ('animals', 'intake_date', False),
+    'medical': ('medical_records', 'visit_date', True),
+}
+Metric = Literal['adoptions', 'intakes', 'medical']
+Model = Literal['holt_winters', 'moving_average']
+
+SEASON_MONTHS = 12
+
+# Normal quantile of the 95% forecast interval
+INTERVAL = 0.95
+INTERVAL_Z = 1.96
+
+# Smoothing parameters tried for every series (level, trend, season)
+ALPHAS = (0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETAS = (0.0, 0.05, 0.1, 0.2)
+GAMMAS = (0.05, 0.1, 0.2, 0.4)
+
+
+def monthly_counts_pipeline(date_field: str, animal_filter: dict, species_from_animal: bool) -> list:
+    """Documents counted per (species, month of date_field)
+
+    For adoptions and medical records the animal is joined once per
+    document for its species, and the animal filter is applied to the
+    joined fields rather than resolved to an id list first.
+    """
+    if not species_from_animal:
+        return [
+            {'$match': with_date_condition(animal_filter, date_field, {'$type': 'date'})},
+            {'$group': {
+                '_id': {'species': {'$ifNull': ['$species', 'Unknown']}, 'month': bucket_expression(date_field, 'month')},
+                'count': {'$sum': 1}
+            }}
+        ]
+    fields = {'species', *animal_filter}
+    stages = [
+        {'$match': {date_field: {'$type': 'date'}}},
+        {'$lookup': {
+            'from': 'animals',
+            'localField': 'animal_id',
+            'foreignField': '_id',
+            'pipeline': [{'$project': {'_id': 0, **{field: 1 for field in fields}}}],
+            'as': 'animal'
+        }},
+        {'$set': {'animal': {'$first': '$animal'}}}
+    ]
+    if animal_filter:
+        stages.append({'$match': {f'animal.{field}': value for field, value in animal_filter.items()}})
+    stages.append({'$group': {
+        '_id': {'species': {'$ifNull': ['$animal.species', 'Unknown']}, 'month': bucket_expression(date_field, 'month')},
+        'count': {'$sum': 1}
+    }})
+    return stages
+
+
+def monthly_matrix(rows: List[dict], last_month: np.datetime64):
+    """(species names, month starts, species x months counts) up to last_month, 0 where missing"""
+    species = np.array([row['_id']['species'] for row in rows], dtype=object)
+    months = np.array([row['_id']['month'] for row in rows], dtype='datetime64[M]')
+    counts = np.array([row['count'] for row in rows], dtype=np.float64)
+    complete = months <= last_month
+    species, months, counts = species[complete], months[complete], counts[complete]
+    if not months.size:
+        return [], np.array([], dtype='datetime64[D]'), np.zeros((0, 0))
+
+    names, codes = np.unique(species, return_inverse=True)
+    first = months.min()
+    buckets = bucket_range(first.astype('datetime64[D]'), last_month.astype('datetime64[D]'), 'month')
+    matrix = np.zeros((names.size, buckets.size))
+    np.add.at(matrix, (codes, (months - first).astype(np.int64)), counts)
+    return names.tolist(), buckets, matrix
+
+
+class MovingAverage:
+    """Flat forecast: mean of the last `window` months of each series"""
+
+    def __init__(self, y: np.ndarray, window: int = 3):
+        window = max(1, min(window, y.shape[1]))
+        self.mean = y[:, -window:].mean(axis=1)
+        # In-sample one-step errors against the mean of the previous `window` months
+        sums = np.concatenate((np.zeros((y.shape[0], 1)), np.cumsum(y, axis=1)), axis=1)
+        errors = y[:, window:] - (sums[:, window:-1] - sums[:, :-window - 1]) / window
+        self.sigma = np.sqrt((errors ** 2).mean(axis=1)) if errors.shape[1] else y.std(axis=1)
+        self.parameters = {'window': window}
+
+    def predict(self, horizon: int) -> np.ndarray:
+        return np.repeat(self.mean[:, None], horizon, axis=1)
+
+
+class HoltWinters:
+    """Additive Holt-Winters (level, trend, 12-month season), fitted per series
+
+    The smoothing parameters come from a grid search: every combination is
+    run at once as an extra array axis, so fitting is one pass over the
+    months with (combinations x series) vector updates, and each series
+    keeps the combination with the smallest one-step squared error. With
+    less than two years of data the season is left out (Holt's linear trend).
+    """
+
+    def __init__(self, y: np.ndarray):
+        n_series, n_months = y.shape
+        self.seasonal = n_months >= 2 * SEASON_MONTHS
+        period = SEASON_MONTHS if self.seasonal else 1
+        grid = np.array(list(itertools.product(ALPHAS, BETAS, GAMMAS if self.seasonal else (0.0,))))
+        alpha, beta, gamma = (grid[:, i, None] for i in range(3))
+
+        if self.seasonal:
+            level = y[:, :period].mean(axis=1)
+            trend = (y[:, period:2 * period].mean(axis=1) - level) / period
+            season = y[:, :period] - level[:, None]
+        else:
+            level = y[:, 0]
+            trend = y[:, 1] - y[:, 0] if n_months > 1 else np.zeros(n_series)
+            season = np.zeros((n_series, 1))
+
+        # combinations x series; the level starts one step back so month 0 is predicted from level0
+        level = np.broadcast_to(level - trend, (len(grid), n_series)).copy()
+        trend = np.broadcast_to(trend, (len(grid), n_series)).copy()
+        season = np.broadcast_to(season, (len(grid), n_series, period)).copy()
+        sse = np.zeros((len(grid), n_series))
+        for t in range(n_months):
+            phase = t % period
+            actual, seasonal = y[:, t], season[:, :, phase]
+            sse += (actual - (level + trend + seasonal)) ** 2
+            new_level = alpha * (actual - seasonal) + (1 - alpha) * (level + trend)
+            trend = beta * (new_level - level) + (1 - beta) * trend
+            season[:, :, phase] = gamma * (actual - new_level) + (1 - gamma) * seasonal
+            level = new_level
+
+        best, series = sse.argmin(axis=0), np.arange(n_series)
+        self.level, self.trend = level[best, series], trend[best, series]
+        self.season = season[best, series]
+        self.sigma = np.sqrt(sse[best, series] / n_months)
+        self.n_months, self.period = n_months, period
+        self.alpha, self.beta, self.gamma = alpha[best, 0], beta[best, 0], gamma[best, 0]
+
+    @property
+    def parameters(self) -> dict:
+        """Smoothing parameters of the total (the last series)"""
+        return {'alpha': float(self.alpha[-1]), 'beta': float(self.beta[-1]),
+                'gamma': float(self.gamma[-1]), 'seasonal': self.seasonal}
+
+    def predict(self, horizon: int) -> np.ndarray:
+        steps = np.arange(1, horizon + 1)
+        phases = (self.n_months - 1 + steps) % self.period
+        return self.level[:, None] + steps * self.trend[:, None] + self.season[:, phases]
+
+
+class FittedForecast:
+    """Monthly history per species plus the total, and the model fitted on it"""
+
+    def __init__(self, species: List[str], months: np.ndarray, history: np.ndarray,
+                 model: str, window: int = 3):
+        self.species = species
+        self.months = months
+        # One row per species, then the total (fitted on its own, not summed)
+        self.history = np.vstack((history, history.sum(axis=0, keepdims=True))) if species else history
+        self.fitted = None
+        if species:
+            self.fitted = HoltWinters(self.history) if model == 'holt_winters' else MovingAverage(self.history, window)
+        self.fitted_at = time.time()
+
+    def response(self, horizon: int, history_months: int) -> dict:
+        """Chart payload: actual counts (data) then forecast, lower and upper
+
+        The forecast lines start at the last actual month so they join the
+        history; earlier positions are null. The interval is the forecast
+        +/- 1.96 sigma sqrt(h), sigma being the RMS one-step in-sample error.
+        """
+        if self.fitted is None:
+            return {'labels': [], 'data': [], 'forecast': [], 'lower': [], 'upper': [], 'series': {}}
+
+        shown = self.history[:, -history_months:]
+        future = bucket_range(self.months[-1], self.months[-1].astype('datetime64[M]') + horizon, 'month')[1:]
+        mean = np.clip(self.fitted.predict(horizon), 0, None)
+        spread = INTERVAL_Z * self.fitted.sigma[:, None] * np.sqrt(np.arange(1, horizon + 1))
+        lower, upper = np.clip(mean - spread, 0, None), mean + spread
+
+        def joined(row: int, values: np.ndarray) -> list:
+            return ([None] * (shown.shape[1] - 1) + [float(shown[row, -1])] +
+                    np.round(values[row], 1).tolist())
+
+        def series(row: int) -> dict:
+            return {
+                'data': shown[row].astype(np.int64).tolist() + [None] * horizon,
+                'forecast': joined(row, mean),
+                'lower': joined(row, lower),
+                'upper': joined(row, upper),
+            }
+
+        total = series(-1)
+        return {
+            'labels': bucket_labels(np.concatenate((self.months[-history_months:], future)), 'month'),
+            **total,
+            'series': {name: series(row) for row, name in enumerate(self.species)},
+        }
+
+
+_cache = VersionedCache()
+
+
+def get_forecast(db, metric: str, model: str, animal_filter: dict, window: int = 3,
+                 now: Optional[datetime] = None) -> FittedForecast:
+    """Fitted forecast for a metric and animal filter, cached until the data it reads changes
+
+    Only complete months are used; the key includes the last one so a new
+    month also refits.
+    """
+    collection, date_field, species_from_animal = METRICS[metric]
+    last_month = np.datetime64(now or datetime.now(), 'M') - 1
+    key = (metric, model, window, str(last_month), repr(sorted(animal_filter.items())))
+
+    def fit():
+        rows = list(db[collection].aggregate(
+            monthly_counts_pipeline(date_field, animal_filter, species_from_animal), allowDiskUse=True
+        ))
+        species, months, history = monthly_matrix(rows, last_month)
+        return FittedForecast(species, months, history, model, window)
+
+    collections = (collection, 'animals') if collection != 'animals' else ('animals',)
+    return _cache.get(key, collections, fit)
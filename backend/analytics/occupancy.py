@@ -0,0 +1,140 @@
+"""
+Occupancy
+Daily shelter headcount per species, swept from intake and adoption dates
+"""
+
+import time
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+from backend.analytics.timeseries import bucket_labels, bucket_range, earliest_bucket, with_date_condition
+from backend.analytics.versions import VersionedCache
+
+
+def stay_events_pipeline(animal_filter: dict) -> list:
+    """Aggregation over animals returning arrivals and departures per (species, day)
+
+    A stay runs from intake_date to the animal's first adoption (never
+    before intake); animals without an adoption are still in the shelter.
+    Grouping per day keeps the result small (species x days), however many
+    animals there are.
+    """
+    def per_day(date_expression):
+        return {'$group': {
+            '_id': {'species': '$species', 'day': {'$dateTrunc': {'date': date_expression, 'unit': 'day'}}},
+            'count': {'$sum': 1}
+        }}
+
+    return [
+        {'$match': with_date_condition(animal_filter, 'intake_date', {'$type': 'date'})},
+        {'$lookup': {
+            'from': 'adoptions',
+            'localField': '_id',
+            'foreignField': 'animal_id',
+            'pipeline': [{'$match': {'adoption_date': {'$type': 'date'}}}, {'$project': {'_id': 0, 'adoption_date': 1}}],
+            'as': 'adoptions'
+        }},
+        {'$project': {
+            '_id': 0,
+            'species': {'$ifNull': ['$species', 'Unknown']},
+            'intake_date': 1,
+            'left_date': {'$min': '$adoptions.adoption_date'}
+        }},
+        {'$facet': {
+            'arrivals': [per_day('$intake_date')],
+            'departures': [
+                {'$match': {'left_date': {'$ne': None}}},
+                per_day({'$max': ['$left_date', '$intake_date']})
+            ]
+        }}
+    ]
+
+
+def sweep(days: np.ndarray, deltas: np.ndarray, sample_days: np.ndarray) -> np.ndarray:
+    """Running total of the events at the end of each sample day
+
+    Events are sorted by day once and summed cumulatively; the total at a
+    sample day is read at its searchsorted position. O(e log e + s) for e
+    events and s sample days, independent of the length of each stay.
+    """
+    order = np.argsort(days, kind='stable')
+    running = np.concatenate(([0], np.cumsum(deltas[order])))
+    return running[np.searchsorted(days[order], sample_days, side='right')]
+
+
+class OccupancySeries:
+    """Headcount per species for every day from first_day to last_day"""
+
+    def __init__(self, first_day: np.datetime64, species: List[str], counts: np.ndarray):
+        self.first_day = first_day
+        self.species = species
+        self.counts = counts  # species x days
+        self.computed_at = time.time()
+
+    @property
+    def last_day(self) -> np.datetime64:
+        return self.first_day + self.counts.shape[1] - 1
+
+    @classmethod
+    def from_events(cls, species: np.ndarray, days: np.ndarray, deltas: np.ndarray,
+                    last_day: np.datetime64) -> 'OccupancySeries':
+        """Sweep (species, day, +n/-n) events into a daily headcount per species"""
+        if days.size == 0:
+            return cls(last_day, [], np.zeros((0, 1), dtype=np.int64))
+        names, codes = np.unique(species, return_inverse=True)
+        first_day = days.min()
+        sample_days = np.arange(first_day, max(last_day, first_day) + 1)
+        counts = np.zeros((names.size, sample_days.size), dtype=np.int64)
+        for code in range(names.size):
+            mine = codes == code
+            counts[code] = sweep(days[mine], deltas[mine], sample_days)
+        return cls(first_day, names.tolist(), counts)
+
+    def window(self, start_dt: Optional[datetime] = None, end_dt: Optional[datetime] = None,
+               granularity: str = 'day') -> dict:
+        """Chart payload: headcount at the end of each bucket between the dates, per species and in total
+
+        Without start_dt the window starts at the first day with data, but no
+        more than MAX_BUCKETS buckets before the end, so a long history
+        doesn't make the default chart fail.
+        """
+        last = min(np.datetime64(end_dt, 'D') if end_dt else self.last_day, self.last_day)
+        if start_dt:
+            first = np.datetime64(start_dt, 'D')
+        else:
+            first = max(self.first_day, earliest_bucket(last, granularity))
+        if not self.species or last < first:
+            return {'labels': [], 'data': [], 'series': {}}
+
+        buckets = bucket_range(first, last, granularity)
+        sample_days = np.minimum(np.append(buckets[1:] - 1, last), last)
+        index = (sample_days - self.first_day).astype(np.int64)
+        before = index < 0
+        values = self.counts[:, np.clip(index, 0, None)]
+        values[:, before] = 0
+        return {
+            'labels': bucket_labels(buckets, granularity),
+            'data': values.sum(axis=0).tolist(),
+            'series': {name: row.tolist() for name, row in zip(self.species, values)}
+        }
+
+
+def compute_occupancy(db, animal_filter: dict) -> OccupancySeries:
+    result = next(db.animals.aggregate(stay_events_pipeline(animal_filter), allowDiskUse=True))
+    events = ([(row['_id'], row['count']) for row in result['arrivals']] +
+              [(row['_id'], -row['count']) for row in result['departures']])
+    species = np.array([key['species'] for key, _ in events], dtype=object)
+    days = np.array([key['day'] for key, _ in events], dtype='datetime64[D]')
+    deltas = np.array([delta for _, delta in events], dtype=np.int64)
+    return OccupancySeries.from_events(species, days, deltas, np.datetime64(datetime.now(), 'D'))
+
+
+_cache = VersionedCache()
+
+
+def get_occupancy(db, animal_filter: dict) -> OccupancySeries:
+    """Occupancy for a filter, cached until animals or adoptions change"""
+    return _cache.get(repr(sorted(animal_filter.items())), ('animals', 'adoptions'),
+                      lambda: compute_occupancy(db, animal_filter))
@@ -0,0 +1,478 @@
+"""
+Animal Snapshot
+Columnar in-memory copy of the animal catalog for filter counts and chart distributions
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from bson import ObjectId
+
+from backend.analytics.bitmaps import BitmapIndex, pack, popcount, rows_of, words_for
+from backend.analytics.versions import mark_changed
+
+# Fields the chart filters (build_animal_filter) can combine
+CATEGORY_FIELDS = ('species', 'breed', 'status', 'gender')
+
+# Same bands as the age distribution chart: age <= 1, <= 3, <= 5, <= 10, older
+AGE_BAND_LABELS = ['0-1 years', '1-3 years', '3-5 years', '5-10 years', '10+ years']
+AGE_BAND_EDGES = np.array([1, 3, 5, 10], dtype=np.float32)
+
+HAS_VOLUNTEER_LABELS = ['false', 'true']
+
+# Fields with a bitmap per value, for faceted filtering
+FACET_FIELDS = CATEGORY_FIELDS + ('age_band', 'has_volunteer')
+
+PROJECTION = {field: 1 for field in CATEGORY_FIELDS + ('age', 'assigned_volunteers')}
+
+# Inclusive (min, max) age, None for an open end
+AgeRange = Tuple[Optional[float], Optional[float]]
+
+
+def age_bands(ages: np.ndarray) -> np.ndarray:
+    """Band index (0-4) for each age"""
+    return np.searchsorted(AGE_BAND_EDGES, ages, side='left')
+
+
+class CategoryColumn:
+    """Dictionary-encoded strings: a small integer code per row, -1 when missing
+
+    Codes start as int16 and widen to int32 if a field ever has more than
+    32767 distinct values.
+    """
+
+    def __init__(self, capacity: int):
+        self.values: List[str] = []
+        self._codes_by_value: Dict[str, int] = {}
+        self.codes = np.full(capacity, -1, dtype=np.int16)
+
+    def encode(self, value) -> int:
+        if value is None:
+            return -1
+        code = self._codes_by_value.get(value)
+        if code is None:
+            code = len(self.values)
+            if code > np.iinfo(self.codes.dtype).max:
+                self.codes = self.codes.astype(np.int32)
+            self.values.append(value)
+            self._codes_by_value[value] = code
+        return code
+
+    def code_of(self, value) -> Optional[int]:
+        return self._codes_by_value.get(value)
+
+    def grow(self, capacity: int):
+        codes = np.full(capacity, -1, dtype=self.codes.dtype)
+        codes[:self.codes.size] = self.codes
+        self.codes = codes
+
+
+class _Columns:
+    """The arrays of one snapshot generation; rows are never moved, deletes clear `alive`"""
+
+    def __init__(self, capacity: int):
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype='S12')
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.age = np.zeros(capacity, dtype=np.float32)
+        self.has_volunteer = np.zeros(capacity, dtype=bool)
+        self.categories = {field: CategoryColumn(capacity) for field in CATEGORY_FIELDS}
+        # Built in bulk by seal(), then maintained row by row
+        self.bitmaps: Optional[BitmapIndex] = None
+        # Rows present at build time are found by binary search on the sorted ids,
+        # rows appended since then (sealed is set) through a small dict
+        self.sealed = False
+        self.sorted_ids = np.zeros(0, dtype='S12')
+        self.sorted_rows = np.zeros(0, dtype=np.int32)
+        self.appended: Dict[bytes, int] = {}
+
+    def seal(self):
+        """Index the ids loaded so far for binary search and build the bitmaps"""
+        order = np.argsort(self.ids[:self.size], kind='stable').astype(np.int32)
+        self.sorted_ids = self.ids[:self.size][order]
+        self.sorted_rows = order
+        self.appended = {}
+        self.sealed = True
+        columns = {field: column.codes[:self.size] for field, column in self.categories.items()}
+        columns['age_band'] = age_bands(self.age[:self.size])
+        columns['has_volunteer'] = self.has_volunteer[:self.size].astype(np.int8)
+        self.bitmaps = BitmapIndex.build(columns, self.alive[:self.size], words_for(self.ids.size))
+
+    def facet_codes(self, row: int) -> Dict[str, int]:
+        codes = {field: int(column.codes[row]) for field, column in self.categories.items()}
+        codes['age_band'] = int(age_bands(self.age[row]))
+        codes['has_volunteer'] = int(self.has_volunteer[row])
+        return codes
+
+    def find_row(self, key: bytes) -> Optional[int]:
+        i = int(np.searchsorted(self.sorted_ids, key))
+        if i < self.sorted_ids.size and self.sorted_ids[i] == key:
+            row = int(self.sorted_rows[i])
+        else:
+            row = self.appended.get(key)
+        return row if row is not None and self.alive[row] else None
+
+    def append(self, key: bytes) -> int:
+        if self.size == self.ids.size:
+            self._grow(max(1024, self.size * 2))
+        row = self.size
+        self.size += 1
+        self.ids[row] = key
+        self.alive[row] = True
+        if self.sealed:
+            self.appended[key] = row
+        if self.bitmaps is not None:
+            self.bitmaps.set_alive(row, True)
+            for field, code in self.facet_codes(row).items():
+                self.bitmaps.set(row, field, code)
+        return row
+
+    def remove(self, row: int):
+        self.alive[row] = False
+        if self.bitmaps is not None:
+            self.bitmaps.set_alive(row, False)
+            for field, code in self.facet_codes(row).items():
+                self.bitmaps.clear(row, field, code)
+
+    def _grow(self, capacity: int):
+        for name in ('ids', 'alive', 'age', 'has_volunteer'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:old.size] = old
+            setattr(self, name, new)
+        for column in self.categories.values():
+            column.grow(capacity)
+        if self.bitmaps is not None:
+            self.bitmaps.grow(words_for(capacity))
+
+    def write(self, row: int, fields: dict):
+        before = self.facet_codes(row) if self.bitmaps is not None else None
+        for field in CATEGORY_FIELDS:
+            if field in fields:
+                self.categories[field].codes[row] = self.categories[field].encode(fields[field])
+        if 'age' in fields:
+            try:
+                self.age[row] = float(fields['age'] or 0)
+            except (TypeError, ValueError):
+                self.age[row] = 0
+        if 'assigned_volunteers' in fields:
+            self.has_volunteer[row] = bool(fields['assigned_volunteers'])
+        if before is not None:
+            for field, code in self.facet_codes(row).items():
+                if code != before[field]:
+                    self.bitmaps.clear(row, field, before[field])
+                    self.bitmaps.set(row, field, code)
+
+    def nbytes(self) -> int:
+        arrays = [self.ids, self.alive, self.age, self.has_volunteer, self.sorted_ids, self.sorted_rows]
+        arrays += [column.codes for column in self.categories.values()]
+        return sum(a.nbytes for a in arrays)
+
+
+def _first_appearance(codes: np.ndarray, counts: np.ndarray) -> List[int]:
+    """Distinct codes in the order they first occur, reading only as far as needed"""
+    remaining = int(np.count_nonzero(counts))
+    order, seen = [], set()
+    start, step = 0, 4096
+    while remaining and start < codes.size:
+        chunk = codes[start:start + step]
+        distinct, first = np.unique(chunk, return_index=True)
+        for code in distinct[np.argsort(first)].tolist():
+            if code not in seen:
+                seen.add(code)
+                order.append(code)
+                remaining -= 1
+        start += step
+        step *= 4
+    return order
+
+
+def _key(animal_id) -> bytes:
+    # NumPy 'S' arrays drop trailing NUL bytes, so compare ids without them
+    return (animal_id if isinstance(animal_id, ObjectId) else ObjectId(animal_id)).binary.rstrip(b'\0')
+
+
+class AnimalSnapshot:
+    """Species, breed, status, gender and age of every animal as NumPy columns
+
+    Loaded with one scan of the animals collection and kept current by the
+    animal write paths (record_* below). A filter is one vectorized
+    comparison per field, a distribution one bincount, so chart queries take
+    microseconds to a few milliseconds even at a million animals. Filter
+    counts, facets and id lists use a bitmap per value over the same rows
+    (also age band and has-volunteer). Writes made while a reload is running
+    are replayed onto the new generation.
+    """
+
+    def __init__(self):
+        self._data = _Columns(0)
+        self._lock = threading.RLock()
+        self._journal: Optional[list] = None
+        self.ready = False
+        self.loaded_at: Optional[float] = None
+        self.load_ms: Optional[float] = None
+
+    # Loading
+
+    def load(self, db):
+        """Rebuild from the animals collection, then swap the new columns in"""
+        started = time.perf_counter()
+        with self._lock:
+            self._journal = []
+        try:
+            data = _Columns(db.animals.estimated_document_count() + 1024)
+            for doc in db.animals.find({}, PROJECTION).batch_size(10000):
+                data.write(data.append(_key(doc['_id'])), doc)
+            data.seal()
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+        with self._lock:
+            journal, self._journal = self._journal, None
+            self._data = data
+            for method, args in journal:
+                method(*args)
+            self.ready = True
+            self.loaded_at = time.time()
+            self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    # Incremental updates
+
+    def _apply_saved(self, doc: dict):
+        data = self._data
+        key = _key(doc['_id'])
+        row = data.find_row(key)
+        if row is None:
+            row = data.append(key)
+        data.write(row, doc)
+
+    def _apply_fields(self, animal_id, fields: dict):
+        row = self._data.find_row(_key(animal_id))
+        if row is not None:
+            self._data.write(row, fields)
+
+    def _apply_deleted(self, animal_id):
+        row = self._data.find_row(_key(animal_id))
+        if row is not None:
+            self._data.remove(row)
+
+    def _record(self, method, *args):
+        with self._lock:
+            method(*args)
+            if self._journal is not None:
+                self._journal.append((method, args))
+
+    def saved(self, doc: dict):
+        """A created or fully re-read animal document"""
+        self._record(self._apply_saved, doc)
+
+    def fields_changed(self, animal_id, fields: dict):
+        """A partial update, e.g. {'status': 'Adopted'}"""
+        self._record(self._apply_fields, animal_id, fields)
+
+    def deleted(self, animal_id):
+        self._record(self._apply_deleted, animal_id)
+
+    # Queries
+
+    def mask(self, filter_dict: dict, age_range: AgeRange = (None, None)) -> np.ndarray:
+        """Rows matching a value or any of a list of values per category field,
+        and an inclusive age range (a missing age counts as 0, as in the age chart)"""
+        data = self._data
+        mask = data.alive[:data.size].copy()
+        for field, value in filter_dict.items():
+            column = data.categories[field]
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            codes = [code for code in (column.code_of(v) for v in values) if code is not None]
+            if len(codes) == 1:
+                mask &= column.codes[:data.size] == codes[0]
+            else:
+                mask &= np.isin(column.codes[:data.size], codes)
+        low, high = age_range
+        if low is not None:
+            mask &= data.age[:data.size] >= low
+        if high is not None:
+            mask &= data.age[:data.size] <= high
+        return mask
+
+    def _codes(self, field: str, values) -> List[Optional[int]]:
+        """Filter values -> value codes of a facet field (None for unknown values)"""
+        if field in self._data.categories:
+            return [self._data.categories[field].code_of(v) for v in values]
+        if field == 'age_band':
+            return [AGE_BAND_LABELS.index(v) if v in AGE_BAND_LABELS else None for v in values]
+        # has_volunteer: True/False from query params, 'true'/'false' from exclude=has_volunteer:false
+        labels = [str(v).lower() for v in values]
+        return [HAS_VOLUNTEER_LABELS.index(v) if v in HAS_VOLUNTEER_LABELS else None for v in labels]
+
+    def _labels(self, field: str) -> List[str]:
+        if field in self._data.categories:
+            return self._data.categories[field].values
+        return AGE_BAND_LABELS if field == 'age_band' else HAS_VOLUNTEER_LABELS
+
+    def select(self, filters: dict, exclude: Optional[dict] = None,
+               age_range: AgeRange = (None, None)) -> np.ndarray:
+        """Bitset of the animals matching `filters` and none of `exclude`
+
+        Both map a facet field to a value or a list of values (OR within a
+        field, AND across fields); None and empty lists are ignored. An age
+        range is applied as one more bitset built from the age column.
+        """
+        def codes(spec):
+            spec = {f: v if isinstance(v, (list, tuple, set)) else [v]
+                    for f, v in (spec or {}).items() if v is not None and v != []}
+            return {f: self._codes(f, v) for f, v in spec.items()}
+        bits = self._data.bitmaps.select(codes(filters), codes(exclude))
+        if age_range != (None, None):
+            bits &= pack(self.mask({}, age_range), bits.size)
+        return bits
+
+    def count(self, filters: dict, exclude: Optional[dict] = None, age_range: AgeRange = (None, None)) -> int:
+        with self._lock:
+            return popcount(self.select(filters, exclude, age_range))
+
+    def facets(self, filters: dict, exclude: Optional[dict] = None, age_range: AgeRange = (None, None)) -> dict:
+        """Matching total plus, for every facet field, counts per value under the
+        other fields' filters (what each option would match if picked)"""
+        with self._lock:
+            bitmaps = self._data.bitmaps
+            result = {'total': popcount(self.select(filters, exclude, age_range)), 'facets': {}}
+            for field in FACET_FIELDS:
+                others = {f: v for f, v in filters.items() if f != field}
+                within = self.select(others, exclude, age_range)
+                labels = self._labels(field)
+                result['facets'][field] = {labels[code]: n for code, n in
+                                           enumerate(bitmaps.counts(field, within)) if n}
+            return result
+
+    def ids(self, filters: dict, exclude: Optional[dict] = None, limit: Optional[int] = None,
+            age_range: AgeRange = (None, None)) -> List[str]:
+        """Ids of the matching animals in load order"""
+        with self._lock:
+            rows = rows_of(self.select(filters, exclude, age_range), limit)
+            return [str(ObjectId(key.ljust(12, b'\0'))) for key in self._data.ids[rows].tolist()]
+
+    def distribution(self, field: str, filter_dict: dict, age_range: AgeRange = (None, None)) -> Dict[str, int]:
+        """Animals per value of `field` among those matching the filter (missing values skipped)
+
+        Values come in the order they first appear among the matching rows,
+        like counting a collection scan.
+        """
+        with self._lock:
+            column = self._data.categories[field]
+            codes = column.codes[:self._data.size][self.mask(filter_dict, age_range)]
+            codes = codes[codes >= 0]
+            counts = np.bincount(codes, minlength=len(column.values))
+            return {column.values[code]: int(counts[code]) for code in _first_appearance(codes, counts)}
+
+    def age_distribution(self, filter_dict: dict, age_range: AgeRange = (None, None)) -> Dict[str, int]:
+        with self._lock:
+            ages = self._data.age[:self._data.size][self.mask(filter_dict, age_range)]
+            counts = np.bincount(age_bands(ages), minlength=len(AGE_BAND_LABELS))
+            return dict(zip(AGE_BAND_LABELS, (int(n) for n in counts)))
+
+    def values(self, field: str) -> List[str]:
+        """Distinct values of a field among current animals"""
+        return list(self.distribution(field, {}))
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = self._data
+            live = int(np.count_nonzero(data.alive[:data.size]))
+            bitmap_bytes = data.bitmaps.nbytes() if data.bitmaps is not None else 0
+            nbytes = data.nbytes() + bitmap_bytes
+            return {
+                'ready': self.ready,
+                'animals': live,
+                'rows': data.size,
+                'capacity': int(data.ids.size),
+                'memory_bytes': nbytes,
+                'bitmap_bytes': bitmap_bytes,
+                # Allocated bytes scaled to a million rows (columns, id index and bitmaps)
+                'memory_mb_per_million': round(nbytes / max(data.ids.size, 1) * 1_000_000 / 2**20, 1),
+                'distinct_values': {field: len(c.values) for field, c in data.categories.items()},
+                'loaded_at': self.loaded_at,
+                'load_ms': self.load_ms,
+            }
+
+
+_snapshot: Optional[AnimalSnapshot] = None
+_refresher: Optional[threading.Thread] = None
+_refresher_stop = threading.Event()
+
+
+def get_animal_snapshot() -> Optional[AnimalSnapshot]:
+    """The loaded snapshot, or None when it is disabled or still loading (query MongoDB instead)"""
+    return _snapshot if _snapshot is not None and _snapshot.ready else None
+
+
+def _run_refresher(get_db, interval: float):
+    # First load as soon as the database is reachable, then a full reload every
+    # `interval` seconds to pick up writes made outside this process
+    delay = 0.0
+    while not _refresher_stop.wait(delay):
+        try:
+            _snapshot.load(get_db())
+            stats = _snapshot.stats()
+            print(f"📊 Animal snapshot: {stats['animals']} animals in {stats['memory_bytes'] / 2**20:.1f} MB "
+                  f"({stats['memory_mb_per_million']} MB per million) loaded in {stats['load_ms']} ms")
+            delay = interval if interval > 0 else None
+        except Exception as e:
+            print(f"⚠️  Animal snapshot load failed: {e}")
+            delay = 5.0
+        if delay is None:
+            break
+
+
+def start_animal_snapshot(get_db, refresh_interval: float):
+    """Enable the snapshot and load it in the background (once per process)"""
+    global _snapshot, _refresher
+    if _snapshot is None:
+        _snapshot = AnimalSnapshot()
+    if _refresher is not None and _refresher.is_alive():
+        return
+    _refresher_stop.clear()
+    _refresher = threading.Thread(target=_run_refresher, args=(get_db, refresh_interval),
+                                  name='animal-snapshot', daemon=True)
+    _refresher.start()
+
+
+def stop_animal_snapshot():
+    global _refresher
+    _refresher_stop.set()
+    _refresher = None
+
+
+def snapshot_stats() -> Optional[dict]:
+    return _snapshot.stats() if _snapshot is not None else None
+
+
+# Write hooks, called by every route that changes an animal (the snapshot part is a
+# no-op while disabled; the change counter always invalidates cached analytics)
+
+def record_animal_saved(doc: dict):
+    mark_changed('animals')
+    if _snapshot is not None:
+        _snapshot.saved(doc)
+
+
+def record_animals_saved(docs: list):
+    mark_changed('animals')
+    if _snapshot is not None:
+        for doc in docs:
+            _snapshot.saved(doc)
+
+
+def record_animal_fields(animal_id, fields: dict):
+    mark_changed('animals')
+    if _snapshot is not None:
+        _snapshot.fields_changed(animal_id, fields)
+
+
+def record_animal_deleted(animal_id):
+    mark_changed('animals')
+    if _snapshot is not None:
+        _snapshot.deleted(animal_id)
@@ -0,0 +1,177 @@
+"""
+Time to Adoption
+Days from intake to adoption, stored on each adoption as days_to_adoption,
+and its histogram and percentiles per species, breed or age band
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+
+from backend.analytics.facets import age_band_expression
+from backend.analytics.snapshot import AGE_BAND_LABELS
+from backend.analytics.timeseries import date_range_filter
+from backend.references import animal_filter_stages
+
+# Histogram buckets: [0, 7), [7, 14), ... and 365 days or more
+STAY_BUCKET_EDGES = [0, 7, 14, 30, 60, 90, 180, 365]
+STAY_BUCKET_LABELS = ['0-6 days', '7-13 days', '14-29 days', '30-59 days', '60-89 days',
+                      '90-179 days', '180-364 days', '365+ days']
+
+GROUP_BY_FIELDS = ('species', 'breed', 'age_band')
+
+
+# Maintenance
+
+def days_between(intake_date, adoption_date) -> Optional[int]:
+    """Whole days from intake to adoption, None unless both are stored dates"""
+    if isinstance(intake_date, datetime) and isinstance(adoption_date, datetime):
+        return (adoption_date - intake_date).days
+    return None
+
+
+def days_to_adoption_for(db, animal_id, adoption_date) -> Optional[int]:
+    """days_to_adoption of an adoption of animal_id on adoption_date (reads the animal's intake_date)"""
+    animal = db.animals.find_one({'_id': animal_id}, {'intake_date': 1}) if animal_id else None
+    return days_between(animal.get('intake_date') if animal else None, adoption_date)
+
+
+def refresh_days_to_adoption(db, match: Optional[dict] = None):
+    """Recompute days_to_adoption in place for the adoptions matching `match` (all by default)
+
+    One aggregation joins each adoption to its animal and $merges the result
+    back into adoptions; used after an animal's intake_date changes and by
+    utils/backfill_days_to_adoption.py. Needs MongoDB 5.0+ ($dateDiff).
+    """
+    db.adoptions.aggregate([
+        {'$match': {**(match or {}), 'adoption_date': {'$type': 'date'}}},
+        {'$lookup': {
+            'from': 'animals',
+            'localField': 'animal_id',
+            'foreignField': '_id',
+            'pipeline': [{'$project': {'_id': 0, 'intake_date': 1}}],
+            'as': 'animal'
+        }},
+        {'$project': {'days_to_adoption': {'$let': {
+            'vars': {'intake': {'$first': '$animal.intake_date'}},
+            'in': {'$cond': [
+                {'$eq': [{'$type': '$$intake'}, 'date']},
+                {'$dateDiff': {'startDate': '$$intake', 'endDate': '$adoption_date', 'unit': 'day'}},
+                None
+            ]}
+        }}}},
+        {'$merge': {'into': 'adoptions', 'on': '_id', 'whenMatched': 'merge', 'whenNotMatched': 'discard'}}
+    ])
+
+
+# Charts
+
+def interval_match(animal_match: dict, start_dt: Optional[datetime] = None,
+                   end_dt: Optional[datetime] = None) -> dict:
+    """Adoptions with a usable days_to_adoption (negative values are bad intake dates), by adoption date"""
+    match = {**animal_match, 'days_to_adoption': {'$gte': 0}}
+    date_condition = date_range_filter(start_dt, end_dt)
+    if date_condition:
+        match['adoption_date'] = date_condition
+    return match
+
+
+def histogram(collection, match: dict, animal_filter: Optional[dict] = None) -> List[int]:
+    """Adoptions per STAY_BUCKET_LABELS bucket, counted by $bucket"""
+    pipeline = [
+        {'$match': match},
+        *animal_filter_stages(animal_filter or {}),
+        {'$bucket': {
+            'groupBy': '$days_to_adoption',
+            'boundaries': STAY_BUCKET_EDGES,
+            # Past the last boundary: the open-ended 365+ bucket
+            'default': STAY_BUCKET_EDGES[-1],
+            'output': {'count': {'$sum': 1}}
+        }}
+    ]
+    data = [0] * len(STAY_BUCKET_LABELS)
+    for row in collection.aggregate(pipeline):
+        data[STAY_BUCKET_EDGES.index(row['_id'])] = row['count']
+    return data
+
+
+def days_by_group_pipeline(match: dict, group_by: str, animal_filter: Optional[dict] = None) -> list:
+    """Adoptions counted per (group, days_to_adoption) - at most groups x distinct days rows
+
+    The animal filter is applied in the same $lookup that reads the group field.
+    """
+    if group_by == 'age_band':
+        project, key = {'age': 1}, age_band_expression('$animal.age')
+    else:
+        project, key = {group_by: 1}, {'$ifNull': [f'$animal.{group_by}', 'Unknown']}
+    return [
+        {'$match': match},
+        {'$lookup': {
+            'from': 'animals',
+            'localField': 'animal_id',
+            'foreignField': '_id',
+            'pipeline': ([{'$match': animal_filter}] if animal_filter else []) + [{'$project': {'_id': 0, **project}}],
+            'as': 'animal'
+        }},
+        # Adoptions of deleted or filtered out animals have nothing to group by
+        {'$unwind': '$animal'},
+        {'$group': {'_id': {'group': key, 'days': '$days_to_adoption'}, 'count': {'$sum': 1}}}
+    ]
+
+
+def weighted_quantiles(codes: np.ndarray, days: np.ndarray, counts: np.ndarray,
+                       n_groups: int, quantiles: np.ndarray) -> np.ndarray:
+    """Quantiles of each group's days, each value repeated `counts` times
+
+    Same result as np.quantile (linear interpolation) on the expanded
+    values, without expanding them: rows are sorted by (group, days) and
+    the ranks are looked up in the cumulative counts. Returns groups x quantiles.
+    """
+    order = np.lexsort((days, codes))
+    codes, days, counts = codes[order], days[order], counts[order]
+    ends = np.cumsum(counts)
+    totals = np.bincount(codes, weights=counts, minlength=n_groups).astype(np.int64)
+    starts = np.concatenate(([0], np.cumsum(totals)[:-1]))
+
+    position = quantiles[None, :] * (totals[:, None] - 1)
+    lower = np.floor(position).astype(np.int64)
+    fraction = position - lower
+    below = days[np.searchsorted(ends, starts[:, None] + lower, side='right')]
+    above = days[np.searchsorted(ends, starts[:, None] + np.minimum(lower + 1, totals[:, None] - 1), side='right')]
+    return below + fraction * (above - below)
+
+
+def percentiles_by_group(collection, match: dict, group_by: str, percentiles: List[float],
+                         animal_filter: Optional[dict] = None) -> dict:
+    """Median (data), requested percentiles, mean and count of days_to_adoption per group
+
+    Groups are age bands in band order, otherwise the largest first.
+    """
+    rows = list(collection.aggregate(days_by_group_pipeline(match, group_by, animal_filter), allowDiskUse=True))
+    if not rows:
+        return {'labels': [], 'data': [], 'percentiles': {f"p{p:g}": [] for p in percentiles},
+                'mean': [], 'counts': []}
+
+    names, codes = np.unique(np.array([row['_id']['group'] for row in rows], dtype=object), return_inverse=True)
+    days = np.array([row['_id']['days'] for row in rows], dtype=np.float64)
+    counts = np.array([row['count'] for row in rows], dtype=np.int64)
+
+    requested = np.array(percentiles, dtype=np.float64)
+    values = weighted_quantiles(codes, days, counts, names.size, np.append(requested, 50) / 100)
+    totals = np.bincount(codes, weights=counts, minlength=names.size)
+    means = np.bincount(codes, weights=days * counts, minlength=names.size) / totals
+
+    if group_by == 'age_band':
+        rank = {label: i for i, label in enumerate(AGE_BAND_LABELS)}
+        order = np.argsort([rank.get(name, len(rank)) for name in names], kind='stable')
+    else:
+        order = np.argsort(-totals, kind='stable')
+
+    return {
+        'labels': names[order].tolist(),
+        'data': np.round(values[order, -1], 1).tolist(),
+        'percentiles': {f"p{p:g}": np.round(values[order, i], 1).tolist() for i, p in enumerate(percentiles)},
+        'mean': np.round(means[order], 1).tolist(),
+        'counts': totals[order].astype(np.int64).tolist()
+    }
@@ -0,0 +1,182 @@
+"""
+Time Series
+Count dated documents per day, week, month, quarter or year with the gaps filled
+"""
+
+from datetime import datetime
+from typing import Dict, List, Literal, Optional, Tuple
+
+import numpy as np
+
+from backend.references import animal_filter_stages
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+Granularity = Literal['day', 'week', 'month', 'quarter', 'year']
+
+# Longest series returned (about 13 years of days)
+MAX_BUCKETS = 5000
+
+
+def date_range_filter(start_dt: Optional[datetime] = None, end_dt: Optional[datetime] = None) -> dict:
+    """Range condition on a BSON date field (inclusive), or {} when unbounded"""
+    condition = {}
+    if start_dt:
+        condition['$gte'] = start_dt
+    if end_dt:
+        condition['$lte'] = end_dt
+    return condition
+
+
+def with_date_condition(match: dict, date_field: str, condition: dict) -> dict:
+    """`match` plus a condition on date_field, ANDed with any it already has (e.g. an intake range)"""
+    if date_field not in match:
+        return {**match, date_field: condition}
+    rest = {field: value for field, value in match.items() if field != date_field}
+    return {**rest, '$and': [{date_field: match[date_field]}, {date_field: condition}]}
+
+
+def bucket_expression(date_field: str, granularity: str) -> dict:
+    """Start of the bucket holding a date field (weeks start on Monday); MongoDB 5.0+"""
+    trunc = {'date': f'${date_field}', 'unit': granularity}
+    if granularity == 'week':
+        trunc['startOfWeek'] = 'monday'
+    return {'$dateTrunc': trunc}
+
+
+def count_by_bucket(collection, date_field: str, match: dict, granularity: str = 'month',
+                    start_dt: Optional[datetime] = None, end_dt: Optional[datetime] = None,
+                    animal_filter: Optional[dict] = None):
+    """Count documents per bucket of a date field, grouped in MongoDB
+
+    With animal_filter, only documents whose animal_id references a matching
+    animal count (joined in the pipeline, see animal_filter_stages).
+
+    Returns:
+        tuple: (dict of bucket start -> count within the range, valid_dates, invalid_dates)
+        where invalid_dates counts values that are set but not BSON dates
+        (e.g. strings not migrated yet by utils/migrate_dates.py)
+    """
+    in_range = {'$type': 'date', **date_range_filter(start_dt, end_dt)}
+    invalid = {'$exists': True, '$nin': [None, ''], '$not': {'$type': 'date'}}
+    joins = animal_filter_stages(animal_filter or {})
+
+    if not joins:
+        pipeline = [
+            {'$match': with_date_condition(match, date_field, in_range)},
+            {'$group': {'_id': bucket_expression(date_field, granularity), 'count': {'$sum': 1}}}
+        ]
+        counts = {row['_id']: row['count'] for row in collection.aggregate(pipeline)}
+        valid_dates = collection.count_documents(with_date_condition(match, date_field, {'$type': 'date'}))
+        invalid_dates = collection.count_documents(with_date_condition(match, date_field, invalid))
+        return counts, valid_dates, invalid_dates
+
+    # Join each document once, then bucket and count both kinds of dates from the joined set
+    row = next(collection.aggregate([
+        {'$match': match},
+        *joins,
+        {'$facet': {
+            'buckets': [
+                {'$match': {date_field: in_range}},
+                {'$group': {'_id': bucket_expression(date_field, granularity), 'count': {'$sum': 1}}}
+            ],
+            'valid': [{'$match': {date_field: {'$type': 'date'}}}, {'$count': 'n'}],
+            'invalid': [{'$match': {date_field: invalid}}, {'$count': 'n'}],
+        }}
+    ], allowDiskUse=True))
+    counts = {bucket['_id']: bucket['count'] for bucket in row['buckets']}
+    valid_dates = row['valid'][0]['n'] if row['valid'] else 0
+    invalid_dates = row['invalid'][0]['n'] if row['invalid'] else 0
+    return counts, valid_dates, invalid_dates
+
+
+def truncate(days: np.ndarray, granularity: str) -> np.ndarray:
+    """Start of the bucket for each datetime64[D] value"""
+    days = days.astype('datetime64[D]')
+    if granularity == 'day':
+        return days
+    if granularity == 'week':
+        # 1970-01-01 was a Thursday (3 days after a Monday)
+        return days - (days.view('int64') + 3) % 7
+    months = days.astype('datetime64[M]')
+    if granularity == 'quarter':
+        months = months - months.view('int64') % 3
+    elif granularity == 'year':
+        months = days.astype('datetime64[Y]').astype('datetime64[M]')
+    return months.astype('datetime64[D]')
+
+
+def bucket_range(first: np.datetime64, last: np.datetime64, granularity: str) -> np.ndarray:
+    """Every bucket start from the bucket of `first` to the bucket of `last`"""
+    first, last = truncate(np.array([first, last]), granularity)
+    if granularity in ('day', 'week'):
+        buckets = np.arange(first, last + 1, 7 if granularity == 'week' else 1)
+    else:
+        unit = 'datetime64[Y]' if granularity == 'year' else 'datetime64[M]'
+        step = 3 if granularity == 'quarter' else 1
+        buckets = np.arange(first.astype(unit), last.astype(unit) + 1, step).astype('datetime64[D]')
+    if buckets.size > MAX_BUCKETS:
+        raise ValueError(f"Range too long for {granularity} buckets ({buckets.size} > {MAX_BUCKETS}), "
+                         f"use a larger granularity or a shorter date range")
+    return buckets
+
+
+def earliest_bucket(last: np.datetime64, granularity: str, count: int = MAX_BUCKETS) -> np.datetime64:
+    """Start of the first of `count` buckets ending with the bucket of `last`"""
+    end = truncate(np.array([last]), granularity)[0]
+    if granularity in ('day', 'week'):
+        return end - (count - 1) * (7 if granularity == 'week' else 1)
+    if granularity == 'year':
+        return (end.astype('datetime64[Y]') - (count - 1)).astype('datetime64[D]')
+    step = 3 if granularity == 'quarter' else 1
+    return (end.astype('datetime64[M]') - (count - 1) * step).astype('datetime64[D]')
+
+
+def bucket_labels(buckets: np.ndarray, granularity: str) -> List[str]:
+    """YYYY-MM-DD for days and weeks (the Monday), YYYY-MM, YYYY-Qn, YYYY"""
+    if granularity in ('day', 'week'):
+        return np.datetime_as_string(buckets, unit='D').tolist()
+    if granularity == 'month':
+        return np.datetime_as_string(buckets, unit='M').tolist()
+    if granularity == 'year':
+        return np.datetime_as_string(buckets, unit='Y').tolist()
+    months = buckets.astype('datetime64[M]').view('int64')
+    return [f"{1970 + m // 12:04d}-Q{m % 12 // 3 + 1}" for m in months.tolist()]
+
+
+def fill_series(counts: Dict[datetime, int], granularity: str,
+                start_dt: Optional[datetime] = None, end_dt: Optional[datetime] = None,
+                now: Optional[datetime] = None) -> Tuple[List[str], List[int]]:
+    """Labels and counts for every bucket of the range, 0 where there is no data
+
+    The range is start_dt..end_dt; an open start begins at the earliest
+    bucket with data, an open end stops at the current date when a start
+    is given, else at the latest bucket with data.
+    """
+    keys = np.array(sorted(counts), dtype='datetime64[D]')
+    values = np.array([counts[k] for k in sorted(counts)], dtype=np.int64)
+
+    if start_dt is not None:
+        first = np.datetime64(start_dt, 'D')
+    elif keys.size:
+        first = keys[0]
+    elif end_dt is not None:
+        first = np.datetime64(end_dt, 'D')
+    else:
+        return [], []
+    if end_dt is not None:
+        last = np.datetime64(end_dt, 'D')
+    elif start_dt is not None:
+        last = np.datetime64(now or datetime.now(), 'D')
+    else:
+        last = keys[-1]
+    if last < first:
+        return [], []
+
+    buckets = bucket_range(first, last, granularity)
+    data = np.zeros(buckets.size, dtype=np.int64)
+    if keys.size:
+        position = np.searchsorted(buckets, truncate(keys, granularity))
+        inside = position < buckets.size
+        inside[inside] = buckets[position[inside]] == truncate(keys[inside], granularity)
+        np.add.at(data, position[inside], values[inside])
+    return bucket_labels(buckets, granularity), data.tolist()
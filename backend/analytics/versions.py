@@ -0,0 +1,64 @@
+"""
+Data Versions
+Per-collection change counters, bumped by the write routes so cached analytics know when to recompute
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Callable, Hashable, Sequence
+
+from backend.config import ANALYTICS_CACHE_TTL_SECONDS, ANALYTICS_CACHE_SIZE
+
+_versions = Counter()
+_lock = threading.Lock()
+
+
+def mark_changed(*collections: str):
+    """Record a write to each collection"""
+    with _lock:
+        for collection in collections:
+            _versions[collection] += 1
+
+
+def on_inserted_mark_changed(collection: str) -> Callable[[list], None]:
+    """on_inserted callback for bulk writes (bulk_create, imports) that marks the collection changed"""
+    return lambda docs: mark_changed(collection)
+
+
+def data_version(*collections: str) -> tuple:
+    """Change counters of the collections, to compare with a cached result's"""
+    with _lock:
+        return tuple(_versions[collection] for collection in collections)
+
+
+class VersionedCache:
+    """Computed results per key, reused until a collection they read changes
+
+    Writes through the API bump the counters above; the TTL picks up writes
+    made by other processes. The least recently used entries are dropped
+    past ANALYTICS_CACHE_SIZE.
+    """
+
+    def __init__(self, ttl: float = ANALYTICS_CACHE_TTL_SECONDS, size: int = ANALYTICS_CACHE_SIZE):
+        self.ttl = ttl
+        self.size = size
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, collections: Sequence[str], compute: Callable[[], object]):
+        # Read before computing so a write made meanwhile invalidates the new entry
+        version = data_version(*collections)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version and time.monotonic() - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                return entry[2]
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return value
@@ -0,0 +1,88 @@
+"""
+Animal Filters
+One filter spec for the animal list, export, facet and chart endpoints:
+repeated values (species=Dog&species=Cat) plus age and intake date ranges
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Query
+
+from backend.analytics.snapshot import CATEGORY_FIELDS
+from backend.analytics.timeseries import date_range_filter
+from backend.dates import parse_date
+
+
+class AnimalFilter:
+    """Any of the listed values per field (AND across fields), an inclusive
+    age range and an inclusive intake_date range; empty means all animals"""
+
+    def __init__(self, values: Optional[Dict[str, List[str]]] = None,
+                 age_min: Optional[float] = None, age_max: Optional[float] = None,
+                 intake_from: Optional[datetime] = None, intake_to: Optional[datetime] = None):
+        # Duplicates dropped, order kept
+        self.values = {field: list(dict.fromkeys(v)) for field, v in (values or {}).items() if v}
+        self.age_min, self.age_max = age_min, age_max
+        self.intake_from, self.intake_to = intake_from, intake_to
+
+    def get(self, field: str) -> List[str]:
+        return self.values.get(field, [])
+
+    @property
+    def age_range(self) -> Tuple[Optional[float], Optional[float]]:
+        return self.age_min, self.age_max
+
+    @property
+    def in_snapshot(self) -> bool:
+        """Whether the in-memory snapshot can answer it (it holds no intake dates)"""
+        return self.intake_from is None and self.intake_to is None
+
+    def range_query(self) -> dict:
+        """MongoDB conditions for the age and intake_date ranges only"""
+        query = {}
+        age = {}
+        if self.age_min is not None:
+            age['$gte'] = self.age_min
+        if self.age_max is not None:
+            age['$lte'] = self.age_max
+        if age:
+            query['age'] = age
+        intake = date_range_filter(self.intake_from, self.intake_to)
+        if intake:
+            query['intake_date'] = intake
+        return query
+
+    def query(self) -> dict:
+        """MongoDB filter - a single value is an equality, several an $in, so both use the field's index"""
+        query = {field: values[0] if len(values) == 1 else {'$in': values}
+                 for field, values in self.values.items()}
+        query.update(self.range_query())
+        return query
+
+    def __bool__(self) -> bool:
+        return bool(self.query())
+
+
+def animal_filter_params(
+    species: Optional[List[str]] = Query(None, description="Species (repeat for any of several)"),
+    breed: Optional[List[str]] = Query(None, description="Breed (repeat for any of several)"),
+    status: Optional[List[str]] = Query(None, description="Status (repeat for any of several)"),
+    gender: Optional[List[str]] = Query(None, description="Gender (repeat for any of several)"),
+    age_min: Optional[float] = Query(None, ge=0, description="Minimum age in years (inclusive)"),
+    age_max: Optional[float] = Query(None, ge=0, description="Maximum age in years (inclusive)"),
+    intake_from: Optional[str] = Query(None, description="Intake on or after (YYYY-MM-DD)"),
+    intake_to: Optional[str] = Query(None, description="Intake on or before (YYYY-MM-DD)")
+) -> AnimalFilter:
+    """Route dependency reading the animal filter query parameters"""
+    try:
+        intake_start, intake_end = parse_date(intake_from), parse_date(intake_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if age_min is not None and age_max is not None and age_min > age_max:
+        raise HTTPException(status_code=400, detail="age_min must be less than or equal to age_max")
+    if intake_start and intake_end and intake_start > intake_end:
+        raise HTTPException(status_code=400, detail="intake_from must be before or equal to intake_to")
+
+    values = dict(zip(CATEGORY_FIELDS, (species, breed, status, gender)))
+    return AnimalFilter(values, age_min, age_max, intake_start, intake_end)
@@ -0,0 +1,90 @@
+"""
+Admin Routes
+Diagnostics for operators - guarded by the ADMIN_TOKEN setting
+"""
+
+from fastapi import APIRouter, HTTPException, Header, Query, Depends
+from fastapi.responses import PlainTextResponse
+from typing import Dict, Optional
+
+from backend.config import ADMIN_TOKEN, SLOW_QUERY_LOG_ENABLED, PROFILING_ENABLED, ANALYTICS_SNAPSHOT_ENABLED
+from backend.monitoring.slow_queries import slow_query_log
+from backend.monitoring.profiler import profile_store
+from backend.analytics.snapshot import snapshot_stats
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only with a matching X-Admin-Token header"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+@router.get("/slow-queries", response_model=Dict)
+async def get_slow_queries(
+    limit: int = Query(50, ge=1, le=1000, description="Number of entries to return"),
+    route: Optional[str] = Query(None, description="Only entries for this route template"),
+    collection: Optional[str] = Query(None, description="Only entries for this collection")
+):
+    """Most recent slow MongoDB commands with their route, filter shape and query plan"""
+    entries = slow_query_log.entries()
+    if route:
+        entries = [e for e in entries if e['route'] == route]
+    if collection:
+        entries = [e for e in entries if e['collection'] == collection]
+    
+    return {
+        'enabled': SLOW_QUERY_LOG_ENABLED,
+        'threshold_ms': slow_query_log.threshold_ms,
+        'count': len(entries),
+        'entries': entries[:limit]
+    }
+
+
+@router.delete("/slow-queries", response_model=Dict)
+async def clear_slow_queries():
+    """Reset the slow query log, e.g. after adding an index"""
+    slow_query_log.clear()
+    return {'success': True, 'message': 'Slow query log cleared'}
+
+
+@router.get("/profiles", response_model=Dict)
+async def list_profiles():
+    """Stored request profiles, newest first (request one with X-Profile: 1)"""
+    profiles = profile_store.list()
+    return {
+        'enabled': PROFILING_ENABLED,
+        'count': len(profiles),
+        'profiles': profiles
+    }
+
+
+@router.get("/profiles/{profile_id}", response_model=Dict)
+async def get_profile(profile_id: str):
+    """Call tree, MongoDB commands and DB vs Python time for one profiled request"""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.to_dict()
+
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_folded(profile_id: str):
+    """Collapsed stacks for flamegraph.pl or speedscope.app"""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile.folded()
+
+
+@router.get("/analytics-snapshot", response_model=Dict)
+async def get_analytics_snapshot():
+    """Size, memory use and load time of the in-memory animal snapshot"""
+    return {
+        'enabled': ANALYTICS_SNAPSHOT_ENABLED,
+        'snapshot': snapshot_stats()
+    }
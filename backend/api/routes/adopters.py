@@ -3,14 +3,17 @@ Adopters Routes
 CRUD operations for adopters
 """
 
-from fastapi import APIRouter, Request, HTTPException, Path
+from fastapi import APIRouter, Request, HTTPException, Path, Body
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from bson import ObjectId
-from typing import List
+from typing import List, Dict, Any
 
 from backend.database.connection import get_database, serialize_doc
-from backend.models import AdopterCreate, AdopterUpdate, AdopterResponse, SuccessResponse
+from backend.database.writes import insert_and_return, update_and_return
+from backend.database.bulk import bulk_create
+from backend.config import BULK_MAX_ITEMS
+from backend.models import AdopterCreate, AdopterUpdate, AdopterResponse, SuccessResponse, BulkCreateResponse
 
 router = APIRouter()
 templates = Jinja2Templates(directory="frontend/templates")
@@ -20,8 +23,6 @@ templates = Jinja2Templates(directory="frontend/templates")
 async def adopters_page(request: Request):
     """Render adopters management page"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
     adopters_list = [serialize_doc(a) for a in db.adopters.find()]
     return templates.TemplateResponse("adopters.html", {"request": request, "adopters": adopters_list})
@@ -30,8 +31,6 @@ async def adopters_page(request: Request):
 @router.get("", response_model=List[AdopterResponse])
 async def get_adopters():
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Could not connect to database")
     
     # Fetch all adopters - simple list comprehension works fine here
     adopters_list = [serialize_doc(a) for a in db.adopters.find()]
@@ -42,21 +41,26 @@ async def get_adopters():
 async def create_adopter(adopter: AdopterCreate):
     # Add new adopter to database
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Connection failed")
     
     # Convert to dict and insert
     adopter_dict = adopter.dict()
-    result = db.adopters.insert_one(adopter_dict)
-    adopter_dict['_id'] = str(result.inserted_id)
-    return adopter_dict
+    return insert_and_return(db.adopters, adopter_dict)
+
+
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_adopters_bulk(items: List[Dict[str, Any]] = Body(...)):
+    """Create many adopters in one request - invalid items are reported, not fatal"""
+    db = get_database()
+    
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {BULK_MAX_ITEMS})")
+    
+    return bulk_create(db, 'adopters', items, AdopterCreate)
 
 
 @router.get("/{adopter_id}", response_model=AdopterResponse)
 async def get_adopter(adopter_id: str = Path(...)):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
     
     try:
         adopter_obj_id = ObjectId(adopter_id)
@@ -73,40 +77,34 @@ async def get_adopter(adopter_id: str = Path(...)):
 @router.put("/{adopter_id}", response_model=AdopterResponse)
 async def update_adopter(adopter_id: str = Path(...), adopter: AdopterUpdate = None):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB error")
     
     try:
-        update_data = {k: v for k, v in adopter.dict().items() if v is not None}
-        if not update_data:
-            raise HTTPException(status_code=400, detail="No fields to update")
-        
-        result = db.adopters.update_one({'_id': ObjectId(adopter_id)}, {'$set': update_data})
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Adopter not found")
-        
-        updated_adopter = db.adopters.find_one({'_id': ObjectId(adopter_id)})
-        return serialize_doc(updated_adopter)
-    except HTTPException:
-        raise
+        adopter_obj_id = ObjectId(adopter_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid adopter ID")
+    
+    update_data = {k: v for k, v in adopter.dict().items() if v is not None}
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    
+    updated_adopter = update_and_return(db.adopters, adopter_obj_id, update_data)
+    if updated_adopter is None:
+        raise HTTPException(status_code=404, detail="Adopter not found")
+    return updated_adopter
 
 
 @router.delete("/{adopter_id}", response_model=SuccessResponse)
 async def delete_adopter(adopter_id: str = Path(...)):
     # TODO: consider soft delete instead of hard delete
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
     
     try:
-        result = db.adopters.delete_one({'_id': ObjectId(adopter_id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Adopter not found")
-        return SuccessResponse(success=True, message="Adopter deleted successfully")
-    except HTTPException:
-        raise
+        adopter_obj_id = ObjectId(adopter_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid adopter ID")
+    
+    result = db.adopters.delete_one({'_id': adopter_obj_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Adopter not found")
+    return SuccessResponse(success=True, message="Adopter deleted successfully")
 
@@ -11,6 +11,12 @@ from typing import List
 from datetime import datetime
 
 from backend.database.connection import get_database, serialize_doc
+from backend.database.writes import insert_and_return, update_and_return
+from backend.analytics.snapshot import record_animal_fields
+from backend.analytics.versions import mark_changed
+from backend.analytics.stays import days_between, days_to_adoption_for
+from backend.dates import parse_date
+from backend.references import find_by_ids, refs_to_storage, to_object_id
 from backend.models import AdoptionCreate, AdoptionUpdate, AdoptionResponse, SuccessResponse
 
 router = APIRouter()
@@ -21,17 +27,19 @@ templates = Jinja2Templates(directory="frontend/templates")
 async def adoptions_page(request: Request):
     """Render adoptions management page"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Can't connect to database")
+    
+    adoptions = list(db.adoptions.find())
+    # Animal and adopter names with one query per collection
+    animals = find_by_ids(db.animals, (a.get('animal_id') for a in adoptions), {'name': 1})
+    adopters = find_by_ids(db.adopters, (a.get('adopter_id') for a in adoptions), {'name': 1})
     
     adoptions_list = []
-    for adoption in db.adoptions.find():
+    for adoption in adoptions:
+        animal = animals.get(adoption.get('animal_id'), {})
+        adopter = adopters.get(adoption.get('adopter_id'), {})
         adoption_doc = serialize_doc(adoption)
-        # Get animal and adopter details
-        animal = db.animals.find_one({'_id': ObjectId(adoption['animal_id'])})
-        adopter = db.adopters.find_one({'_id': ObjectId(adoption['adopter_id'])})
-        adoption_doc['animal_name'] = animal['name'] if animal else 'Unknown'
-        adoption_doc['adopter_name'] = adopter['name'] if adopter else 'Unknown'
+        adoption_doc['animal_name'] = animal.get('name', 'Unknown')
+        adoption_doc['adopter_name'] = adopter.get('name', 'Unknown')
         adoptions_list.append(adoption_doc)
     
     return templates.TemplateResponse("adoptions.html", {"request": request, "adoptions": adoptions_list})
@@ -41,8 +49,6 @@ async def adoptions_page(request: Request):
 async def get_adoptions():
     """Get all adoptions"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Can't connect to database")
     
     adoptions_list = [serialize_doc(a) for a in db.adoptions.find()]
     return adoptions_list
@@ -50,10 +56,12 @@ async def get_adoptions():
 
 @router.post("", response_model=AdoptionResponse)
 async def create_adoption(adoption: AdoptionCreate):
-    """Create a new adoption - automatically updates animal status to 'Adopted'"""
+    """Create a new adoption - automatically updates animal status to 'Adopted'
+
+    The status change is a single conditional update (only from 'Available'),
+    so two concurrent requests can't adopt the same animal - the loser gets a 409.
+    """
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Can't connect to database")
     
     # Validate IDs and check existence
     try:
@@ -61,93 +69,124 @@ async def create_adoption(adoption: AdoptionCreate):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid animal ID format")
     
-    animal = db.animals.find_one({'_id': animal_id_obj})
-    if not animal:
-        raise HTTPException(status_code=404, detail="Animal not found")
-    
     try:
         adopter_id_obj = ObjectId(adoption.adopter_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid adopter ID format")
     
-    adopter = db.adopters.find_one({'_id': adopter_id_obj})
+    adopter = db.adopters.find_one({'_id': adopter_id_obj}, {'_id': 1})
     if not adopter:
         raise HTTPException(status_code=404, detail="Adopter not found")
     
+    # Claim the animal - matches only while it is still Available
+    animal = db.animals.find_one_and_update(
+        {'_id': animal_id_obj, 'status': 'Available'},
+        {'$set': {'status': 'Adopted'}},
+        projection={'_id': 1, 'intake_date': 1}
+    )
+    if not animal:
+        current = db.animals.find_one({'_id': animal_id_obj}, {'status': 1})
+        if not current:
+            raise HTTPException(status_code=404, detail="Animal not found")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Animal is not available for adoption (status: {current.get('status', 'Unknown')})"
+        )
+    record_animal_fields(animal_id_obj, {'status': 'Adopted'})
+    
     adoption_dict = adoption.dict()
     # Default to today if no date provided
     if not adoption_dict.get('adoption_date'):
         adoption_dict['adoption_date'] = datetime.now().strftime('%Y-%m-%d')
+    adoption_dict['days_to_adoption'] = days_between(
+        animal.get('intake_date'), parse_date(adoption_dict['adoption_date'])
+    )
     
-    # Mark animal as adopted
-    db.animals.update_one({'_id': animal_id_obj}, {'$set': {'status': 'Adopted'}})
-    
-    result = db.adoptions.insert_one(adoption_dict)
-    adoption_dict['_id'] = str(result.inserted_id)
-    return adoption_dict
+    try:
+        created = insert_and_return(db.adoptions, adoption_dict)
+    except Exception:
+        # Release the animal so a failed insert doesn't leave it stuck as Adopted
+        db.animals.update_one({'_id': animal_id_obj, 'status': 'Adopted'}, {'$set': {'status': 'Available'}})
+        record_animal_fields(animal_id_obj, {'status': 'Available'})
+        raise HTTPException(status_code=500, detail="Failed to record adoption")
+    mark_changed('adoptions')
+    return created
 
 
 @router.get("/{adoption_id}", response_model=AdoptionResponse)
 async def get_adoption(adoption_id: str = Path(...)):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Can't connect to database")
     
     try:
-        adoption = db.adoptions.find_one({'_id': ObjectId(adoption_id)})
-        if not adoption:
-            raise HTTPException(status_code=404, detail="Adoption not found")
-        return serialize_doc(adoption)
+        adoption_obj_id = ObjectId(adoption_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Bad adoption ID")
+    
+    adoption = db.adoptions.find_one({'_id': adoption_obj_id})
+    if not adoption:
+        raise HTTPException(status_code=404, detail="Adoption not found")
+    return serialize_doc(adoption)
 
 
 @router.put("/{adoption_id}", response_model=AdoptionResponse)
 async def update_adoption(adoption_id: str = Path(...), adoption: AdoptionUpdate = None):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Can't connect to database")
     
     try:
-        update_data = {k: v for k, v in adoption.dict().items() if v is not None}
-        if not update_data:
-            raise HTTPException(status_code=400, detail="No fields to update")
-        
-        result = db.adoptions.update_one({'_id': ObjectId(adoption_id)}, {'$set': update_data})
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Adoption not found")
-        
-        updated_adoption = db.adoptions.find_one({'_id': ObjectId(adoption_id)})
-        return serialize_doc(updated_adoption)
-    except HTTPException:
-        raise
+        adoption_obj_id = ObjectId(adoption_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid adoption ID")
+    
+    update_data = {k: v for k, v in adoption.dict().items() if v is not None}
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    try:
+        refs_to_storage(update_data)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid animal or adopter ID format")
+    
+    # Keep the stored interval in step with a new animal or date
+    if 'animal_id' in update_data or 'adoption_date' in update_data:
+        current = db.adoptions.find_one({'_id': adoption_obj_id}, {'animal_id': 1, 'adoption_date': 1})
+        if current is None:
+            raise HTTPException(status_code=404, detail="Adoption not found")
+        animal_id = update_data.get('animal_id') or current.get('animal_id')
+        adoption_date = parse_date(update_data['adoption_date']) if 'adoption_date' in update_data \
+            else current.get('adoption_date')
+        update_data['days_to_adoption'] = days_to_adoption_for(
+            db, to_object_id(animal_id) if animal_id else None, adoption_date
+        )
+    
+    updated_adoption = update_and_return(db.adoptions, adoption_obj_id, update_data)
+    if updated_adoption is None:
+        raise HTTPException(status_code=404, detail="Adoption not found")
+    mark_changed('adoptions')
+    return updated_adoption
 
 
 @router.delete("/{adoption_id}", response_model=SuccessResponse)
 async def delete_adoption(adoption_id: str = Path(...)):
     """Delete an adoption"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Can't connect to database")
     
     try:
-        adoption = db.adoptions.find_one({'_id': ObjectId(adoption_id)})
-        if not adoption:
-            raise HTTPException(status_code=404, detail="Adoption not found")
-        
-        # Update animal status back to Available
-        animal_id = adoption.get('animal_id')
-        if animal_id:
-            if isinstance(animal_id, str):
-                animal_id = ObjectId(animal_id)
-            db.animals.update_one({'_id': animal_id}, {'$set': {'status': 'Available'}})
-        
-        result = db.adoptions.delete_one({'_id': ObjectId(adoption_id)})
-        return SuccessResponse(success=True, message="Adoption deleted successfully")
-    except HTTPException:
-        raise
+        adoption_obj_id = ObjectId(adoption_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid adoption ID")
+    
+    adoption = db.adoptions.find_one({'_id': adoption_obj_id})
+    if not adoption:
+        raise HTTPException(status_code=404, detail="Adoption not found")
+    
+    # Update animal status back to Available
+    animal_id = adoption.get('animal_id')
+    if animal_id:
+        if isinstance(animal_id, str):
+            animal_id = ObjectId(animal_id)
+        db.animals.update_one({'_id': animal_id}, {'$set': {'status': 'Available'}})
+        record_animal_fields(animal_id, {'status': 'Available'})
+    
+    db.adoptions.delete_one({'_id': adoption_obj_id})
+    mark_changed('adoptions')
+    return SuccessResponse(success=True, message="Adoption deleted successfully")
 
@@ -3,15 +3,28 @@ Animals Routes
 CRUD operations for animals
 """
 
-from fastapi import APIRouter, Request, HTTPException, Path, Query
-from fastapi.responses import HTMLResponse
+import csv
+import io
+
+from fastapi import APIRouter, Depends, Request, HTTPException, Path, Query, Body
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from bson import ObjectId
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Any
 
 from backend.database.connection import get_database, serialize_doc
+from backend.animal_filters import AnimalFilter, animal_filter_params
+from backend.database.writes import insert_and_return, update_and_return
+from backend.database.bulk import bulk_create
+from backend.analytics.snapshot import (
+    record_animal_saved, record_animals_saved, record_animal_fields, record_animal_deleted
+)
+from backend.analytics.facets import animal_facets, parse_exclusions
+from backend.analytics.stays import refresh_days_to_adoption
+from backend.analytics.versions import mark_changed
+from backend.config import BULK_MAX_ITEMS
 from backend.models import (
-    AnimalCreate, AnimalUpdate, AnimalResponse, SuccessResponse,
+    AnimalCreate, AnimalUpdate, AnimalResponse, SuccessResponse, BulkCreateResponse,
     VolunteerAssignmentCreate, VolunteerAssignmentResponse
 )
 from backend.species_breeds import SPECIES_LIST, SPECIES_BREEDS, get_breeds_for_species
@@ -20,13 +33,14 @@ from backend.volunteer_skills import get_skills_for_species
 router = APIRouter()
 templates = Jinja2Templates(directory="frontend/templates")
 
+# Columns of GET /api/animals/export, in order
+EXPORT_COLUMNS = ['_id', 'name', 'species', 'breed', 'age', 'gender', 'status', 'intake_date', 'behavioral_notes']
+
 
 @router.get("/page", response_class=HTMLResponse, include_in_schema=False)
 async def animals_page(request: Request, status: Optional[str] = None):
     """Render animals management page with optional status filter"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
     # Validate status parameter
     valid_statuses = ["Available", "Adopted", "Medical"]
@@ -40,22 +54,17 @@ async def animals_page(request: Request, status: Optional[str] = None):
     
     animals_list = []
     volunteers_list = [serialize_doc(v) for v in db.volunteers.find()]
+    # Assigned volunteers are looked up here rather than queried per animal
+    volunteer_names = {v['_id']: v.get('name', 'Unknown') for v in volunteers_list}
     
     for animal in db.animals.find(filter_dict):
         animal_doc = serialize_doc(animal)
         # Populate volunteer names and IDs if assigned
         if animal_doc.get('assigned_volunteers'):
-            volunteer_info = []
-            for vol_id in animal_doc['assigned_volunteers']:
-                try:
-                    volunteer = db.volunteers.find_one({'_id': ObjectId(vol_id)})
-                    if volunteer:
-                        volunteer_info.append({
-                            'id': vol_id,
-                            'name': volunteer.get('name', 'Unknown')
-                        })
-                except Exception:
-                    continue
+            volunteer_info = [
+                {'id': vol_id, 'name': volunteer_names[vol_id]}
+                for vol_id in animal_doc['assigned_volunteers'] if vol_id in volunteer_names
+            ]
             animal_doc['assigned_volunteer_info'] = volunteer_info
             # Keep backward compatibility
             animal_doc['assigned_volunteer_names'] = [v['name'] for v in volunteer_info]
@@ -72,44 +81,91 @@ async def animals_page(request: Request, status: Optional[str] = None):
 
 
 @router.get("", response_model=List[AnimalResponse])
-async def get_animals():
-    """Get all animals (API endpoint)"""
+async def get_animals(filters: AnimalFilter = Depends(animal_filter_params)):
+    """Get all animals, or those matching the filter (API endpoint)"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
     # Filter out incomplete records (missing required fields)
     animals_list = []
-    for a in db.animals.find():
+    for a in db.animals.find(filters.query()):
         # Check if all required fields are present
         if all(key in a for key in ['name', 'species', 'age', 'gender', 'status']):
             animals_list.append(serialize_doc(a))
     return animals_list
 
 
+@router.get("/export")
+async def export_animals(filters: AnimalFilter = Depends(animal_filter_params)):
+    """Download the animals matching the filter as CSV"""
+    db = get_database()
+    
+    cursor = db.animals.find(filters.query(), {field: 1 for field in EXPORT_COLUMNS})
+    
+    def rows():
+        # Sync generator - Starlette runs it in a worker thread, one animal per line
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        for animal in cursor:
+            writer.writerow(serialize_doc(animal))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    
+    return StreamingResponse(rows(), media_type="text/csv",
+                             headers={"Content-Disposition": 'attachment; filename="animals.csv"'})
+
+
 @router.get("/species-breeds")
 async def get_species_breeds():
     """Get species and breeds mapping"""
     return {"species_breeds": SPECIES_BREEDS, "species_list": SPECIES_LIST}
 
 
+@router.get("/facets", response_model=Dict)
+async def get_animal_facets(
+    filters: AnimalFilter = Depends(animal_filter_params),
+    age_band: Optional[List[str]] = Query(None, description="Age band, e.g. '1-3 years'"),
+    has_volunteer: Optional[bool] = Query(None, description="Only animals with (true) or without (false) volunteers"),
+    exclude: Optional[List[str]] = Query(None, description="field:value pairs to leave out, e.g. status:Adopted"),
+    ids_limit: int = Query(0, ge=0, le=10000, description="Also return up to this many matching animal ids")
+):
+    """Matching count plus counts per value of each filter field, for faceted filter dropdowns"""
+    db = get_database()
+    
+    try:
+        excluded = parse_exclusions(exclude)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    facet_filters = {'age_band': age_band, 'has_volunteer': has_volunteer}
+    return animal_facets(db, filters, facet_filters, excluded, ids_limit=ids_limit)
+
+
 @router.post("", response_model=AnimalResponse)
 async def create_animal(animal: AnimalCreate):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
-    animal_dict = animal.dict()
-    result = db.animals.insert_one(animal_dict)
-    created_animal = db.animals.find_one({'_id': result.inserted_id})
-    return serialize_doc(created_animal)
+    created = insert_and_return(db.animals, animal.dict())
+    record_animal_saved(created)
+    return created
+
+
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_animals_bulk(items: List[Dict[str, Any]] = Body(...)):
+    """Create many animals in one request (intake days) - returns a result per item"""
+    db = get_database()
+    
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {BULK_MAX_ITEMS})")
+    
+    return bulk_create(db, 'animals', items, AnimalCreate, on_inserted=record_animals_saved)
 
 
 @router.get("/{animal_id}", response_model=AnimalResponse)
 async def get_animal(animal_id: str = Path(...)):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
     try:
         animal_id_obj = ObjectId(animal_id)
@@ -126,8 +182,6 @@ async def get_animal(animal_id: str = Path(...)):
 async def update_animal(animal_id: str = Path(...), animal: AnimalUpdate = None):
     # Update animal info
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
     try:
         animal_id_obj = ObjectId(animal_id)
@@ -138,20 +192,20 @@ async def update_animal(animal_id: str = Path(...), animal: AnimalUpdate = None)
     if not update_data:
         raise HTTPException(status_code=400, detail="No fields to update")
     
-    result = db.animals.update_one({'_id': animal_id_obj}, {'$set': update_data})
-    if result.matched_count == 0:
+    updated_animal = update_and_return(db.animals, animal_id_obj, update_data)
+    if updated_animal is None:
         raise HTTPException(status_code=404, detail="Animal not found")
-    
-    updated_animal = db.animals.find_one({'_id': animal_id_obj})
-    return serialize_doc(updated_animal)
+    record_animal_saved(updated_animal)
+    if 'intake_date' in update_data:
+        refresh_days_to_adoption(db, {'animal_id': animal_id_obj})
+        mark_changed('adoptions')
+    return updated_animal
 
 
 @router.delete("/{animal_id}", response_model=SuccessResponse)
 async def delete_animal(animal_id: str = Path(...)):
     # HACK: should probably check for related adoptions/medical records first
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
     try:
         animal_id_obj = ObjectId(animal_id)
@@ -161,6 +215,7 @@ async def delete_animal(animal_id: str = Path(...)):
     result = db.animals.delete_one({'_id': animal_id_obj})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Animal not found")
+    record_animal_deleted(animal_id_obj)
     return SuccessResponse(success=True, message="Animal deleted successfully")
 
 
@@ -168,8 +223,6 @@ async def delete_animal(animal_id: str = Path(...)):
 async def assign_volunteer_to_animal(animal_id: str = Path(...), assignment: VolunteerAssignmentCreate = None):
     """Assign a volunteer to an animal"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
     try:
         animal_id_obj = ObjectId(animal_id)
@@ -188,15 +241,15 @@ async def assign_volunteer_to_animal(animal_id: str = Path(...), assignment: Vol
     
     # Get current assigned volunteers or initialize empty list
     assigned_volunteers = animal.get('assigned_volunteers', [])
-    volunteer_id_str = str(volunteer_id_obj)
     
     # Check if already assigned
-    if volunteer_id_str in assigned_volunteers:
+    if volunteer_id_obj in assigned_volunteers:
         raise HTTPException(status_code=400, detail="Volunteer is already assigned to this animal")
     
     # Add volunteer to assigned list
-    assigned_volunteers.append(volunteer_id_str)
+    assigned_volunteers.append(volunteer_id_obj)
     db.animals.update_one({'_id': animal_id_obj}, {'$set': {'assigned_volunteers': assigned_volunteers}})
+    record_animal_fields(animal_id_obj, {'assigned_volunteers': assigned_volunteers})
     
     return VolunteerAssignmentResponse(
         success=True,
@@ -210,8 +263,6 @@ async def assign_volunteer_to_animal(animal_id: str = Path(...), assignment: Vol
 async def unassign_volunteer_from_animal(animal_id: str = Path(...), volunteer_id: str = Path(...)):
     """Unassign a volunteer from an animal"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
     try:
         animal_id_obj = ObjectId(animal_id)
@@ -224,14 +275,14 @@ async def unassign_volunteer_from_animal(animal_id: str = Path(...), volunteer_i
         raise HTTPException(status_code=404, detail="Animal not found")
     
     assigned_volunteers = animal.get('assigned_volunteers', [])
-    volunteer_id_str = str(volunteer_id_obj)
     
-    if volunteer_id_str not in assigned_volunteers:
+    if volunteer_id_obj not in assigned_volunteers:
         raise HTTPException(status_code=400, detail="Volunteer is not assigned to this animal")
     
     # Remove volunteer from assigned list
-    assigned_volunteers.remove(volunteer_id_str)
+    assigned_volunteers.remove(volunteer_id_obj)
     db.animals.update_one({'_id': animal_id_obj}, {'$set': {'assigned_volunteers': assigned_volunteers}})
+    record_animal_fields(animal_id_obj, {'assigned_volunteers': assigned_volunteers})
     
     return SuccessResponse(success=True, message="Volunteer unassigned successfully")
 
@@ -240,8 +291,6 @@ async def unassign_volunteer_from_animal(animal_id: str = Path(...), volunteer_i
 async def get_suggested_volunteers(animal_id: str = Path(...)):
     """Get suggested volunteers for an animal based on skills and species"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
     try:
         animal_id_obj = ObjectId(animal_id)
@@ -3,15 +3,20 @@ Charts Routes
 Data visualization endpoints with filtering support
 """
 
-from fastapi import APIRouter, Request, HTTPException, Query
+from fastapi import APIRouter, Depends, Request, HTTPException, Query
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
-from typing import Dict, Optional
-from collections import Counter, defaultdict
+from typing import Dict, List, Literal, Optional
+from collections import Counter
 from datetime import datetime
-from bson import ObjectId
 
 from backend.database.connection import get_database
+from backend.animal_filters import AnimalFilter, animal_filter_params
+from backend.analytics.snapshot import get_animal_snapshot, AGE_BAND_LABELS
+from backend.analytics.occupancy import get_occupancy
+from backend.analytics.forecast import INTERVAL, Metric, Model, get_forecast
+from backend.analytics.stays import STAY_BUCKET_LABELS, histogram, interval_match, percentiles_by_group
+from backend.analytics.timeseries import Granularity, count_by_bucket, date_range_filter, fill_series
 from backend.species_breeds import SPECIES_BREEDS
 
 router = APIRouter()
@@ -21,13 +26,16 @@ templates = Jinja2Templates(directory="frontend/templates")
 @router.get("", response_class=HTMLResponse, include_in_schema=False)
 async def charts_page(request: Request):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Can't reach database")
     
     # Get filter options
-    species_list = sorted(set(a.get('species', '') for a in db.animals.find() if a.get('species')))
-    status_list = sorted(set(a.get('status', '') for a in db.animals.find() if a.get('status')))
-    gender_list = sorted(set(a.get('gender', '') for a in db.animals.find() if a.get('gender')))
+    snapshot = get_animal_snapshot()
+    if snapshot is not None:
+        species_list, status_list, gender_list = (
+            sorted(v for v in snapshot.values(field) if v) for field in ('species', 'status', 'gender'))
+    else:
+        species_list = sorted(set(a.get('species', '') for a in db.animals.find() if a.get('species')))
+        status_list = sorted(set(a.get('status', '') for a in db.animals.find() if a.get('status')))
+        gender_list = sorted(set(a.get('gender', '') for a in db.animals.find() if a.get('gender')))
     
     return templates.TemplateResponse("charts.html", {
         "request": request,
@@ -38,22 +46,21 @@ async def charts_page(request: Request):
     })
 
 
-def build_animal_filter(species: Optional[str] = None, status: Optional[str] = None, 
-                       gender: Optional[str] = None, breed: Optional[str] = None):
-    """Build MongoDB filter dict from query params - only includes non-None values"""
-    filter_dict = {}
-    
-    # Add filters only if they're provided
-    if species:
-        filter_dict['species'] = species
-    if status:
-        filter_dict['status'] = status
-    if gender:
-        filter_dict['gender'] = gender
-    if breed:
-        filter_dict['breed'] = breed
-    
-    return filter_dict
+def count_animals_by(db, field: str, filters: AnimalFilter) -> Counter:
+    """Animals per value of a field among those matching the filter
+
+    Answered from the in-memory snapshot when it is loaded (and the filter
+    has no intake range, which it doesn't hold), otherwise by scanning the
+    matching animals.
+    """
+    snapshot = get_animal_snapshot()
+    if snapshot is not None and filters.in_snapshot:
+        return Counter(snapshot.distribution(field, filters.values, filters.age_range))
+    return Counter(
+        animal[field]
+        for animal in db.animals.find(filters.query(), {field: 1})
+        if animal.get(field) is not None
+    )
 
 
 def parse_date_range(start_date: Optional[str] = None, end_date: Optional[str] = None):
@@ -88,33 +95,53 @@ def parse_date_range(start_date: Optional[str] = None, end_date: Optional[str] =
     return start_dt, end_dt, metadata
 
 
+def time_series_response(collection, date_field: str, match: dict, granularity: str,
+                         start_date: Optional[str], end_date: Optional[str], total_key: str,
+                         animal_filter: Optional[dict] = None) -> dict:
+    """Chart payload for documents counted per day/week/month/quarter/year of a date field
+
+    animal_filter applies to the animal referenced by animal_id (joined in MongoDB).
+    """
+    start_dt, end_dt, date_metadata = parse_date_range(start_date, end_date)
+    counts, valid_dates, invalid_dates = count_by_bucket(
+        collection, date_field, match, granularity, start_dt, end_dt, animal_filter
+    )
+    try:
+        labels, data = fill_series(counts, granularity, start_dt, end_dt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    metadata = {
+        total_key: collection.count_documents({}),
+        'valid_dates': valid_dates,
+        'invalid_dates': invalid_dates,
+        'filtered_count': sum(counts.values()),
+        'granularity': granularity,
+        **date_metadata
+    }
+    
+    return {
+        'labels': labels,
+        'data': data,
+        'metadata': metadata
+    }
+
+
 @router.get("/breed", response_model=Dict)
 async def get_breed_distribution(
-    species: Optional[str] = Query(None, description="Filter by species (required for breed distribution)"),
-    status: Optional[str] = Query(None, description="Filter by animal status"),
-    gender: Optional[str] = Query(None, description="Filter by gender"),
-    breed: Optional[str] = Query(None, description="Filter by breed (for consistency)")
+    filters: AnimalFilter = Depends(animal_filter_params)
 ):
     """Get breed distribution for a selected species with optional filters"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Can't reach database")
     
-    if not species:
+    if not filters.get('species'):
         return {
             'labels': [],
             'data': [],
             'message': 'Please select a species to view breed distribution'
         }
     
-    filter_dict = build_animal_filter(species=species, status=status, gender=gender, breed=breed)
-    
-    animals = db.animals.find(filter_dict)
-    breed_count = Counter(
-        animal.get('breed', 'Unknown') 
-        for animal in animals 
-        if animal.get('breed') is not None
-    )
+    breed_count = count_animals_by(db, 'breed', filters)
     
     # Sort by count descending
     sorted_breeds = sorted(breed_count.items(), key=lambda x: x[1], reverse=True)
@@ -127,24 +154,12 @@ async def get_breed_distribution(
 
 @router.get("/species", response_model=Dict)
 async def get_species_distribution(
-    species: Optional[str] = Query(None, description="Filter by species (for consistency)"),
-    status: Optional[str] = Query(None, description="Filter by animal status"),
-    gender: Optional[str] = Query(None, description="Filter by gender"),
-    breed: Optional[str] = Query(None, description="Filter by breed")
+    filters: AnimalFilter = Depends(animal_filter_params)
 ):
     """Get animal species distribution with optional filters"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
-    filter_dict = build_animal_filter(species=species, status=status, gender=gender, breed=breed)
-    
-    animals = db.animals.find(filter_dict)
-    species_count = Counter(
-        animal.get('species', 'Unknown') 
-        for animal in animals 
-        if animal.get('species') is not None
-    )
+    species_count = count_animals_by(db, 'species', filters)
     
     # Sort by count descending
     sorted_species = sorted(species_count.items(), key=lambda x: x[1], reverse=True)
@@ -157,24 +172,12 @@ async def get_species_distribution(
 
 @router.get("/status", response_model=Dict)
 async def get_status_distribution(
-    species: Optional[str] = Query(None, description="Filter by species"),
-    status: Optional[str] = Query(None, description="Filter by status (for consistency)"),
-    gender: Optional[str] = Query(None, description="Filter by gender"),
-    breed: Optional[str] = Query(None, description="Filter by breed")
+    filters: AnimalFilter = Depends(animal_filter_params)
 ):
     """Get animal status distribution (Available, Adopted, Medical)"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
     
-    filter_dict = build_animal_filter(species=species, status=status, gender=gender, breed=breed)
-    
-    animals = db.animals.find(filter_dict)
-    status_count = Counter(
-        animal.get('status', 'Unknown') 
-        for animal in animals 
-        if animal.get('status') is not None
-    )
+    status_count = count_animals_by(db, 'status', filters)
     
     return {
         'labels': list(status_count.keys()),
@@ -184,27 +187,22 @@ async def get_status_distribution(
 
 @router.get("/age-distribution", response_model=Dict)
 async def get_age_distribution(
-    species: Optional[str] = Query(None, description="Filter by species"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    gender: Optional[str] = Query(None, description="Filter by gender"),
-    breed: Optional[str] = Query(None, description="Filter by breed")
+    filters: AnimalFilter = Depends(animal_filter_params)
 ):
     """Get age distribution grouped into ranges"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Connection failed")
     
-    filter_dict = build_animal_filter(species=species, status=status, gender=gender, breed=breed)
+    snapshot = get_animal_snapshot()
+    if snapshot is not None and filters.in_snapshot:
+        age_ranges = snapshot.age_distribution(filters.values, filters.age_range)
+        return {
+            'labels': list(age_ranges.keys()),
+            'data': list(age_ranges.values())
+        }
     
-    animals = db.animals.find(filter_dict)
+    animals = db.animals.find(filters.query(), {'age': 1})
     
-    age_ranges = {
-        '0-1 years': 0,
-        '1-3 years': 0,
-        '3-5 years': 0,
-        '5-10 years': 0,
-        '10+ years': 0
-    }
+    age_ranges = dict.fromkeys(AGE_BAND_LABELS, 0)
     
     for animal in animals:
         age = animal.get('age', 0)
@@ -227,209 +225,116 @@ async def get_age_distribution(
 
 @router.get("/adoptions", response_model=Dict)
 async def get_monthly_adoptions(
-    species: Optional[str] = Query(None, description="Filter by species"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    gender: Optional[str] = Query(None, description="Filter by gender"),
-    breed: Optional[str] = Query(None, description="Filter by breed"),
+    filters: AnimalFilter = Depends(animal_filter_params),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    granularity: Granularity = Query("month", description="Bucket size: day, week, month, quarter or year")
 ):
-    """Get monthly adoption numbers with optional filters
+    """Get adoption numbers over time with optional filters
     
     Parameters:
-    - species: Optional species filter
-    - status: Optional status filter
-    - gender: Optional gender filter
-    - breed: Optional breed filter
+    - species, status, gender, breed: Optional filters, repeat for any of several values
+    - age_min, age_max, intake_from, intake_to: Optional animal ranges
     - start_date: Optional start date filter (YYYY-MM-DD format)
     - end_date: Optional end date filter (YYYY-MM-DD format)
+    - granularity: Bucket size (default month)
     
-    Returns monthly adoption counts grouped by year-month (YYYY-MM format)
+    Returns adoption counts per bucket, e.g. YYYY-MM for months, with empty buckets as 0
     """
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB error")
-    
-    # Build animal filter
-    animal_filter = build_animal_filter(species=species, status=status, gender=gender, breed=breed)
-    
-    # Get matching animal IDs
-    matching_animals = set()
-    if animal_filter:
-        for animal in db.animals.find(animal_filter):
-            matching_animals.add(str(animal['_id']))
-    
-    adoptions = list(db.adoptions.find())
-    monthly_count = Counter()
-    
-    start_dt, end_dt, date_metadata = parse_date_range(start_date, end_date)
     
-    valid_dates = 0
-    invalid_dates = 0
-    
-    for adoption in adoptions:
-        # Filter by animal if filters are provided
-        if animal_filter:
-            adoption_animal_id = adoption.get('animal_id')
-            adoption_animal_id_str = str(adoption_animal_id) if adoption_animal_id else None
-            
-            if not adoption_animal_id_str or adoption_animal_id_str not in matching_animals:
-                continue
-        
-        adoption_date = adoption.get('adoption_date', '')
-        if adoption_date:
-            try:
-                # Try parsing the date
-                date_obj = datetime.strptime(str(adoption_date), '%Y-%m-%d')
-                valid_dates += 1
-                
-                # Apply date filters
-                if start_dt and date_obj < start_dt:
-                    continue
-                if end_dt and date_obj > end_dt:
-                    continue
-                
-                month_key = date_obj.strftime('%Y-%m')
-                monthly_count[month_key] += 1
-            except (ValueError, TypeError) as e:
-                invalid_dates += 1
-                # Log for debugging
-                print(f"Invalid adoption_date format: {adoption_date}, error: {e}")
-    
-    # If date range is provided, generate all months in the range
-    if start_dt or end_dt:
-        # Determine the range
-        if start_dt and end_dt:
-            # Both dates provided - use the range
-            start_year = start_dt.year
-            start_month = start_dt.month
-            end_year = end_dt.year
-            end_month = end_dt.month
-        elif start_dt:
-            # Only start date - go from start to current month
-            start_year = start_dt.year
-            start_month = start_dt.month
-            now = datetime.now()
-            end_year = now.year
-            end_month = now.month
-        else:  # end_dt only
-            # Only end date - go from earliest adoption to end
-            # Find earliest month with data, or use a reasonable default
-            if monthly_count:
-                earliest_month = min(monthly_count.keys())
-                start_year, start_month = map(int, earliest_month.split('-'))
-            else:
-                # No data, use end date as start
-                start_year = end_dt.year
-                start_month = end_dt.month
-            end_year = end_dt.year
-            end_month = end_dt.month
-        
-        # Generate all months from start to end
-        all_months = []
-        year = start_year
-        month = start_month
-        
-        while (year, month) <= (end_year, end_month):
-            month_key = f"{year:04d}-{month:02d}"
-            all_months.append(month_key)
-            # Move to next month
-            month += 1
-            if month > 12:
-                month = 1
-                year += 1
-        
-        # Fill in data for all months (0 if no adoptions)
-        labels = all_months
-        data = [monthly_count.get(month, 0) for month in all_months]
+    animal_filter = filters.query()
+    return time_series_response(
+        db.adoptions, 'adoption_date', {}, granularity,
+        start_date, end_date, 'total_adoptions', animal_filter
+    )
+
+
+def adoption_rate_pipeline(filter_dict: dict, within_days: Optional[int] = None) -> list:
+    """Animals grouped by species with total and adopted counts, joined to adoptions in MongoDB
+
+    With within_days, an animal only counts as adopted if an adoption is dated
+    no more than within_days after its intake_date (animals or adoptions
+    without a date don't count). Memory stays at one row per species however
+    long the adoption history is.
+    """
+    if within_days is None:
+        lookup_pipeline = [{'$project': {'_id': 1}}, {'$limit': 1}]
+        adopted = {'$gt': [{'$size': '$adoptions'}, 0]}
     else:
-        # No date range - just return months with data
-        sorted_months = sorted(monthly_count.items())
-        labels = [item[0] for item in sorted_months]
-        data = [item[1] for item in sorted_months]
-    
-    metadata = {
-        'total_adoptions': len(adoptions),
-        'valid_dates': valid_dates,
-        'invalid_dates': invalid_dates,
-        'filtered_count': sum(monthly_count.values()),
-        **date_metadata
-    }
-    
-    return {
-        'labels': labels,
-        'data': data,
-        'metadata': metadata
-    }
+        lookup_pipeline = [{'$project': {'_id': 0, 'adoption_date': 1}}]
+        adopted = {'$anyElementTrue': [{'$map': {
+            'input': '$adoptions',
+            'as': 'adoption',
+            'in': {'$and': [
+                {'$eq': [{'$type': '$intake_date'}, 'date']},
+                {'$eq': [{'$type': '$$adoption.adoption_date'}, 'date']},
+                {'$lte': [
+                    {'$subtract': ['$$adoption.adoption_date', '$intake_date']},
+                    within_days * 24 * 60 * 60 * 1000
+                ]}
+            ]}
+        }}]}
+    return [
+        {'$match': filter_dict},
+        {'$project': {'species': 1, 'intake_date': 1}},
+        # Uses the adoptions.animal_id index (see ensure_indexes); only the dates are kept, or just
+        # whether there is any adoption at all
+        {'$lookup': {
+            'from': 'adoptions',
+            'localField': '_id',
+            'foreignField': 'animal_id',
+            'pipeline': lookup_pipeline,
+            'as': 'adoptions'
+        }},
+        {'$group': {
+            '_id': {'$ifNull': ['$species', 'Unknown']},
+            'total': {'$sum': 1},
+            'adopted': {'$sum': {'$cond': [adopted, 1, 0]}}
+        }},
+        {'$sort': {'_id': 1}}
+    ]
 
 
 @router.get("/adoption-rate", response_model=Dict)
 async def get_adoption_rate_by_species(
-    species: Optional[str] = Query(None, description="Filter by species"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    gender: Optional[str] = Query(None, description="Filter by gender"),
-    breed: Optional[str] = Query(None, description="Filter by breed")
+    filters: AnimalFilter = Depends(animal_filter_params),
+    within_days: Optional[int] = Query(None, gt=0, description="Only count adoptions within this many days of intake")
 ):
     """Get adoption rate (adopted vs available) by species with optional filters"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Can't connect to database")
     
     # Apply filters to animals
-    filter_dict = build_animal_filter(species=species, status=status, gender=gender, breed=breed)
-    animals = db.animals.find(filter_dict)
-    adoptions = db.adoptions.find()
-    
-    # Get all adopted animal IDs
-    adopted_ids = {str(ad['animal_id']) for ad in adoptions}
-    
-    # Count by species
-    species_stats = defaultdict(lambda: {'total': 0, 'adopted': 0})
-    
-    for animal in animals:
-        species_name = animal.get('species', 'Unknown')
-        animal_id = str(animal['_id'])
-        species_stats[species_name]['total'] += 1
-        if animal_id in adopted_ids:
-            species_stats[species_name]['adopted'] += 1
+    filter_dict = filters.query()
     
     # Calculate adoption rates
     labels = []
     adopted_data = []
     available_data = []
     
-    for species_name, stats in sorted(species_stats.items()):
-        labels.append(species_name)
-        adopted_data.append(stats['adopted'])
-        available_data.append(stats['total'] - stats['adopted'])
+    for row in db.animals.aggregate(adoption_rate_pipeline(filter_dict, within_days)):
+        labels.append(row['_id'])
+        adopted_data.append(row['adopted'])
+        available_data.append(row['total'] - row['adopted'])
     
-    return {
+    result = {
         'labels': labels,
         'adopted': adopted_data,
         'available': available_data
     }
+    if within_days is not None:
+        result['within_days'] = within_days
+    return result
 
 
 @router.get("/gender-distribution", response_model=Dict)
 async def get_gender_distribution(
-    species: Optional[str] = Query(None, description="Filter by species"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    gender: Optional[str] = Query(None, description="Filter by gender (for consistency)"),
-    breed: Optional[str] = Query(None, description="Filter by breed")
+    filters: AnimalFilter = Depends(animal_filter_params)
 ):
     """Get gender distribution"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
-    
-    filter_dict = build_animal_filter(species=species, status=status, gender=gender, breed=breed)
     
-    animals = db.animals.find(filter_dict)
-    gender_count = Counter(
-        animal.get('gender', 'Unknown') 
-        for animal in animals 
-        if animal.get('gender') is not None
-    )
+    gender_count = count_animals_by(db, 'gender', filters)
     
     return {
         'labels': list(gender_count.keys()),
@@ -439,205 +344,232 @@ async def get_gender_distribution(
 
 @router.get("/medical-visits", response_model=Dict)
 async def get_medical_visits(
-    species: Optional[str] = Query(None, description="Filter by species"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    gender: Optional[str] = Query(None, description="Filter by gender"),
-    breed: Optional[str] = Query(None, description="Filter by breed"),
+    filters: AnimalFilter = Depends(animal_filter_params),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    granularity: Granularity = Query("month", description="Bucket size: day, week, month, quarter or year")
 ):
     """Get medical visits over time with optional filters
     
     Parameters:
-    - species: Optional species filter
-    - status: Optional status filter
-    - gender: Optional gender filter
-    - breed: Optional breed filter
+    - species, status, gender, breed: Optional filters, repeat for any of several values
+    - age_min, age_max, intake_from, intake_to: Optional animal ranges
     - start_date: Optional start date filter (YYYY-MM-DD format)
     - end_date: Optional end date filter (YYYY-MM-DD format)
+    - granularity: Bucket size (default month)
     
-    Returns monthly medical visit counts grouped by year-month (YYYY-MM format)
+    Returns medical visit counts per bucket, e.g. YYYY-MM for months, with empty buckets as 0
     """
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
     
-    # Build animal filter
-    animal_filter = build_animal_filter(species=species, status=status, gender=gender, breed=breed)
+    animal_filter = filters.query()
+    return time_series_response(
+        db.medical_records, 'visit_date', {}, granularity,
+        start_date, end_date, 'total_records', animal_filter
+    )
+
+
+@router.get("/intakes", response_model=Dict)
+async def get_intake_trend(
+    filters: AnimalFilter = Depends(animal_filter_params),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    granularity: Granularity = Query("month", description="Bucket size: day, week, month, quarter or year")
+):
+    """Get animal intakes over time (by intake_date) with optional filters"""
+    db = get_database()
     
-    # Get matching animal IDs
-    matching_animals = set()
-    if animal_filter:
-        for animal in db.animals.find(animal_filter):
-            matching_animals.add(str(animal['_id']))
+    animal_filter = filters.query()
+    return time_series_response(
+        db.animals, 'intake_date', animal_filter, granularity, start_date, end_date, 'total_animals'
+    )
+
+
+@router.get("/volunteer-activity", response_model=Dict)
+async def get_volunteer_activity_trend(
+    filters: AnimalFilter = Depends(animal_filter_params),
+    activity_type: Optional[str] = Query(None, description="Filter by activity type"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    granularity: Granularity = Query("month", description="Bucket size: day, week, month, quarter or year")
+):
+    """Get logged volunteer activities over time with optional filters"""
+    db = get_database()
     
-    medical_records = list(db.medical_records.find())
-    monthly_count = Counter()
+    animal_filter = filters.query()
+    match = {}
+    if activity_type:
+        match['activity_type'] = activity_type
+    return time_series_response(
+        db.volunteer_activities, 'activity_date', match, granularity, start_date, end_date, 'total_activities',
+        animal_filter
+    )
+
+
+@router.get("/occupancy", response_model=Dict)
+async def get_occupancy_trend(
+    filters: AnimalFilter = Depends(animal_filter_params),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    granularity: Granularity = Query("day", description="Headcount at the end of each day, week, month, quarter or year")
+):
+    """Get the number of animals in the shelter over time, per species
+
+    An animal is counted from its intake_date until the day before its
+    adoption. The daily series per filter is cached until animals or
+    adoptions change, so changing the range or granularity is cheap.
+    """
+    db = get_database()
     
+    animal_filter = filters.query()
     start_dt, end_dt, date_metadata = parse_date_range(start_date, end_date)
-    
-    valid_dates = 0
-    invalid_dates = 0
-    
-    for record in medical_records:
-        # Filter by animal if filters are provided
-        if animal_filter and str(record.get('animal_id')) not in matching_animals:
-            continue
-        
-        visit_date = record.get('visit_date', '')
-        if visit_date:
-            try:
-                # Try parsing the date
-                date_obj = datetime.strptime(str(visit_date), '%Y-%m-%d')
-                valid_dates += 1
-                
-                # Apply date filters
-                if start_dt and date_obj < start_dt:
-                    continue
-                if end_dt and date_obj > end_dt:
-                    continue
-                
-                month_key = date_obj.strftime('%Y-%m')
-                monthly_count[month_key] += 1
-            except (ValueError, TypeError) as e:
-                invalid_dates += 1
-                # Log for debugging
-                print(f"Invalid visit_date format: {visit_date}, error: {e}")
-    
-    # If date range is provided, generate all months in the range
-    if start_dt or end_dt:
-        # Determine the range
-        if start_dt and end_dt:
-            # Both dates provided - use the range
-            start_year = start_dt.year
-            start_month = start_dt.month
-            end_year = end_dt.year
-            end_month = end_dt.month
-        elif start_dt:
-            # Only start date - go from start to current month
-            start_year = start_dt.year
-            start_month = start_dt.month
-            now = datetime.now()
-            end_year = now.year
-            end_month = now.month
-        else:  # end_dt only
-            # Only end date - go from earliest visit to end
-            # Find earliest month with data, or use a reasonable default
-            if monthly_count:
-                earliest_month = min(monthly_count.keys())
-                start_year, start_month = map(int, earliest_month.split('-'))
-            else:
-                # No data, use end date as start
-                start_year = end_dt.year
-                start_month = end_dt.month
-            end_year = end_dt.year
-            end_month = end_dt.month
-        
-        # Generate all months from start to end
-        all_months = []
-        year = start_year
-        month = start_month
-        
-        while (year, month) <= (end_year, end_month):
-            month_key = f"{year:04d}-{month:02d}"
-            all_months.append(month_key)
-            # Move to next month
-            month += 1
-            if month > 12:
-                month = 1
-                year += 1
-        
-        # Fill in data for all months (0 if no visits)
-        labels = all_months
-        data = [monthly_count.get(month, 0) for month in all_months]
-    else:
-        # No date range - just return months with data
-        sorted_months = sorted(monthly_count.items())
-        labels = [item[0] for item in sorted_months]
-        data = [item[1] for item in sorted_months]
-    
-    metadata = {
-        'total_records': len(medical_records),
-        'valid_dates': valid_dates,
-        'invalid_dates': invalid_dates,
-        'filtered_count': sum(monthly_count.values()),
+    occupancy = get_occupancy(db, animal_filter)
+    try:
+        result = occupancy.window(start_dt, end_dt, granularity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    peak = max(result['data'], default=0)
+    result['metadata'] = {
+        'species': occupancy.species,
+        'peak': peak,
+        'peak_date': result['labels'][result['data'].index(peak)] if result['data'] else None,
+        'computed_at': datetime.fromtimestamp(occupancy.computed_at).isoformat(timespec='seconds'),
+        'granularity': granularity,
+        **date_metadata
+    }
+    return result
+
+
+def interval_metadata(db, date_metadata: dict) -> dict:
+    """Adoption totals for the time to adoption charts"""
+    return {
+        'total_adoptions': db.adoptions.count_documents({}),
+        # Missing intake or adoption date, or not backfilled yet (utils/backfill_days_to_adoption.py)
+        'without_interval': db.adoptions.count_documents({'days_to_adoption': None}),
         **date_metadata
     }
+
+
+@router.get("/days-to-adoption", response_model=Dict)
+async def get_days_to_adoption_histogram(
+    filters: AnimalFilter = Depends(animal_filter_params),
+    start_date: Optional[str] = Query(None, description="Adopted on or after (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Adopted on or before (YYYY-MM-DD)")
+):
+    """Get the number of adoptions by days from intake to adoption (stored days_to_adoption)"""
+    db = get_database()
+    
+    animal_filter = filters.query()
+    start_dt, end_dt, date_metadata = parse_date_range(start_date, end_date)
+    data = histogram(db.adoptions, interval_match({}, start_dt, end_dt), animal_filter)
     
     return {
-        'labels': labels,
+        'labels': STAY_BUCKET_LABELS,
         'data': data,
-        'metadata': metadata
+        'metadata': {'filtered_count': sum(data), **interval_metadata(db, date_metadata)}
     }
 
 
+@router.get("/days-to-adoption/percentiles", response_model=Dict)
+async def get_days_to_adoption_percentiles(
+    group_by: Literal['species', 'breed', 'age_band'] = Query("species", description="Group by species, breed or age_band"),
+    percentiles: List[float] = Query([25, 50, 75, 90], description="Percentiles to return (0-100), repeatable"),
+    filters: AnimalFilter = Depends(animal_filter_params),
+    start_date: Optional[str] = Query(None, description="Adopted on or after (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Adopted on or before (YYYY-MM-DD)")
+):
+    """Get median (data) and percentile days to adoption per species, breed or age band"""
+    if any(not 0 <= p <= 100 for p in percentiles):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+    
+    db = get_database()
+    
+    animal_filter = filters.query()
+    start_dt, end_dt, date_metadata = parse_date_range(start_date, end_date)
+    result = percentiles_by_group(
+        db.adoptions, interval_match({}, start_dt, end_dt), group_by, percentiles, animal_filter
+    )
+    result['metadata'] = {
+        'group_by': group_by,
+        'filtered_count': sum(result['counts']),
+        **interval_metadata(db, date_metadata)
+    }
+    return result
+
+
+@router.get("/forecast", response_model=Dict)
+async def get_forecast_chart(
+    metric: Metric = Query("adoptions", description="adoptions, intakes or medical (visits)"),
+    model: Model = Query("holt_winters", description="holt_winters or moving_average"),
+    horizon: int = Query(6, ge=1, le=24, description="Months to forecast"),
+    window: int = Query(3, ge=1, le=24, description="Months averaged by the moving average"),
+    history_months: int = Query(24, ge=1, le=240, description="Past months returned with the forecast"),
+    filters: AnimalFilter = Depends(animal_filter_params)
+):
+    """Get monthly counts with a forecast and 95% interval, in total and per species
+
+    Fitted on complete months only; the fitted model is cached until the
+    counted collection or the animals change, or a new month starts.
+    """
+    db = get_database()
+    
+    animal_filter = filters.query()
+    fitted = get_forecast(db, metric, model, animal_filter, window)
+    result = fitted.response(horizon, history_months)
+    result['metadata'] = {
+        'metric': metric,
+        'model': model,
+        'horizon': horizon,
+        'interval': INTERVAL,
+        'months_fitted': int(fitted.months.size),
+        'parameters': fitted.fitted.parameters if fitted.fitted is not None else {},
+        'fitted_at': datetime.fromtimestamp(fitted.fitted_at).isoformat(timespec='seconds')
+    }
+    return result
+
+
 @router.get("/medical-visits-by-species", response_model=Dict)
 async def get_medical_visits_by_species(
-    species: Optional[str] = Query(None, description="Filter by species"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    gender: Optional[str] = Query(None, description="Filter by gender"),
-    breed: Optional[str] = Query(None, description="Filter by breed"),
+    filters: AnimalFilter = Depends(animal_filter_params),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
 ):
     """Get medical visit frequency by species with optional filters
     
     Parameters:
-    - species: Optional species filter
-    - status: Optional status filter
-    - gender: Optional gender filter
-    - breed: Optional breed filter
+    - species, status, gender, breed: Optional filters, repeat for any of several values
+    - age_min, age_max, intake_from, intake_to: Optional animal ranges
     - start_date: Optional start date filter (YYYY-MM-DD format)
     - end_date: Optional end date filter (YYYY-MM-DD format)
     
     Returns medical visit counts grouped by species
     """
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Connection failed")
     
     # Build animal filter (include species if provided, but we'll still group by all species)
-    animal_filter = build_animal_filter(species=species, status=status, gender=gender, breed=breed)
-    
-    # Get matching animal IDs
-    matching_animals = set()
-    if animal_filter:
-        for animal in db.animals.find(animal_filter):
-            matching_animals.add(str(animal['_id']))
-    
-    medical_records = list(db.medical_records.find())
-    species_count = Counter()
+    animal_filter = filters.query()
     
     start_dt, end_dt, date_metadata = parse_date_range(start_date, end_date)
     
-    for record in medical_records:
-        # Filter by animal if filters are provided
-        if animal_filter and str(record.get('animal_id')) not in matching_animals:
-            continue
-        
-        visit_date = record.get('visit_date', '')
-        animal_id = record.get('animal_id')
-        
-        # Apply date filter if provided
-        if visit_date:
-            try:
-                date_obj = datetime.strptime(str(visit_date), '%Y-%m-%d')
-                if start_dt and date_obj < start_dt:
-                    continue
-                if end_dt and date_obj > end_dt:
-                    continue
-            except (ValueError, TypeError):
-                continue
-        
-        # Get animal species
-        if animal_id:
-            try:
-                animal = db.animals.find_one({'_id': ObjectId(animal_id)})
-                if animal:
-                    species_name = animal.get('species', 'Unknown')
-                    species_count[species_name] += 1
-            except Exception:
-                continue
+    # Filter by visit date in the query; the animal filter runs inside the join
+    record_filter = {}
+    visit_range = date_range_filter(start_dt, end_dt)
+    if visit_range:
+        record_filter['visit_date'] = visit_range
+    
+    # Count visits per animal first, then join each matching animal once on _id
+    pipeline = [
+        {'$match': record_filter},
+        {'$group': {'_id': '$animal_id', 'visits': {'$sum': 1}}},
+        {'$lookup': {
+            'from': 'animals', 'localField': '_id', 'foreignField': '_id',
+            'pipeline': [{'$match': animal_filter}] if animal_filter else [], 'as': 'animal'
+        }},
+        {'$unwind': '$animal'},
+        {'$group': {'_id': {'$ifNull': ['$animal.species', 'Unknown']}, 'count': {'$sum': '$visits'}}}
+    ]
+    species_count = Counter({row['_id']: row['count'] for row in db.medical_records.aggregate(pipeline)})
     
     # Sort by count descending
     sorted_species = sorted(species_count.items(), key=lambda x: x[1], reverse=True)
@@ -650,78 +582,53 @@ async def get_medical_visits_by_species(
 
 @router.get("/medical-visits-by-breed", response_model=Dict)
 async def get_medical_visits_by_breed(
-    species: Optional[str] = Query(None, description="Filter by species (required for breed distribution)"),
-    status: Optional[str] = Query(None, description="Filter by status"),
-    gender: Optional[str] = Query(None, description="Filter by gender"),
-    breed: Optional[str] = Query(None, description="Filter by breed (for consistency)"),
+    filters: AnimalFilter = Depends(animal_filter_params),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)")
 ):
     """Get medical visit frequency by breed for a selected species with optional filters
     
     Parameters:
-    - species: Required species filter
-    - status: Optional status filter
-    - gender: Optional gender filter
-    - breed: Optional breed filter (for consistency)
+    - species: Required species filter (one or several)
+    - status, gender, breed: Optional filters, repeat for any of several values
+    - age_min, age_max, intake_from, intake_to: Optional animal ranges
     - start_date: Optional start date filter (YYYY-MM-DD format)
     - end_date: Optional end date filter (YYYY-MM-DD format)
     
     Returns medical visit counts grouped by breed for the selected species
     """
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB error")
     
-    if not species:
+    if not filters.get('species'):
         return {
             'labels': [],
             'data': [],
             'message': 'Please select a species to view medical visits by breed'
         }
     
-    # Build animal filter
-    animal_filter = build_animal_filter(species=species, status=status, gender=gender, breed=breed)
-    
-    # Get matching animal IDs
-    matching_animals = set()
-    if animal_filter:
-        for animal in db.animals.find(animal_filter):
-            matching_animals.add(str(animal['_id']))
-    
-    medical_records = list(db.medical_records.find())
-    breed_count = Counter()
+    # Build animal filter (always includes species)
+    animal_filter = filters.query()
     
     start_dt, end_dt, date_metadata = parse_date_range(start_date, end_date)
     
-    for record in medical_records:
-        # Filter by animal if filters are provided
-        if animal_filter and str(record.get('animal_id')) not in matching_animals:
-            continue
-        
-        visit_date = record.get('visit_date', '')
-        animal_id = record.get('animal_id')
-        
-        # Apply date filter if provided
-        if visit_date:
-            try:
-                date_obj = datetime.strptime(str(visit_date), '%Y-%m-%d')
-                if start_dt and date_obj < start_dt:
-                    continue
-                if end_dt and date_obj > end_dt:
-                    continue
-            except (ValueError, TypeError):
-                continue
-        
-        # Get animal breed for selected species
-        if animal_id:
-            try:
-                animal = db.animals.find_one({'_id': ObjectId(animal_id)})
-                if animal and animal.get('species') == species:
-                    breed_name = animal.get('breed', 'Unknown')
-                    breed_count[breed_name] += 1
-            except Exception:
-                continue
+    # Filter by visit date in the query; the animal filter runs inside the join
+    record_filter = {}
+    visit_range = date_range_filter(start_dt, end_dt)
+    if visit_range:
+        record_filter['visit_date'] = visit_range
+    
+    # Count visits per animal first, then join each matching animal once on _id
+    pipeline = [
+        {'$match': record_filter},
+        {'$group': {'_id': '$animal_id', 'visits': {'$sum': 1}}},
+        {'$lookup': {
+            'from': 'animals', 'localField': '_id', 'foreignField': '_id',
+            'pipeline': [{'$match': animal_filter}] if animal_filter else [], 'as': 'animal'
+        }},
+        {'$unwind': '$animal'},
+        {'$group': {'_id': {'$ifNull': ['$animal.breed', 'Unknown']}, 'count': {'$sum': '$visits'}}}
+    ]
+    breed_count = Counter({row['_id']: row['count'] for row in db.medical_records.aggregate(pipeline)})
     
     # Sort by count descending
     sorted_breeds = sorted(breed_count.items(), key=lambda x: x[1], reverse=True)
@@ -3,7 +3,7 @@ Dashboard Routes
 Main dashboard page with statistics
 """
 
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from backend.database.connection import get_database
@@ -16,8 +16,6 @@ templates = Jinja2Templates(directory="frontend/templates")
 async def dashboard_page(request: Request):
     """Render dashboard page with real-time statistics"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB connection error")
     
     # Calculate volunteer stats
     total_activities = db.volunteer_activities.count_documents({})
@@ -0,0 +1,44 @@
+"""
+Health Routes
+Liveness and readiness probes for load balancers and orchestrators
+"""
+
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from typing import Dict
+
+from backend.database.connection import breaker, get_database, ping_database
+
+router = APIRouter()
+
+
+def connect_and_ping() -> float:
+    """Connect if needed (get_database pings on first connect), then ping; latency in ms"""
+    get_database()
+    return ping_database()
+
+
+@router.get("/live", response_model=Dict)
+async def liveness():
+    """The process is up and serving requests (doesn't touch the database)"""
+    return {'status': 'ok'}
+
+
+@router.get("/ready", response_model=Dict)
+async def readiness():
+    """Ready when MongoDB answers a ping; 503 while the circuit breaker is open"""
+    if not breaker.is_open:
+        try:
+            # Off the event loop - the first connect and a hung server must not stall other requests
+            latency_ms = await asyncio.to_thread(connect_and_ping)
+            return {'status': 'ok', 'database': {**breaker.snapshot(), 'latency_ms': round(latency_ms, 2)}}
+        except Exception:
+            pass
+
+    return JSONResponse(
+        status_code=503,
+        content={'status': 'unavailable', 'database': breaker.snapshot()},
+        headers={'Retry-After': str(max(1, round(breaker.retry_after())))}
+    )
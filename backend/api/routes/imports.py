@@ -0,0 +1,60 @@
+"""
+Import Routes
+Upload CSV/Excel files into the collections
+"""
+
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException, Path, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
+from typing import Dict, Optional
+
+from backend.config import IMPORT_BATCH_SIZE
+from backend.database.connection import get_database
+from backend.importer import IMPORT_TARGETS, iter_rows, run_import
+
+router = APIRouter()
+
+
+@router.post("/{target}", response_model=Dict)
+async def import_file(
+    target: str = Path(..., description=f"One of: {', '.join(IMPORT_TARGETS)}"),
+    file: UploadFile = File(..., description="CSV or .xlsx file with a header row"),
+    dry_run: bool = Query(False, description="Validate only, don't write anything"),
+    progress: bool = Query(False, description="Stream one JSON line per batch instead of a single summary"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Rows per batch")
+):
+    """Import a spreadsheet into a collection
+
+    Name columns (animal_name, volunteer_name) are resolved to IDs, rows are
+    validated and inserted in batches, and failures are reported by row number.
+    """
+    db = get_database()
+
+    if target not in IMPORT_TARGETS:
+        raise HTTPException(status_code=404, detail=f"Unknown import target. Must be one of: {', '.join(IMPORT_TARGETS)}")
+
+    try:
+        rows = iter_rows(file.file, file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    reports = run_import(db, rows, target, dry_run=dry_run, batch_size=batch_size or IMPORT_BATCH_SIZE)
+
+    if progress:
+        # Sync generator - Starlette runs it in a worker thread, one batch per line
+        return StreamingResponse((json.dumps(report) + "\n" for report in reports),
+                                 media_type="application/x-ndjson")
+
+    def last_report():
+        summary = None
+        for summary in reports:
+            pass
+        return summary
+
+    try:
+        # In a worker thread so a large file doesn't block the event loop
+        return await asyncio.to_thread(last_report)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
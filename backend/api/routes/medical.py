@@ -3,14 +3,19 @@ Medical Records Routes
 CRUD operations for medical records
 """
 
-from fastapi import APIRouter, Request, HTTPException, Path
+from fastapi import APIRouter, Request, HTTPException, Path, Body
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from bson import ObjectId
-from typing import List
+from typing import List, Dict, Any
 
 from backend.database.connection import get_database, serialize_doc
-from backend.models import MedicalRecordCreate, MedicalRecordUpdate, MedicalRecordResponse, SuccessResponse
+from backend.database.writes import insert_and_return, update_and_return
+from backend.database.bulk import bulk_create
+from backend.config import BULK_MAX_ITEMS
+from backend.references import find_by_ids, refs_to_storage
+from backend.analytics.versions import mark_changed, on_inserted_mark_changed
+from backend.models import MedicalRecordCreate, MedicalRecordUpdate, MedicalRecordResponse, SuccessResponse, BulkCreateResponse
 
 router = APIRouter()
 templates = Jinja2Templates(directory="frontend/templates")
@@ -20,18 +25,16 @@ templates = Jinja2Templates(directory="frontend/templates")
 async def medical_page(request: Request):
     """Render medical records management page"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
+    
+    records = list(db.medical_records.find())
+    # Animal names for display, with one query
+    animals = find_by_ids(db.animals, (r.get('animal_id') for r in records), {'name': 1})
     
     records_list = []
-    # Loop through records and enrich with animal names for display
-    for record in db.medical_records.find():
+    for record in records:
+        animal = animals.get(record.get('animal_id'), {})
         record_doc = serialize_doc(record)
-        try:
-            animal = db.animals.find_one({'_id': ObjectId(record['animal_id'])})
-            record_doc['animal_name'] = animal.get('name', 'Unknown') if animal else 'Unknown'
-        except (KeyError, TypeError):
-            record_doc['animal_name'] = 'Unknown'
+        record_doc['animal_name'] = animal.get('name', 'Unknown')
         records_list.append(record_doc)
     
     return templates.TemplateResponse("medical.html", {"request": request, "records": records_list})
@@ -40,8 +43,6 @@ async def medical_page(request: Request):
 @router.get("", response_model=List[MedicalRecordResponse])
 async def get_medical_records():
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
     
     records_list = [serialize_doc(r) for r in db.medical_records.find()]
     return records_list
@@ -51,8 +52,6 @@ async def get_medical_records():
 async def create_medical_record(record: MedicalRecordCreate):
     """Create a new medical record - validates animal exists first"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
     
     # Make sure the animal actually exists before creating record
     try:
@@ -65,64 +64,77 @@ async def create_medical_record(record: MedicalRecordCreate):
         raise HTTPException(status_code=404, detail="Animal not found")
     
     record_dict = record.dict()
-    result = db.medical_records.insert_one(record_dict)
-    record_dict['_id'] = str(result.inserted_id)
-    return record_dict
+    created = insert_and_return(db.medical_records, record_dict)
+    mark_changed('medical_records')
+    return created
+
+
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_medical_records_bulk(items: List[Dict[str, Any]] = Body(...)):
+    """Import a batch of medical records - animal IDs are checked with a single query"""
+    db = get_database()
+    
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {BULK_MAX_ITEMS})")
+    
+    return bulk_create(db, 'medical_records', items, MedicalRecordCreate,
+                       references={'animal_id': 'animals'},
+                       on_inserted=on_inserted_mark_changed('medical_records'))
 
 
 @router.get("/{record_id}", response_model=MedicalRecordResponse)
 async def get_medical_record(record_id: str = Path(...)):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
     
     try:
-        record = db.medical_records.find_one({'_id': ObjectId(record_id)})
-        if not record:
-            raise HTTPException(status_code=404, detail="Record not found")
-        return serialize_doc(record)
+        record_obj_id = ObjectId(record_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid record ID")
+    
+    record = db.medical_records.find_one({'_id': record_obj_id})
+    if not record:
+        raise HTTPException(status_code=404, detail="Record not found")
+    return serialize_doc(record)
 
 
 @router.put("/{record_id}", response_model=MedicalRecordResponse)
 async def update_medical_record(record_id: str = Path(...), record: MedicalRecordUpdate = None):
     # Update existing medical record
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
     
     try:
-        update_data = {k: v for k, v in record.dict().items() if v is not None}
-        if not update_data:
-            raise HTTPException(status_code=400, detail="No fields to update")
-        
-        result = db.medical_records.update_one({'_id': ObjectId(record_id)}, {'$set': update_data})
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Medical record not found")
-        
-        updated_record = db.medical_records.find_one({'_id': ObjectId(record_id)})
-        return serialize_doc(updated_record)
-    except HTTPException:
-        raise
+        record_obj_id = ObjectId(record_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid medical record ID")
+    
+    update_data = {k: v for k, v in record.dict().items() if v is not None}
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    try:
+        refs_to_storage(update_data)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid animal ID format")
+    
+    updated_record = update_and_return(db.medical_records, record_obj_id, update_data)
+    if updated_record is None:
+        raise HTTPException(status_code=404, detail="Medical record not found")
+    mark_changed('medical_records')
+    return updated_record
 
 
 @router.delete("/{record_id}", response_model=SuccessResponse)
 async def delete_medical_record(record_id: str = Path(...)):
     # Note: medical records should probably be kept for history, but allowing delete for now
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database unavailable")
     
     try:
-        result = db.medical_records.delete_one({'_id': ObjectId(record_id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Medical record not found")
-        return SuccessResponse(success=True, message="Medical record deleted successfully")
-    except HTTPException:
-        raise
+        record_obj_id = ObjectId(record_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid medical record ID")
+    
+    result = db.medical_records.delete_one({'_id': record_obj_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Medical record not found")
+    mark_changed('medical_records')
+    return SuccessResponse(success=True, message="Medical record deleted successfully")
 
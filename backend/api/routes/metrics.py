@@ -0,0 +1,17 @@
+"""
+Metrics Routes
+Prometheus scrape endpoint
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from backend.monitoring.metrics import render_metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """Expose request, MongoDB command and connection pool metrics"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
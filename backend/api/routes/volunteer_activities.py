@@ -3,19 +3,25 @@ Volunteer Activities Routes
 CRUD operations for volunteer activities
 """
 
-from fastapi import APIRouter, Request, HTTPException, Path, Query
+from fastapi import APIRouter, Request, HTTPException, Path, Query, Body
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from bson import ObjectId
-from typing import List, Optional
+from typing import List, Optional, Dict, Any
 from datetime import datetime
 
 from backend.database.connection import get_database, serialize_doc
+from backend.database.writes import insert_and_return, update_and_return
+from backend.database.bulk import bulk_create
+from backend.database.activity_buffer import get_activity_buffer, MissingReferenceError
+from backend.config import BULK_MAX_ITEMS, ACTIVITY_BUFFER_ENABLED
+from backend.references import find_by_ids, refs_to_storage
 from backend.models import (
     VolunteerActivityCreate, 
     VolunteerActivityUpdate, 
     VolunteerActivityResponse, 
-    SuccessResponse
+    SuccessResponse,
+    BulkCreateResponse
 )
 
 router = APIRouter()
@@ -41,26 +47,20 @@ ACTIVITY_TYPES = [
 async def volunteer_activities_page(request: Request):
     """Render volunteer activities management page"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB error")
+    
+    # The page lists every volunteer and animal anyway, so names come from those lists
+    volunteers_list = [serialize_doc(v) for v in db.volunteers.find()]
+    animals_list = [serialize_doc(a) for a in db.animals.find()]
+    volunteer_names = {v['_id']: v.get('name', 'Unknown') for v in volunteers_list}
+    animal_names = {a['_id']: a.get('name', 'Unknown') for a in animals_list}
     
     activities_list = []
     for activity in db.volunteer_activities.find().sort("activity_date", -1):
         activity_doc = serialize_doc(activity)
-        # Get volunteer and animal names
-        try:
-            volunteer = db.volunteers.find_one({'_id': ObjectId(activity['volunteer_id'])})
-            animal = db.animals.find_one({'_id': ObjectId(activity['animal_id'])})
-            activity_doc['volunteer_name'] = volunteer.get('name', 'Unknown') if volunteer else 'Unknown'
-            activity_doc['animal_name'] = animal.get('name', 'Unknown') if animal else 'Unknown'
-        except Exception:
-            activity_doc['volunteer_name'] = 'Unknown'
-            activity_doc['animal_name'] = 'Unknown'
+        activity_doc['volunteer_name'] = volunteer_names.get(activity_doc.get('volunteer_id'), 'Unknown')
+        activity_doc['animal_name'] = animal_names.get(activity_doc.get('animal_id'), 'Unknown')
         activities_list.append(activity_doc)
     
-    volunteers_list = [serialize_doc(v) for v in db.volunteers.find()]
-    animals_list = [serialize_doc(a) for a in db.animals.find()]
-    
     return templates.TemplateResponse("volunteer_activities.html", {
         "request": request,
         "activities": activities_list,
@@ -77,14 +77,15 @@ async def get_volunteer_activities(
 ):
     """Get all volunteer activities with optional filters"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB error")
     
     filter_dict = {}
-    if volunteer_id:
-        filter_dict['volunteer_id'] = volunteer_id
-    if animal_id:
-        filter_dict['animal_id'] = animal_id
+    try:
+        if volunteer_id:
+            filter_dict['volunteer_id'] = ObjectId(volunteer_id)
+        if animal_id:
+            filter_dict['animal_id'] = ObjectId(animal_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid volunteer or animal ID")
     
     activities = [serialize_doc(a) for a in db.volunteer_activities.find(filter_dict).sort("activity_date", -1)]
     return activities
@@ -94,8 +95,6 @@ async def get_volunteer_activities(
 async def create_volunteer_activity(activity: VolunteerActivityCreate):
     """Create a new volunteer activity"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB error")
     
     # Validate IDs first, then check existence
     try:
@@ -104,6 +103,13 @@ async def create_volunteer_activity(activity: VolunteerActivityCreate):
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid ID format")
     
+    if ACTIVITY_BUFFER_ENABLED:
+        # Write-behind mode: batched with other activities, returns once the batch is written
+        try:
+            return await get_activity_buffer(db).submit(activity.dict())
+        except MissingReferenceError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    
     # Check both exist in database
     volunteer = db.volunteers.find_one({'_id': volunteer_id_obj})
     if not volunteer:
@@ -114,73 +120,79 @@ async def create_volunteer_activity(activity: VolunteerActivityCreate):
         raise HTTPException(status_code=404, detail="Animal not found")
     
     activity_dict = activity.dict()
-    result = db.volunteer_activities.insert_one(activity_dict)
-    activity_dict['_id'] = str(result.inserted_id)
-    return activity_dict
+    return insert_and_return(db.volunteer_activities, activity_dict)
+
+
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_volunteer_activities_bulk(items: List[Dict[str, Any]] = Body(...)):
+    """Log a batch of volunteer activities - volunteer and animal IDs checked in one query each"""
+    db = get_database()
+    
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {BULK_MAX_ITEMS})")
+    
+    return bulk_create(db, 'volunteer_activities', items, VolunteerActivityCreate,
+                       references={'volunteer_id': 'volunteers', 'animal_id': 'animals'})
 
 
 @router.get("/{activity_id}", response_model=VolunteerActivityResponse)
 async def get_volunteer_activity(activity_id: str = Path(...)):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB error")
     
     try:
-        activity = db.volunteer_activities.find_one({'_id': ObjectId(activity_id)})
-        if not activity:
-            raise HTTPException(status_code=404, detail="Activity not found")
-        return serialize_doc(activity)
+        activity_obj_id = ObjectId(activity_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid activity ID")
+    
+    activity = db.volunteer_activities.find_one({'_id': activity_obj_id})
+    if not activity:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    return serialize_doc(activity)
 
 
 @router.put("/{activity_id}", response_model=VolunteerActivityResponse)
 async def update_volunteer_activity(activity_id: str = Path(...), activity: VolunteerActivityUpdate = None):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB error")
     
     try:
-        update_data = {k: v for k, v in activity.dict().items() if v is not None}
-        if not update_data:
-            raise HTTPException(status_code=400, detail="No fields to update")
-        
-        result = db.volunteer_activities.update_one({'_id': ObjectId(activity_id)}, {'$set': update_data})
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Activity not found")
-        
-        updated_activity = db.volunteer_activities.find_one({'_id': ObjectId(activity_id)})
-        return serialize_doc(updated_activity)
-    except HTTPException:
-        raise
+        activity_obj_id = ObjectId(activity_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid activity ID")
+    
+    update_data = {k: v for k, v in activity.dict().items() if v is not None}
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    try:
+        refs_to_storage(update_data)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid volunteer or animal ID format")
+    
+    updated_activity = update_and_return(db.volunteer_activities, activity_obj_id, update_data)
+    if updated_activity is None:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    return updated_activity
 
 
 @router.delete("/{activity_id}", response_model=SuccessResponse)
 async def delete_volunteer_activity(activity_id: str = Path(...)):
     # Allow deletion but might want to keep for reporting later
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB error")
     
     try:
-        result = db.volunteer_activities.delete_one({'_id': ObjectId(activity_id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Activity not found")
-        return SuccessResponse(success=True, message="Activity deleted successfully")
-    except HTTPException:
-        raise
+        activity_obj_id = ObjectId(activity_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid activity ID")
+    
+    result = db.volunteer_activities.delete_one({'_id': activity_obj_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Activity not found")
+    return SuccessResponse(success=True, message="Activity deleted successfully")
 
 
 @router.get("/stats/summary", response_model=dict)
 async def get_volunteer_stats():
     """Get volunteer statistics"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="DB error")
     
     activities = list(db.volunteer_activities.find())
     
@@ -202,17 +214,15 @@ async def get_volunteer_stats():
             volunteer_hours[volunteer_id] = volunteer_hours.get(volunteer_id, 0) + minutes
     
     top_volunteers = sorted(volunteer_hours.items(), key=lambda x: x[1], reverse=True)[:5]
+    volunteers = find_by_ids(db.volunteers, (volunteer_id for volunteer_id, _ in top_volunteers), {'name': 1})
     top_volunteers_list = []
     for volunteer_id, minutes in top_volunteers:
-        try:
-            volunteer = db.volunteers.find_one({'_id': ObjectId(volunteer_id)})
-            if volunteer:
-                top_volunteers_list.append({
-                    'name': volunteer.get('name', 'Unknown'),
-                    'hours': round(minutes / 60, 1)
-                })
-        except Exception:
-            continue
+        volunteer = volunteers.get(volunteer_id)
+        if volunteer:
+            top_volunteers_list.append({
+                'name': volunteer.get('name', 'Unknown'),
+                'hours': round(minutes / 60, 1)
+            })
     
     return {
         'total_hours': round(total_hours, 1),
@@ -3,15 +3,22 @@ Volunteers Routes
 CRUD operations for volunteers
 """
 
-from fastapi import APIRouter, Request, HTTPException, Path
+from fastapi import APIRouter, Request, HTTPException, Path, Query, Body
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from bson import ObjectId
-from typing import List
+from typing import List, Optional, Dict, Any
 
 from backend.database.connection import get_database, serialize_doc
-from backend.models import VolunteerCreate, VolunteerUpdate, VolunteerResponse, SuccessResponse
-from backend.volunteer_skills import VOLUNTEER_SKILLS
+from backend.database.writes import insert_and_return, update_and_return
+from backend.database.bulk import bulk_create
+from backend.config import BULK_MAX_ITEMS
+from backend.models import VolunteerCreate, VolunteerUpdate, VolunteerResponse, SuccessResponse, BulkCreateResponse
+from backend.volunteer_skills import VOLUNTEER_SKILLS, get_skills_for_species
+from backend.volunteer_availability import (
+    DAYS, day_index, parse_availability, fill_availability_slots, get_volunteer_slots, query_bitmap,
+    get_availability_index, invalidate_availability_index
+)
 
 router = APIRouter()
 templates = Jinja2Templates(directory="frontend/templates")
@@ -21,8 +28,6 @@ templates = Jinja2Templates(directory="frontend/templates")
 async def volunteers_page(request: Request):
     """Render volunteers management page"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Connection failed")
     
     volunteers_list = []
     for v in db.volunteers.find():
@@ -45,8 +50,6 @@ async def volunteers_page(request: Request):
 async def get_volunteers():
     """Get all volunteers - handles legacy string skills format"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Connection failed")
     
     volunteers_list = []
     for v in db.volunteers.find():
@@ -56,74 +59,123 @@ async def get_volunteers():
             volunteer_doc['skills'] = [volunteer_doc['skills']]
         elif volunteer_doc.get('skills') is None:
             volunteer_doc['skills'] = []
+        volunteer_doc['availability_slots'] = get_volunteer_slots(volunteer_doc)
         volunteers_list.append(volunteer_doc)
     return volunteers_list
 
 
+@router.get("/available", response_model=dict)
+async def get_available_volunteers(
+    day: str = Query(..., description="Day name (Saturday, Sat) or 0-6 with Monday = 0"),
+    start_hour: int = Query(..., ge=0, le=23, description="Start hour (0-23)"),
+    end_hour: Optional[int] = Query(None, ge=1, le=24, description="End hour, exclusive (defaults to start_hour + 1)"),
+    skill: Optional[List[str]] = Query(None, description="Required skill, repeat for any-of matching"),
+    species: Optional[str] = Query(None, description="Use the skills relevant to this species when no skill is given"),
+    partial: bool = Query(False, description="Match volunteers free for any part of the window")
+):
+    """Find volunteers with matching skills who are free during a time window"""
+    db = get_database()
+    
+    day_num = int(day) if day.isdigit() else day_index(day)
+    if day_num is None or not 0 <= day_num < len(DAYS):
+        raise HTTPException(status_code=400, detail=f"Invalid day. Must be one of: {', '.join(DAYS)}")
+    
+    if end_hour is None:
+        end_hour = start_hour + 1
+    if end_hour <= start_hour:
+        raise HTTPException(status_code=400, detail="end_hour must be after start_hour")
+    
+    skills = skill or (get_skills_for_species(species) if species else None)
+    
+    index = get_availability_index(db)
+    matches = index.find_available(query_bitmap(day_num, start_hour, end_hour), skills, require_all=not partial)
+    
+    return {
+        'day': DAYS[day_num],
+        'start_hour': start_hour,
+        'end_hour': end_hour,
+        'skills': skills or [],
+        'volunteers': matches
+    }
+
+
 @router.post("", response_model=VolunteerResponse)
 async def create_volunteer(volunteer: VolunteerCreate):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Connection failed")
     
     volunteer_dict = volunteer.dict()
-    result = db.volunteers.insert_one(volunteer_dict)
-    volunteer_dict['_id'] = str(result.inserted_id)
-    return volunteer_dict
+    fill_availability_slots(volunteer_dict)
+    created_volunteer = insert_and_return(db.volunteers, volunteer_dict)
+    invalidate_availability_index()
+    return created_volunteer
+
+
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_volunteers_bulk(items: List[Dict[str, Any]] = Body(...)):
+    """Create many volunteers in one request - availability slots are parsed per item"""
+    db = get_database()
+    
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Too many items (max {BULK_MAX_ITEMS})")
+    
+    result = bulk_create(db, 'volunteers', items, VolunteerCreate, prepare=fill_availability_slots)
+    if result['inserted']:
+        invalidate_availability_index()
+    return result
 
 
 @router.get("/{volunteer_id}", response_model=VolunteerResponse)
 async def get_volunteer(volunteer_id: str = Path(...)):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Connection failed")
     
     try:
-        volunteer = db.volunteers.find_one({'_id': ObjectId(volunteer_id)})
-        if not volunteer:
-            raise HTTPException(status_code=404, detail="Volunteer not found")
-        return serialize_doc(volunteer)
+        volunteer_obj_id = ObjectId(volunteer_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Bad volunteer ID")
+    
+    volunteer = db.volunteers.find_one({'_id': volunteer_obj_id})
+    if not volunteer:
+        raise HTTPException(status_code=404, detail="Volunteer not found")
+    return serialize_doc(volunteer)
 
 
 @router.put("/{volunteer_id}", response_model=VolunteerResponse)
 async def update_volunteer(volunteer_id: str = Path(...), volunteer: VolunteerUpdate = None):
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Connection failed")
     
     try:
-        update_data = {k: v for k, v in volunteer.dict().items() if v is not None}
-        if not update_data:
-            raise HTTPException(status_code=400, detail="No fields to update")
-        
-        result = db.volunteers.update_one({'_id': ObjectId(volunteer_id)}, {'$set': update_data})
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Volunteer not found")
-        
-        updated_volunteer = db.volunteers.find_one({'_id': ObjectId(volunteer_id)})
-        return serialize_doc(updated_volunteer)
-    except HTTPException:
-        raise
+        volunteer_obj_id = ObjectId(volunteer_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid volunteer ID")
+    
+    update_data = {k: v for k, v in volunteer.dict().items() if v is not None}
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    
+    # Keep the slot bitmap in step with a changed free-text value
+    if 'availability' in update_data and 'availability_slots' not in update_data:
+        update_data['availability_slots'] = parse_availability(update_data['availability'])
+    
+    updated_volunteer = update_and_return(db.volunteers, volunteer_obj_id, update_data)
+    if updated_volunteer is None:
+        raise HTTPException(status_code=404, detail="Volunteer not found")
+    invalidate_availability_index()
+    return updated_volunteer
 
 
 @router.delete("/{volunteer_id}", response_model=SuccessResponse)
 async def delete_volunteer(volunteer_id: str = Path(...)):
     """Delete a volunteer"""
     db = get_database()
-    if db is None:
-        raise HTTPException(status_code=500, detail="Connection failed")
     
     try:
-        result = db.volunteers.delete_one({'_id': ObjectId(volunteer_id)})
-        if result.deleted_count == 0:
-            raise HTTPException(status_code=404, detail="Volunteer not found")
-        return SuccessResponse(success=True, message="Volunteer deleted successfully")
-    except HTTPException:
-        raise
+        volunteer_obj_id = ObjectId(volunteer_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid volunteer ID")
+    
+    result = db.volunteers.delete_one({'_id': volunteer_obj_id})
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Volunteer not found")
+    invalidate_availability_index()
+    return SuccessResponse(success=True, message="Volunteer deleted successfully")
 
@@ -9,5 +9,79 @@ from dotenv import load_dotenv
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-DB_NAME = "pet_adoption"
+DB_NAME = os.getenv("DB_NAME", "pet_adoption")
 
+# How long a request may wait for MongoDB before failing (the driver default is 30s)
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "2000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "2000"))
+# Socket read timeout; unset means wait as long as the server takes
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS")) if os.getenv("MONGO_SOCKET_TIMEOUT_MS") else None
+
+# Connection pool: minPoolSize connections are opened at startup and kept warm
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS")) if os.getenv("MONGO_MAX_IDLE_TIME_MS") else None
+# How long a request waits for a free pooled connection; unset waits up to the server selection timeout
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS")) if os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS") else None
+# Wire compression, e.g. "zstd,snappy,zlib" (zstd and snappy need the zstandard / python-snappy packages)
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+
+# Time budget per request, sent to MongoDB as maxTimeMS (0 turns deadlines off).
+# Per-route overrides as "prefix=seconds" pairs, e.g. "/api/charts=5,/api/search=2"
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "5"))
+REQUEST_DEADLINES = os.getenv("REQUEST_DEADLINES", "")
+
+# Circuit breaker: reconnect backoff starts at the base delay and doubles up to the max (seconds)
+DB_BREAKER_BASE_DELAY = float(os.getenv("DB_BREAKER_BASE_DELAY", "0.5"))
+DB_BREAKER_MAX_DELAY = float(os.getenv("DB_BREAKER_MAX_DELAY", "30"))
+# Consecutive connection failures before the circuit opens
+DB_BREAKER_FAILURE_THRESHOLD = int(os.getenv("DB_BREAKER_FAILURE_THRESHOLD", "3"))
+# Seconds between background health pings while the database is up
+DB_HEALTH_PROBE_INTERVAL = float(os.getenv("DB_HEALTH_PROBE_INTERVAL", "10"))
+
+
+# Maximum number of documents accepted by a single bulk create request
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "5000"))
+
+# Rows validated and written per batch by the CSV/Excel importer
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+# Write-behind batching for volunteer activity logging (off by default)
+ACTIVITY_BUFFER_ENABLED = os.getenv("ACTIVITY_BUFFER_ENABLED", "false").lower() in ("1", "true", "yes")
+ACTIVITY_BUFFER_MAX_DOCS = int(os.getenv("ACTIVITY_BUFFER_MAX_DOCS", "200"))
+ACTIVITY_BUFFER_MAX_DELAY_MS = int(os.getenv("ACTIVITY_BUFFER_MAX_DELAY_MS", "50"))
+
+# Request/database metrics exposed at /metrics (Prometheus text format)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# Slow query log: commands slower than the threshold are kept (last N) with a
+# sampled explain() per query shape, viewable at /admin/slow-queries
+SLOW_QUERY_LOG_ENABLED = os.getenv("SLOW_QUERY_LOG_ENABLED", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "200"))
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv("SLOW_QUERY_EXPLAIN_INTERVAL", "60"))
+
+# Shared secret for /admin endpoints (sent as X-Admin-Token); admin endpoints are off when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# N+1 query detection: "off", "warn" (log + X-N-Plus-One header) or "strict" (fail the request)
+N_PLUS_ONE_DETECTION = os.getenv("N_PLUS_ONE_DETECTION", "off").lower()
+# A query shape repeated more than this many times in one request is flagged
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+
+# Per-request sampling profiler, triggered by an admin request sending X-Profile: 1
+# (or ?_profile=1); results are kept in memory and listed at /admin/profiles
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_STORE_SIZE = int(os.getenv("PROFILE_STORE_SIZE", "20"))
+
+# In-memory columnar copy of the animals (species, breed, status, gender, age) answering
+# the chart distributions and filter lists; reloaded in full every N seconds (0 = load once)
+ANALYTICS_SNAPSHOT_ENABLED = os.getenv("ANALYTICS_SNAPSHOT_ENABLED", "false").lower() in ("1", "true", "yes")
+ANALYTICS_SNAPSHOT_REFRESH_SECONDS = float(os.getenv("ANALYTICS_SNAPSHOT_REFRESH_SECONDS", "300"))
+
+# Cached analytics (occupancy) are recomputed after a write through the API or after
+# N seconds, which picks up writes made outside this process; up to SIZE filters are kept
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "600"))
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "32"))
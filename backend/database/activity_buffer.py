@@ -0,0 +1,144 @@
+"""
+Activity Write Buffer
+Optional write-behind batching for volunteer activity logging
+"""
+
+import asyncio
+import contextvars
+from typing import Dict, List, Optional, Tuple
+
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+from backend.config import ACTIVITY_BUFFER_MAX_DOCS, ACTIVITY_BUFFER_MAX_DELAY_MS
+from backend.database.bulk import find_existing_ids
+from backend.database.connection import serialize_doc
+from backend.dates import dates_to_storage
+from backend.references import refs_to_storage
+
+
+class MissingReferenceError(Exception):
+    """Raised when an activity points at a volunteer or animal that doesn't exist"""
+
+
+# Reference field, collection it points at, and the error when it doesn't exist
+REFERENCES = [
+    ('volunteer_id', 'volunteers', "Volunteer not found"),
+    ('animal_id', 'animals', "Animal not found"),
+]
+
+
+class ActivityWriteBuffer:
+    """Collects activity inserts and writes them with one insert_many
+
+    A batch is flushed when it reaches max_docs or max_delay_ms after its
+    first document arrived, whichever comes first. submit() only returns once
+    the batch containing the document has been written, so callers still get
+    a real acknowledgement (and the new _id).
+
+    Volunteer and animal references are checked per batch, with one $in
+    query per referenced collection (as bulk_create does); activities whose
+    volunteer or animal doesn't exist fail with MissingReferenceError.
+
+    The batch's queries run in a fresh context, outside the deadline and
+    request stats of whichever request happened to start or fill the batch.
+    """
+
+    def __init__(self, db: Database, max_docs: int = ACTIVITY_BUFFER_MAX_DOCS,
+                 max_delay_ms: int = ACTIVITY_BUFFER_MAX_DELAY_MS):
+        self.db = db
+        self.max_docs = max_docs
+        self.max_delay = max_delay_ms / 1000
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._closed = False
+
+    async def submit(self, activity: dict) -> dict:
+        """Queue an activity and wait until the batch holding it is written"""
+        if self._closed:
+            raise RuntimeError("Activity buffer is closed")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((refs_to_storage(dates_to_storage(activity)), future))
+        if len(self._pending) >= self.max_docs:
+            await self.flush()
+        elif self._timer is None:
+            # Not a child of this request: no pymongo.timeout() or RequestStats carried over
+            self._timer = contextvars.Context().run(asyncio.create_task, self._flush_after_delay())
+        return await future
+
+    async def _flush_after_delay(self):
+        await asyncio.sleep(self.max_delay)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Write everything queued so far and resolve the waiting requests"""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        docs = [doc for doc, _ in batch]
+        try:
+            # Keep the event loop free while the driver blocks, in a context of its own
+            failed = await asyncio.get_running_loop().run_in_executor(
+                None, contextvars.Context().run, self._write, docs
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for position, (doc, future) in enumerate(batch):
+            if future.done():
+                continue
+            if position in failed:
+                future.set_exception(failed[position])
+            else:
+                future.set_result(serialize_doc(doc))
+
+    def _write(self, docs: List[dict]) -> Dict[int, Exception]:
+        """Check the batch's references and insert the valid documents, returns errors by position"""
+        failed: Dict[int, Exception] = {}
+        for field, collection, message in REFERENCES:
+            existing = find_existing_ids(self.db, collection, (str(doc[field]) for doc in docs))
+            for position, doc in enumerate(docs):
+                if position not in failed and str(doc[field]) not in existing:
+                    failed[position] = MissingReferenceError(message)
+
+        valid = [position for position in range(len(docs)) if position not in failed]
+        if valid:
+            try:
+                self.db.volunteer_activities.insert_many([docs[position] for position in valid], ordered=False)
+            except BulkWriteError as e:
+                for write_error in e.details.get('writeErrors', []):
+                    failed[valid[write_error['index']]] = RuntimeError(write_error.get('errmsg', 'Write failed'))
+        return failed
+
+    async def close(self):
+        """Stop accepting new activities and flush what is queued"""
+        self._closed = True
+        await self.flush()
+
+
+_buffer: Optional[ActivityWriteBuffer] = None
+
+
+def get_activity_buffer(db: Database) -> ActivityWriteBuffer:
+    """Return the process-wide activity buffer, creating it on first use"""
+    global _buffer
+    if _buffer is None:
+        _buffer = ActivityWriteBuffer(db)
+    return _buffer
+
+
+async def close_activity_buffer():
+    """Drain the activity buffer (called from the lifespan shutdown hook)"""
+    global _buffer
+    if _buffer is not None:
+        await _buffer.close()
+        _buffer = None
@@ -0,0 +1,116 @@
+"""
+Bulk Write Helpers
+Validate and insert batches of documents with per-item results
+"""
+
+import time
+from typing import Callable, Dict, List, Optional, Type
+
+from bson import ObjectId
+from pydantic import BaseModel, ValidationError
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
+
+from backend.dates import dates_to_storage
+from backend.references import refs_to_storage
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Flatten a Pydantic ValidationError into one readable line"""
+    parts = []
+    for err in error.errors():
+        field = '.'.join(str(loc) for loc in err.get('loc', ()))
+        parts.append(f"{field}: {err.get('msg')}" if field else err.get('msg', 'Invalid value'))
+    return '; '.join(parts)
+
+
+def find_existing_ids(db: Database, collection: str, ids) -> set:
+    """Return the subset of string ids that exist in a collection (one $in query)"""
+    object_ids = []
+    for value in set(ids):
+        try:
+            object_ids.append(ObjectId(value))
+        except Exception:
+            continue
+    if not object_ids:
+        return set()
+    return {str(doc['_id']) for doc in db[collection].find({'_id': {'$in': object_ids}}, {'_id': 1})}
+
+
+def bulk_create(db: Database, collection: str, items: List[dict], model: Type[BaseModel],
+                references: Optional[Dict[str, str]] = None,
+                prepare: Optional[Callable[[dict], None]] = None,
+                on_inserted: Optional[Callable[[List[dict]], None]] = None,
+                dry_run: bool = False) -> dict:
+    """Validate items against a create model and insert the valid ones
+
+    Args:
+        db: Database handle
+        collection: Target collection name
+        items: Raw request items
+        model: Pydantic create model used for validation
+        references: Map of id field -> referenced collection, checked with one
+            $in query per referenced collection
+        prepare: Optional callback that fills derived fields on each document
+        on_inserted: Optional callback given the documents that were written
+        dry_run: Validate and check references only, without writing
+
+    Returns:
+        dict with inserted/failed counts, timing and a result per input item
+    """
+    started = time.perf_counter()
+    results: List[Optional[dict]] = [None] * len(items)
+    pending = []  # (item index, document)
+
+    for i, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[i] = {'index': i, 'success': False, 'error': 'Item must be an object'}
+            continue
+        try:
+            doc = model(**item).dict()
+        except ValidationError as e:
+            results[i] = {'index': i, 'success': False, 'error': format_validation_error(e)}
+            continue
+        if prepare:
+            prepare(doc)
+        pending.append((i, doc))
+
+    # Foreign key checks - one query per referenced collection
+    for field, ref_collection in (references or {}).items():
+        existing = find_existing_ids(db, ref_collection, (doc[field] for _, doc in pending))
+        still_pending = []
+        for i, doc in pending:
+            if doc[field] in existing:
+                still_pending.append((i, doc))
+            else:
+                results[i] = {'index': i, 'success': False, 'error': f"{field} not found: {doc[field]}"}
+        pending = still_pending
+
+    if pending and dry_run:
+        for i, _ in pending:
+            results[i] = {'index': i, 'success': True}
+    elif pending:
+        docs = [refs_to_storage(dates_to_storage(doc)) for _, doc in pending]
+        failed_positions = {}
+        try:
+            db[collection].insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for write_error in e.details.get('writeErrors', []):
+                failed_positions[write_error['index']] = write_error.get('errmsg', 'Write failed')
+        for position, (i, doc) in enumerate(pending):
+            if position in failed_positions:
+                results[i] = {'index': i, 'success': False, 'error': failed_positions[position]}
+            else:
+                results[i] = {'index': i, 'success': True, 'id': str(doc['_id'])}
+        if on_inserted:
+            on_inserted([doc for position, doc in enumerate(docs) if position not in failed_positions])
+
+    elapsed = time.perf_counter() - started
+    inserted = sum(1 for r in results if r['success'])
+    return {
+        'inserted': inserted,
+        'failed': len(items) - inserted,
+        'elapsed_ms': round(elapsed * 1000, 2),
+        'docs_per_second': round(inserted / elapsed, 1) if elapsed > 0 else 0.0,
+        'results': results
+    }
@@ -0,0 +1,93 @@
+"""
+Database Circuit Breaker
+Fails requests fast while MongoDB is unreachable and backs off reconnect attempts
+"""
+
+import random
+import threading
+import time
+from typing import Optional
+
+from backend.config import DB_BREAKER_BASE_DELAY, DB_BREAKER_MAX_DELAY, DB_BREAKER_FAILURE_THRESHOLD
+
+CLOSED = 'closed'
+OPEN = 'open'
+
+
+class DatabaseUnavailableError(Exception):
+    """Raised by get_database() while the circuit is open; served as a 503"""
+
+    def __init__(self, retry_after: float, reason: Optional[str] = None):
+        super().__init__(reason or "Database unavailable")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class CircuitBreaker:
+    """Tracks MongoDB availability
+
+    The circuit opens after failure_threshold consecutive failed pings or
+    connection errors (a single timeout doesn't take the whole app down) and
+    stays open until a reconnect attempt succeeds. Attempts are spaced with
+    exponential backoff (base_delay * 2^failures, capped at max_delay, with
+    jitter) so an outage doesn't turn into a reconnect storm.
+    """
+
+    def __init__(self, base_delay: float = DB_BREAKER_BASE_DELAY, max_delay: float = DB_BREAKER_MAX_DELAY,
+                 failure_threshold: int = DB_BREAKER_FAILURE_THRESHOLD):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = max(1, failure_threshold)
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.next_attempt_at = 0.0
+        self.last_error: Optional[str] = None
+        self.last_latency_ms: Optional[float] = None
+        self.last_checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def retry_after(self) -> float:
+        """Seconds until the next reconnect attempt"""
+        return max(0.0, self.next_attempt_at - time.monotonic())
+
+    def record_success(self, latency_ms: float):
+        with self._lock:
+            self.last_latency_ms = round(latency_ms, 2)
+            self.last_checked_at = time.time()
+            if self.state == OPEN:
+                print(f"✅ MongoDB reachable again after {self.failures} failed attempts")
+            self.state = CLOSED
+            self.failures = 0
+            self.opened_at = None
+            self.last_error = None
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            self.last_checked_at = time.time()
+            if self.state == CLOSED:
+                if self.failures < self.failure_threshold:
+                    return
+                self.opened_at = time.time()
+                print(f"⚠️  MongoDB unreachable, opening circuit: {error}")
+            self.state = OPEN
+            delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - self.failure_threshold))
+            # Jitter keeps several workers from retrying in lockstep
+            self.next_attempt_at = time.monotonic() + delay * random.uniform(0.8, 1.2)
+
+    def snapshot(self) -> dict:
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'opened_at': self.opened_at,
+            'retry_in_seconds': round(self.retry_after(), 2) if self.is_open else None,
+            'last_error': self.last_error,
+            'last_latency_ms': self.last_latency_ms,
+            'last_checked_at': self.last_checked_at,
+        }
@@ -3,36 +3,168 @@ Database Connection Module
 Handles MongoDB connection and database access
 """
 
+import threading
+import time
+
 from pymongo import MongoClient
 from pymongo.database import Database
-from backend.config import MONGO_URI, DB_NAME
+from backend.config import (
+    MONGO_URI, DB_NAME, MONGO_SERVER_SELECTION_TIMEOUT_MS, MONGO_CONNECT_TIMEOUT_MS, MONGO_SOCKET_TIMEOUT_MS,
+    MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_MAX_IDLE_TIME_MS, MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_COMPRESSORS, DB_HEALTH_PROBE_INTERVAL
+)
+from backend.dates import dates_to_api
+from backend.references import refs_to_api
+from backend.database.circuit_breaker import CircuitBreaker, DatabaseUnavailableError
+from backend.monitoring import metrics
+from backend.monitoring.listeners import build_event_listeners
 from typing import Optional
 
 _client: Optional[MongoClient] = None
 _database: Optional[Database] = None
+_connect_lock = threading.Lock()
+_probe: Optional[threading.Thread] = None
+_probe_stop = threading.Event()
+
+breaker = CircuitBreaker()
+
+
+def client_options() -> dict:
+    """MongoClient keyword arguments from config (unset options keep the driver defaults)"""
+    options = {
+        'serverSelectionTimeoutMS': MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        'connectTimeoutMS': MONGO_CONNECT_TIMEOUT_MS,
+        'socketTimeoutMS': MONGO_SOCKET_TIMEOUT_MS,
+        'maxPoolSize': MONGO_MAX_POOL_SIZE,
+        'minPoolSize': MONGO_MIN_POOL_SIZE,
+        'maxIdleTimeMS': MONGO_MAX_IDLE_TIME_MS,
+        'waitQueueTimeoutMS': MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    }
+    if MONGO_COMPRESSORS:
+        options['compressors'] = MONGO_COMPRESSORS
+    return {name: value for name, value in options.items() if value is not None}
 
 
-def get_database() -> Optional[Database]:
-    """Get MongoDB database instance"""
+def get_database() -> Database:
+    """Get MongoDB database instance
+
+    Never returns None: raises DatabaseUnavailableError (a 503) when MongoDB
+    can't be reached, straight away while the circuit breaker is open instead
+    of waiting out the server selection timeout on every request.
+    """
     global _client, _database
-    
+
+    if breaker.is_open:
+        raise DatabaseUnavailableError(breaker.retry_after(), breaker.last_error)
     if _database is not None:
         return _database
-    
-    try:
-        _client = MongoClient(MONGO_URI)
+
+    with _connect_lock:
+        if _database is not None:
+            return _database
+        if _client is None:
+            _client = MongoClient(MONGO_URI, event_listeners=build_event_listeners(), **client_options())
+        try:
+            # Test connection (failures open the circuit and are logged there)
+            ping_database(_client)
+        except Exception:
+            raise DatabaseUnavailableError(breaker.retry_after(), breaker.last_error)
         _database = _client[DB_NAME]
-        # Test connection
-        _database.command('ping')
         return _database
+
+
+def ping_database(client: Optional[MongoClient] = None) -> float:
+    """Ping MongoDB and feed the result to the circuit breaker, returns latency in ms"""
+    client = client or _client
+    if client is None:
+        raise DatabaseUnavailableError(breaker.retry_after(), "Not connected")
+    started = time.perf_counter()
+    try:
+        client.admin.command('ping')
     except Exception as e:
-        print(f"MongoDB connection error: {e}")
-        return None
+        report_database_failure(e)
+        raise
+    latency_ms = (time.perf_counter() - started) * 1000
+    breaker.record_success(latency_ms)
+    metrics.DB_CIRCUIT_OPEN.set(0)
+    metrics.DB_PING_LATENCY.set(latency_ms / 1000)
+    return latency_ms
+
+
+def report_database_failure(error: Exception):
+    """Count a connection error seen anywhere in the app (enough in a row open the circuit)"""
+    breaker.record_failure(error)
+    metrics.DB_CIRCUIT_OPEN.set(1 if breaker.is_open else 0)
+    start_health_probe()
+
+
+def _run_health_probe():
+    # While open: reconnect attempts with backoff. While closed: periodic pings
+    # so an outage is noticed (and latency reported) without waiting for a request
+    while not _probe_stop.is_set():
+        if breaker.is_open:
+            delay = breaker.retry_after()
+        elif breaker.failures:
+            # Recent failures below the threshold: confirm or clear them soon
+            delay = breaker.base_delay
+        else:
+            delay = DB_HEALTH_PROBE_INTERVAL
+        if _probe_stop.wait(delay):
+            break
+        try:
+            ping_database()
+        except Exception:
+            pass
+
+
+def start_health_probe():
+    """Start the background health probe (once per process)"""
+    global _probe
+    if _probe is not None and _probe.is_alive():
+        return
+    _probe_stop.clear()
+    _probe = threading.Thread(target=_run_health_probe, name='mongodb-health-probe', daemon=True)
+    _probe.start()
+
+
+def warm_up_pool(connections: int = MONGO_MIN_POOL_SIZE) -> float:
+    """Open `connections` pooled connections now instead of on the first requests
+
+    The pings start together so each one checks out its own connection.
+    Returns the time taken in ms.
+    """
+    client = _client
+    if client is None or connections <= 0:
+        return 0.0
+    start_together = threading.Barrier(connections)
+
+    def ping():
+        start_together.wait()
+        try:
+            client.admin.command('ping')
+        except Exception:
+            # Reported by the health probe; warm-up is best effort
+            pass
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=ping, name=f'pool-warm-up-{i}') for i in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (time.perf_counter() - started) * 1000
+
+
+def get_client() -> Optional[MongoClient]:
+    """Get the shared MongoClient (None until get_database() has connected)"""
+    return _client
 
 
 def close_database():
     """Close MongoDB connection"""
-    global _client, _database
+    global _client, _database, _probe
+    _probe_stop.set()
+    _probe = None
     if _client:
         _client.close()
         _client = None
@@ -44,5 +176,8 @@ def serialize_doc(doc: dict) -> dict:
     if doc and '_id' in doc:
         # Keep _id for Pydantic models that use alias
         doc['_id'] = str(doc['_id'])
+    if doc:
+        # Stored BSON dates go out as YYYY-MM-DD, references as id strings
+        dates_to_api(doc)
+        refs_to_api(doc)
     return doc
-
@@ -0,0 +1,100 @@
+"""
+Request Deadlines
+Per-request time budgets applied to every MongoDB operation as maxTimeMS
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+import pymongo
+from pymongo.errors import ExecutionTimeout
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from backend.config import REQUEST_DEADLINE_SECONDS, REQUEST_DEADLINES
+from backend.monitoring import metrics
+from backend.monitoring.context import route_label
+
+logger = logging.getLogger(__name__)
+
+# How early a driver timeout may fire and still count as the deadline running out
+DEADLINE_SLACK_SECONDS = 0.05
+
+# Seconds per path prefix, longest matching prefix wins; None means no deadline.
+# REQUEST_DEADLINES entries override these, REQUEST_DEADLINE_SECONDS covers the rest.
+ROUTE_DEADLINES: Dict[str, Optional[float]] = {
+    '/api/charts': 15.0,
+    '/charts': 15.0,
+    '/dashboard': 10.0,
+    # Imports stream their progress for as long as the file takes
+    '/api/import': None,
+    # The CSV export streams every matching animal, its cursor outlives any fixed budget
+    '/api/animals/export': None,
+    '/static': None,
+    '/metrics': None,
+}
+
+
+def parse_deadlines(text: str) -> Dict[str, Optional[float]]:
+    """Parse "/api/charts=5,/api/search=2,/api/import=none" into a prefix map"""
+    deadlines = {}
+    for item in text.split(','):
+        prefix, _, value = item.strip().partition('=')
+        if not prefix or not value:
+            continue
+        value = value.strip().lower()
+        deadlines[prefix.strip()] = None if value in ('none', 'off', '0') else float(value)
+    return deadlines
+
+
+_deadlines = {**ROUTE_DEADLINES, **parse_deadlines(REQUEST_DEADLINES)}
+_prefixes = sorted(_deadlines, key=len, reverse=True)
+
+
+def deadline_for(path: str) -> Optional[float]:
+    """Time budget in seconds for a request path"""
+    for prefix in _prefixes:
+        if path == prefix or path.startswith(prefix.rstrip('/') + '/'):
+            return _deadlines[prefix]
+    return REQUEST_DEADLINE_SECONDS or None
+
+
+async def deadline_middleware(request: Request, call_next):
+    """Run the request under pymongo.timeout() so each command gets the remaining budget
+
+    The driver sends the time left as maxTimeMS with every find, aggregate and
+    count, so the server abandons work the client no longer waits for. Once
+    the budget is spent, the next operation fails without reaching the server.
+    """
+    seconds = deadline_for(request.url.path)
+    if seconds is None:
+        return await call_next(request)
+    request.scope['deadline'] = seconds
+    request.scope['deadline_at'] = time.monotonic() + seconds
+    with pymongo.timeout(seconds):
+        return await call_next(request)
+
+
+def is_deadline_exceeded(request: Request, exc: Exception) -> bool:
+    """A driver timeout raised once the request's deadline had run out
+
+    Timeouts well inside the budget (e.g. server selection giving up on an
+    unreachable server) are connection failures, not spent deadlines.
+    """
+    deadline_at = request.scope.get('deadline_at')
+    if deadline_at is None or not getattr(exc, 'timeout', False):
+        return False
+    # ExecutionTimeout comes back from the server slightly before our clock runs out
+    return isinstance(exc, ExecutionTimeout) or time.monotonic() >= deadline_at - DEADLINE_SLACK_SECONDS
+
+
+def deadline_exceeded_response(request: Request) -> JSONResponse:
+    route = route_label(request.scope)
+    metrics.HTTP_DEADLINE_EXCEEDED.inc(request.method, route)
+    seconds = request.scope['deadline']
+    logger.warning("Deadline of %ss exceeded on %s %s", seconds, request.method, request.url.path)
+    return JSONResponse(status_code=504, content={
+        'detail': f"Request exceeded its {seconds:g}s time budget",
+        'route': route
+    })
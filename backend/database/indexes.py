@@ -0,0 +1,24 @@
+"""
+Indexes
+Secondary indexes the API's joins and reference lookups rely on
+"""
+
+from pymongo.database import Database
+
+# Reference fields joined with $lookup or loaded by $in, per collection
+REFERENCE_INDEXES = {
+    'adoptions': ['animal_id'],
+    'medical_records': ['animal_id'],
+    'volunteer_activities': ['animal_id', 'volunteer_id'],
+}
+
+
+def ensure_indexes(db: Database) -> None:
+    """Create the REFERENCE_INDEXES (a no-op for those that already exist)
+
+    Without them every $lookup from animals scans the whole foreign
+    collection once per animal.
+    """
+    for collection, fields in REFERENCE_INDEXES.items():
+        for field in fields:
+            db[collection].create_index(field)
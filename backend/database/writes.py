@@ -0,0 +1,37 @@
+"""
+Write Helpers
+Single round-trip insert/update helpers that hand back the stored document
+"""
+
+from typing import Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+
+from backend.database.connection import serialize_doc
+from backend.dates import dates_to_storage
+from backend.references import refs_to_storage
+
+
+def insert_and_return(collection: Collection, doc: dict) -> dict:
+    """Insert a document and return it serialized - no read-back needed
+
+    insert_one fills in the generated _id on the dict we already hold.
+    Date fields are stored as BSON dates and references as ObjectIds.
+    """
+    collection.insert_one(refs_to_storage(dates_to_storage(doc)))
+    return serialize_doc(doc)
+
+
+def update_and_return(collection: Collection, doc_id: ObjectId, update_data: dict) -> Optional[dict]:
+    """$set fields and return the updated document in one round trip
+
+    Returns None when no document matches doc_id.
+    """
+    updated = collection.find_one_and_update(
+        {'_id': doc_id},
+        {'$set': refs_to_storage(dates_to_storage(update_data))},
+        return_document=ReturnDocument.AFTER
+    )
+    return serialize_doc(updated) if updated else None
@@ -0,0 +1,78 @@
+"""
+Date Fields
+Dates are stored as BSON dates and exchanged with clients as YYYY-MM-DD strings
+"""
+
+from datetime import date, datetime
+from typing import Annotated, Optional
+
+from pydantic import BeforeValidator
+
+DATE_FORMAT = '%Y-%m-%d'
+
+# The date field of each collection
+DATE_FIELDS = {
+    'animals': 'intake_date',
+    'adoptions': 'adoption_date',
+    'medical_records': 'visit_date',
+    'volunteer_activities': 'activity_date',
+}
+
+DATE_FIELD_NAMES = frozenset(DATE_FIELDS.values())
+
+
+def parse_date(value) -> Optional[datetime]:
+    """YYYY-MM-DD string, date or datetime -> datetime at midnight (what MongoDB stores)
+
+    Full ISO timestamps are accepted and cut to their date. Empty values give
+    None; anything else raises ValueError.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        text = value.strip()
+        # Full timestamps ("2024-03-01T10:30:00") keep only their date
+        if len(text) > 10 and text[10] in 'T ':
+            text = text[:10]
+        try:
+            return datetime.strptime(text, DATE_FORMAT)
+        except ValueError:
+            raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+    raise ValueError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+
+def format_date(value):
+    """Stored date -> YYYY-MM-DD; other values (unmigrated strings, None) pass through"""
+    if isinstance(value, (datetime, date)):
+        return value.strftime(DATE_FORMAT)
+    return value
+
+
+def dates_to_storage(doc: dict) -> dict:
+    """Convert the date fields of a document or $set payload to datetimes, in place"""
+    for field in DATE_FIELD_NAMES.intersection(doc):
+        doc[field] = parse_date(doc[field])
+    return doc
+
+
+def dates_to_api(doc: dict) -> dict:
+    """Format the date fields of a stored document as YYYY-MM-DD, in place"""
+    for field in DATE_FIELD_NAMES.intersection(doc):
+        doc[field] = format_date(doc[field])
+    return doc
+
+
+def _validate_date_input(value):
+    parsed = parse_date(value)
+    return parsed.strftime(DATE_FORMAT) if parsed else value
+
+
+# Request fields: date, datetime or YYYY-MM-DD in, normalized YYYY-MM-DD out (bad values are a 422)
+DateInput = Annotated[str, BeforeValidator(_validate_date_input)]
+
+# Response fields: stored datetimes are formatted, legacy strings are passed through
+DateOutput = Annotated[str, BeforeValidator(format_date)]
@@ -0,0 +1,274 @@
+"""
+Data Importer
+Streams CSV/Excel rows into the collections as validated, batched inserts
+"""
+
+import csv
+import io
+import os
+import re
+import time
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from pymongo.database import Database
+
+from backend.config import IMPORT_BATCH_SIZE
+from backend.database.bulk import bulk_create
+from backend.analytics.snapshot import record_animals_saved
+from backend.analytics.versions import on_inserted_mark_changed
+from backend.models import (
+    AnimalCreate, AdopterCreate, MedicalRecordCreate,
+    VolunteerCreate, VolunteerActivityCreate
+)
+from backend.volunteer_availability import fill_availability_slots, invalidate_availability_index
+
+# What each import target writes to and how its name columns resolve to ids.
+# references: id field -> (referenced collection, name column in the file)
+IMPORT_TARGETS = {
+    'animals': {
+        'collection': 'animals',
+        'model': AnimalCreate,
+        'on_inserted': record_animals_saved,
+    },
+    'adopters': {
+        'collection': 'adopters',
+        'model': AdopterCreate,
+    },
+    'medical_records': {
+        'collection': 'medical_records',
+        'model': MedicalRecordCreate,
+        'references': {'animal_id': ('animals', 'animal_name')},
+        'on_inserted': on_inserted_mark_changed('medical_records'),
+    },
+    'volunteers': {
+        'collection': 'volunteers',
+        'model': VolunteerCreate,
+        'list_fields': ['skills'],
+        'prepare': fill_availability_slots,
+        # Imported volunteers show up in /api/volunteers/available straight away
+        'on_inserted': lambda docs: invalidate_availability_index(),
+    },
+    'volunteer_activities': {
+        'collection': 'volunteer_activities',
+        'model': VolunteerActivityCreate,
+        'references': {
+            'volunteer_id': ('volunteers', 'volunteer_name'),
+            'animal_id': ('animals', 'animal_name'),
+        },
+    },
+}
+
+# Spreadsheet headers people tend to use for our field names
+COLUMN_ALIASES = {
+    'animal': 'animal_name',
+    'pet': 'animal_name',
+    'pet_name': 'animal_name',
+    'volunteer': 'volunteer_name',
+    'vet': 'vet_name',
+    'veterinarian': 'vet_name',
+    'duration': 'duration_minutes',
+    'minutes': 'duration_minutes',
+    'notes_behavioral': 'behavioral_notes',
+    'sex': 'gender',
+}
+
+DATE_COLUMNS = {
+    'animals': 'intake_date',
+    'medical_records': 'visit_date',
+    'volunteer_activities': 'activity_date',
+}
+
+MAX_REPORTED_ERRORS = 100
+
+
+def normalize_header(header) -> str:
+    return re.sub(r'[^a-z0-9]+', '_', str(header or '').strip().lower()).strip('_')
+
+
+def normalize_value(value) -> Optional[str]:
+    """Cell value as a trimmed string; Excel dates and whole floats are unwrapped"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    value = str(value).strip()
+    return value or None
+
+
+def iter_csv_rows(stream) -> Iterator[dict]:
+    """Yield rows from a binary or text CSV stream one at a time"""
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or not hasattr(stream, 'encoding'):
+        stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    for row in csv.DictReader(stream):
+        yield row
+
+
+def iter_excel_rows(stream) -> Iterator[dict]:
+    """Rows from the first sheet of an .xlsx workbook in read-only mode
+
+    The workbook is opened before this returns, so a missing openpyxl or an
+    unreadable file raises ValueError up front rather than once rows are
+    being streamed.
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Excel import needs openpyxl (pip install openpyxl); CSV files work without it")
+
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"Could not read the Excel file: {e}")
+
+    def rows() -> Iterator[dict]:
+        try:
+            sheet_rows = workbook.worksheets[0].iter_rows(values_only=True)
+            headers = next(sheet_rows, None)
+            if headers is None:
+                return
+            for values in sheet_rows:
+                yield dict(zip(headers, values))
+        finally:
+            workbook.close()
+
+    return rows()
+
+
+def iter_rows(stream, filename: str) -> Iterator[dict]:
+    """Pick a row reader from the file extension"""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        return iter_csv_rows(stream)
+    if extension in ('.xlsx', '.xlsm'):
+        return iter_excel_rows(stream)
+    raise ValueError(f"Unsupported file type '{extension}'. Use .csv or .xlsx")
+
+
+def map_row(raw: dict, target: str) -> dict:
+    """Map spreadsheet columns onto model field names, dropping empty cells"""
+    spec = IMPORT_TARGETS[target]
+    row = {}
+    for header, value in raw.items():
+        key = normalize_header(header)
+        if key == 'date':
+            # A bare "Date" column means the target's own date field
+            key = DATE_COLUMNS.get(target)
+        else:
+            key = COLUMN_ALIASES.get(key, key)
+        value = normalize_value(value)
+        if key and value is not None:
+            row[key] = value
+
+    for field in spec.get('list_fields', []):
+        if field in row:
+            row[field] = [part.strip() for part in re.split(r'[;,|]', row[field]) if part.strip()]
+    return row
+
+
+def build_name_lookup(db: Database, collection: str) -> Tuple[Dict[str, Optional[str]], set]:
+    """Map lower-cased names to ids for one collection (None marks duplicate names)"""
+    by_name: Dict[str, Optional[str]] = {}
+    ids = set()
+    for doc in db[collection].find({}, {'name': 1}):
+        doc_id = str(doc['_id'])
+        ids.add(doc_id)
+        name = str(doc.get('name') or '').strip().lower()
+        if name:
+            by_name[name] = None if name in by_name else doc_id
+    return by_name, ids
+
+
+def resolve_references(row: dict, references: dict, lookups: dict) -> Optional[str]:
+    """Fill id fields from name columns; returns an error message or None"""
+    for id_field, (collection, name_field) in references.items():
+        by_name, ids = lookups[collection]
+        name = row.pop(name_field, None)
+        if id_field in row:
+            if row[id_field] not in ids:
+                return f"{id_field} not found: {row[id_field]}"
+            continue
+        if name is None:
+            return f"Missing {id_field} or {name_field}"
+        key = name.lower()
+        if key not in by_name:
+            return f"{name_field} not found: {name}"
+        if by_name[key] is None:
+            return f"{name_field} is ambiguous (several records named '{name}'), use {id_field}"
+        row[id_field] = by_name[key]
+    return None
+
+
+def run_import(db: Database, rows: Iterator[dict], target: str, dry_run: bool = False,
+               batch_size: int = IMPORT_BATCH_SIZE) -> Iterator[dict]:
+    """Import rows into a target collection, yielding progress after every batch
+
+    Rows are pulled from the iterator only as fast as batches are written, so
+    memory stays at one batch plus the name lookups however large the file is.
+    The last yielded dict has done=True and carries the (capped) error list.
+    With dry_run, 'inserted' counts rows that passed validation.
+    """
+    if target not in IMPORT_TARGETS:
+        raise ValueError(f"Unknown import target '{target}'. Must be one of: {', '.join(IMPORT_TARGETS)}")
+
+    spec = IMPORT_TARGETS[target]
+    references = spec.get('references', {})
+    # One lookup per referenced collection, built once for the whole import
+    lookups = {collection: build_name_lookup(db, collection) for collection, _ in references.values()}
+
+    started = time.perf_counter()
+    stats = {'target': target, 'dry_run': dry_run, 'rows': 0, 'inserted': 0, 'failed': 0}
+    errors: List[dict] = []
+
+    def record_error(row_number: int, message: str):
+        stats['failed'] += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({'row': row_number, 'error': message})
+
+    def progress(done: bool) -> dict:
+        elapsed = time.perf_counter() - started
+        report = {
+            **stats,
+            'elapsed_ms': round(elapsed * 1000, 2),
+            'rows_per_second': round(stats['rows'] / elapsed, 1) if elapsed > 0 else 0.0,
+            'done': done,
+        }
+        if done:
+            report['errors'] = errors
+            report['errors_truncated'] = stats['failed'] > len(errors)
+        return report
+
+    def flush(batch: List[dict], row_numbers: List[int]):
+        result = bulk_create(db, spec['collection'], batch, spec['model'],
+                             prepare=spec.get('prepare'), on_inserted=spec.get('on_inserted'),
+                             dry_run=dry_run)
+        for item in result['results']:
+            if not item['success']:
+                record_error(row_numbers[item['index']], item['error'])
+        stats['inserted'] += result['inserted']
+
+    batch, row_numbers = [], []
+    # Row 1 is the header
+    for row_number, raw in enumerate(rows, start=2):
+        row = map_row(raw, target)
+        if not row:
+            continue
+        stats['rows'] += 1
+        error = resolve_references(row, references, lookups)
+        if error:
+            record_error(row_number, error)
+            continue
+        batch.append(row)
+        row_numbers.append(row_number)
+        if len(batch) >= batch_size:
+            flush(batch, row_numbers)
+            batch, row_numbers = [], []
+            yield progress(done=False)
+
+    if batch:
+        flush(batch, row_numbers)
+    yield progress(done=True)
@@ -7,6 +7,8 @@ from pydantic import BaseModel, EmailStr, Field, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
+from backend.dates import DateInput, DateOutput
+
 
 # Animal Models
 class AnimalCreate(BaseModel):
@@ -16,7 +18,7 @@ class AnimalCreate(BaseModel):
     age: int = Field(..., gt=0)
     gender: str
     status: str = "Available"
-    intake_date: Optional[str] = None  # YYYY-MM-DD format
+    intake_date: Optional[DateInput] = None  # YYYY-MM-DD format
     behavioral_notes: Optional[str] = None
 
 
@@ -27,7 +29,7 @@ class AnimalUpdate(BaseModel):
     age: Optional[int] = Field(None, gt=0)
     gender: Optional[str] = None
     status: Optional[str] = None
-    intake_date: Optional[str] = None
+    intake_date: Optional[DateInput] = None
     behavioral_notes: Optional[str] = None
 
 
@@ -41,7 +43,7 @@ class AnimalResponse(BaseModel):
     age: int
     gender: str
     status: str
-    intake_date: Optional[str] = None
+    intake_date: Optional[DateOutput] = None
     behavioral_notes: Optional[str] = None
     assigned_volunteers: Optional[List[str]] = None
 
@@ -75,14 +77,14 @@ class AdopterResponse(BaseModel):
 class AdoptionCreate(BaseModel):
     animal_id: str
     adopter_id: str
-    adoption_date: Optional[str] = None
+    adoption_date: Optional[DateInput] = None
     notes: Optional[str] = None
 
 
 class AdoptionUpdate(BaseModel):
     animal_id: Optional[str] = None
     adopter_id: Optional[str] = None
-    adoption_date: Optional[str] = None
+    adoption_date: Optional[DateInput] = None
     notes: Optional[str] = None
 
 
@@ -92,15 +94,16 @@ class AdoptionResponse(BaseModel):
     id: str = Field(alias='_id', serialization_alias='_id')
     animal_id: str
     adopter_id: str
-    adoption_date: str
+    adoption_date: Optional[DateOutput] = None
     notes: Optional[str] = None
+    days_to_adoption: Optional[int] = None
 
 
 # Medical Record Models
 class MedicalRecordCreate(BaseModel):
     animal_id: str
     vet_name: str
-    visit_date: str
+    visit_date: DateInput
     diagnosis: str
     treatment: str
     notes: Optional[str] = None
@@ -109,7 +112,7 @@ class MedicalRecordCreate(BaseModel):
 class MedicalRecordUpdate(BaseModel):
     animal_id: Optional[str] = None
     vet_name: Optional[str] = None
-    visit_date: Optional[str] = None
+    visit_date: Optional[DateInput] = None
     diagnosis: Optional[str] = None
     treatment: Optional[str] = None
     notes: Optional[str] = None
@@ -121,7 +124,7 @@ class MedicalRecordResponse(BaseModel):
     id: str = Field(alias='_id', serialization_alias='_id')
     animal_id: str
     vet_name: str
-    visit_date: str
+    visit_date: Optional[DateOutput] = None
     diagnosis: str
     treatment: str
     notes: Optional[str] = None
@@ -134,6 +137,8 @@ class VolunteerCreate(BaseModel):
     email: EmailStr
     skills: List[str]  # Changed to list for multiple skills
     availability: str
+    # 7 daily 24-bit hour masks (Monday first); parsed from availability if omitted
+    availability_slots: Optional[List[int]] = Field(None, min_length=7, max_length=7)
 
 
 class VolunteerUpdate(BaseModel):
@@ -142,6 +147,7 @@ class VolunteerUpdate(BaseModel):
     email: Optional[EmailStr] = None
     skills: Optional[List[str]] = None  # Changed to list
     availability: Optional[str] = None
+    availability_slots: Optional[List[int]] = Field(None, min_length=7, max_length=7)
 
 
 # Volunteer Activity Models
@@ -149,7 +155,7 @@ class VolunteerActivityCreate(BaseModel):
     volunteer_id: str
     animal_id: str
     activity_type: str
-    activity_date: str  # YYYY-MM-DD format
+    activity_date: DateInput  # YYYY-MM-DD format
     duration_minutes: int = Field(..., gt=0)
     notes: Optional[str] = None
 
@@ -158,7 +164,7 @@ class VolunteerActivityUpdate(BaseModel):
     volunteer_id: Optional[str] = None
     animal_id: Optional[str] = None
     activity_type: Optional[str] = None
-    activity_date: Optional[str] = None
+    activity_date: Optional[DateInput] = None
     duration_minutes: Optional[int] = Field(None, gt=0)
     notes: Optional[str] = None
 
@@ -170,7 +176,7 @@ class VolunteerActivityResponse(BaseModel):
     volunteer_id: str
     animal_id: str
     activity_type: str
-    activity_date: str
+    activity_date: Optional[DateOutput] = None
     duration_minutes: int
     notes: Optional[str] = None
 
@@ -197,6 +203,7 @@ class VolunteerResponse(BaseModel):
     email: str
     skills: List[str]  # Changed to list for multiple skills
     availability: str
+    availability_slots: Optional[List[int]] = None
 
 
 # Common Response Models
@@ -204,3 +211,19 @@ class SuccessResponse(BaseModel):
     success: bool
     message: str
 
+
+
+# Bulk Create Models
+class BulkItemResult(BaseModel):
+    index: int
+    success: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkCreateResponse(BaseModel):
+    inserted: int
+    failed: int
+    elapsed_ms: float
+    docs_per_second: float
+    results: List[BulkItemResult]
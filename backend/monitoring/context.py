@@ -0,0 +1,69 @@
+"""
+Request Context
+Per-request state shared between the HTTP middleware and the driver listeners
+"""
+
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Label used for commands issued outside of a request (startup, background tasks)
+BACKGROUND_ROUTE = '<background>'
+
+
+def route_label(scope: dict) -> str:
+    """Route template (/api/animals/{animal_id}) so ids don't explode label cardinality"""
+    route = scope.get('route')
+    if route is not None:
+        return route.path
+    if scope.get('path', '').startswith('/static/'):
+        return '/static'
+    return '<unmatched>'
+
+
+class RequestStats:
+    """Database activity collected while one request is handled
+
+    commands maps command name -> [count, total seconds, documents returned]
+    and shapes maps (command, collection, filter shape) -> count. The driver
+    listeners fill them in as commands run.
+    """
+
+    __slots__ = ('scope', 'commands', 'shapes', 'db_seconds')
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.commands: Dict[str, List[float]] = {}
+        self.shapes: Dict[Tuple[str, str, str], int] = {}
+        self.db_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the scope before the endpoint runs
+        return route_label(self.scope)
+
+    def record(self, command: str, seconds: float, documents: int):
+        entry = self.commands.get(command)
+        if entry is None:
+            entry = self.commands[command] = [0, 0.0, 0]
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] += documents
+        self.db_seconds += seconds
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar('current_request', default=None)
+
+
+def start_request(scope: dict) -> RequestStats:
+    stats = RequestStats(scope)
+    _current_request.set(stats)
+    return stats
+
+
+def current_request() -> Optional[RequestStats]:
+    return _current_request.get()
+
+
+def current_route() -> str:
+    stats = _current_request.get()
+    return stats.route if stats is not None else BACKGROUND_ROUTE
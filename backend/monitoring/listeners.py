@@ -0,0 +1,122 @@
+"""
+Driver Listeners
+pymongo command and connection pool listeners feeding the metrics registry
+"""
+
+import threading
+import time
+from typing import List
+
+from pymongo import monitoring
+
+from backend.config import METRICS_ENABLED, SLOW_QUERY_LOG_ENABLED, N_PLUS_ONE_DETECTION, PROFILING_ENABLED
+from backend.monitoring import metrics
+from backend.monitoring.context import BACKGROUND_ROUTE, current_request, current_route
+from backend.monitoring.slow_queries import SlowQueryListener, slow_query_log
+from backend.monitoring.n_plus_one import QueryShapeListener
+from backend.monitoring.profiler import ProfileCommandListener
+
+
+def count_returned_documents(reply) -> int:
+    """Documents carried by a command reply (find/aggregate/getMore batches)"""
+    cursor = reply.get('cursor') if isinstance(reply, dict) else None
+    if isinstance(cursor, dict):
+        batch = cursor.get('firstBatch', cursor.get('nextBatch'))
+        return len(batch) if batch is not None else 0
+    return 0
+
+
+class MetricsCommandListener(monitoring.CommandListener):
+    """Counts commands, latency and returned documents per route
+
+    Commands issued outside a request are labelled as background work.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        seconds = event.duration_micros / 1_000_000
+        documents = count_returned_documents(event.reply)
+        stats = current_request()
+        route = stats.route if stats is not None else BACKGROUND_ROUTE
+        metrics.DB_COMMANDS.inc(route, event.command_name)
+        metrics.DB_LATENCY.observe(seconds, route, event.command_name)
+        if documents:
+            metrics.DB_DOCUMENTS.inc(route, event.command_name, amount=documents)
+        if stats is not None:
+            stats.record(event.command_name, seconds, documents)
+
+    def failed(self, event):
+        metrics.DB_COMMAND_FAILURES.inc(current_route(), event.command_name)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Tracks open and checked-out connections per server, and checkout wait time
+
+    Checkouts run on the thread issuing the command, so the start time is
+    kept in a thread-local between the started and checked-out events.
+    """
+
+    def __init__(self):
+        self._checkout = threading.local()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        address = f"{event.address[0]}:{event.address[1]}"
+        metrics.POOL_CONNECTIONS.set(0, address, 'open')
+        metrics.POOL_CONNECTIONS.set(0, address, 'in_use')
+
+    def connection_created(self, event):
+        metrics.POOL_CONNECTIONS.inc(f"{event.address[0]}:{event.address[1]}", 'open')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        metrics.POOL_CONNECTIONS.dec(f"{event.address[0]}:{event.address[1]}", 'open')
+
+    def connection_check_out_started(self, event):
+        self._checkout.started = time.perf_counter()
+
+    def _observe_wait(self, address: str):
+        started = getattr(self._checkout, 'started', None)
+        if started is not None:
+            metrics.POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, address)
+            self._checkout.started = None
+
+    def connection_check_out_failed(self, event):
+        address = f"{event.address[0]}:{event.address[1]}"
+        self._observe_wait(address)
+        metrics.POOL_CHECKOUT_FAILURES.inc(address, str(event.reason))
+
+    def connection_checked_out(self, event):
+        address = f"{event.address[0]}:{event.address[1]}"
+        self._observe_wait(address)
+        metrics.POOL_CONNECTIONS.inc(address, 'in_use')
+
+    def connection_checked_in(self, event):
+        metrics.POOL_CONNECTIONS.dec(f"{event.address[0]}:{event.address[1]}", 'in_use')
+
+
+def build_event_listeners() -> List:
+    """Listeners to register on the MongoClient, based on config"""
+    listeners = []
+    if METRICS_ENABLED:
+        listeners.append(MetricsCommandListener())
+        listeners.append(PoolMetricsListener())
+    if SLOW_QUERY_LOG_ENABLED:
+        listeners.append(SlowQueryListener(slow_query_log))
+    if N_PLUS_ONE_DETECTION in ('warn', 'strict'):
+        listeners.append(QueryShapeListener())
+    if PROFILING_ENABLED:
+        listeners.append(ProfileCommandListener())
+    return listeners
@@ -0,0 +1,147 @@
+"""
+Metrics Registry
+Minimal Prometheus-style counters, gauges and histograms with text exposition
+"""
+
+import threading
+from typing import Dict, List, Tuple
+
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: List["_Metric"] = []
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name, help_text, label_names=()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, k)} {v}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+    def dec(self, *label_values, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *label_values):
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self):
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._values.items()]
+        lines = []
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            le_inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le_inf)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {series[-1]}")
+        return lines
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+# Application metrics
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by route and status', ('method', 'route', 'status'))
+HTTP_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route', ('method', 'route'))
+HTTP_DEADLINE_EXCEEDED = Counter(
+    'http_request_deadline_exceeded_total', 'Requests cut off by their time budget (504)', ('method', 'route'))
+DB_COMMANDS = Counter(
+    'mongodb_commands_total', 'MongoDB commands by route and command name', ('route', 'command'))
+DB_COMMAND_FAILURES = Counter(
+    'mongodb_command_failures_total', 'Failed MongoDB commands by route and command name', ('route', 'command'))
+DB_LATENCY = Histogram(
+    'mongodb_command_duration_seconds', 'MongoDB command latency by route and command name', ('route', 'command'))
+DB_DOCUMENTS = Counter(
+    'mongodb_documents_returned_total', 'Documents returned by MongoDB commands per route', ('route', 'command'))
+POOL_CONNECTIONS = Gauge(
+    'mongodb_pool_connections', 'Connections in the driver pool by state', ('address', 'state'))
+POOL_CHECKOUT_WAIT = Histogram(
+    'mongodb_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection', ('address',),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+POOL_CHECKOUT_FAILURES = Counter(
+    'mongodb_pool_checkout_failures_total', 'Failed connection checkouts by reason', ('address', 'reason'))
+DB_CIRCUIT_OPEN = Gauge(
+    'mongodb_circuit_open', '1 while the database circuit breaker is open')
+DB_PING_LATENCY = Gauge(
+    'mongodb_ping_latency_seconds', 'Latency of the last health probe ping')
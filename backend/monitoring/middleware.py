@@ -0,0 +1,51 @@
+"""
+Monitoring Middleware
+Per-request database tracking, route metrics and N+1 query detection
+"""
+
+import logging
+import time
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from backend.config import METRICS_ENABLED, N_PLUS_ONE_DETECTION
+from backend.monitoring import metrics
+from backend.monitoring.context import start_request
+from backend.monitoring.n_plus_one import find_repeated_queries, describe
+
+logger = logging.getLogger(__name__)
+
+# Whether any feature needs the per-request context
+MONITORING_ENABLED = METRICS_ENABLED or N_PLUS_ONE_DETECTION in ('warn', 'strict')
+
+
+async def monitoring_middleware(request: Request, call_next):
+    """Open a RequestStats for the driver listeners and act on it afterwards"""
+    stats = start_request(request.scope)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        if METRICS_ENABLED:
+            elapsed = time.perf_counter() - started
+            route = stats.route
+            metrics.HTTP_REQUESTS.inc(request.method, route, str(status))
+            metrics.HTTP_LATENCY.observe(elapsed, request.method, route)
+
+    if N_PLUS_ONE_DETECTION in ('warn', 'strict'):
+        repeated = find_repeated_queries(stats)
+        if repeated:
+            summary = '; '.join(describe(r) for r in repeated)
+            logger.warning("N+1 query pattern on %s %s: %s", request.method, stats.route, summary)
+            if N_PLUS_ONE_DETECTION == 'strict':
+                return JSONResponse(status_code=500, content={
+                    'detail': 'N+1 query pattern detected',
+                    'route': stats.route,
+                    'patterns': repeated
+                })
+            response.headers['X-N-Plus-One'] = summary[:1000]
+
+    return response
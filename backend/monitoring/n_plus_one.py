@@ -0,0 +1,51 @@
+"""
+N+1 Query Detector
+Flags requests that issue the same query shape over and over
+"""
+
+from typing import List
+
+from pymongo import monitoring
+
+from backend.config import N_PLUS_ONE_THRESHOLD
+from backend.monitoring.context import RequestStats, current_request
+from backend.monitoring.slow_queries import EXPLAINABLE, query_shape
+
+# Cursor bookkeeping repeats naturally and says nothing about the query pattern
+IGNORED_COMMANDS = {'getMore', 'killCursors', 'endSessions', 'ping', 'hello', 'isMaster'}
+
+
+class QueryShapeListener(monitoring.CommandListener):
+    """Counts query shapes per request for the N+1 check"""
+
+    def started(self, event):
+        stats = current_request()
+        if stats is None or event.command_name in IGNORED_COMMANDS:
+            return
+        command = event.command
+        collection = command.get(event.command_name)
+        filter_field = EXPLAINABLE.get(event.command_name)
+        shape = str(query_shape(command.get(filter_field, {}))) if filter_field else ''
+        key = (event.command_name, collection if isinstance(collection, str) else '', shape)
+        stats.shapes[key] = stats.shapes.get(key, 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def find_repeated_queries(stats: RequestStats, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[dict]:
+    """Query shapes issued more than threshold times in the request, worst first"""
+    repeated = [
+        {'command': command, 'collection': collection, 'shape': shape, 'count': count}
+        for (command, collection, shape), count in stats.shapes.items()
+        if count > threshold
+    ]
+    repeated.sort(key=lambda r: r['count'], reverse=True)
+    return repeated
+
+
+def describe(pattern: dict) -> str:
+    return f"{pattern['command']} {pattern['collection']} {pattern['shape']} x{pattern['count']}"
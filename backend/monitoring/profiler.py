@@ -0,0 +1,248 @@
+"""
+Request Profiler
+On-demand sampling profiler for a single request, with database time broken out
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from pymongo import monitoring
+
+from backend.config import ADMIN_TOKEN, PROFILE_SAMPLE_INTERVAL_MS, PROFILE_STORE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Header or query flag that asks for a profile (also needs a valid X-Admin-Token)
+PROFILE_HEADER = 'x-profile'
+PROFILE_QUERY_PARAM = '_profile'
+
+# Frames from these packages count as time spent talking to MongoDB
+_DB_MODULES = (os.sep + 'pymongo' + os.sep, os.sep + 'bson' + os.sep)
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(_ROOT):
+        filename = os.path.relpath(filename, _ROOT)
+    else:
+        # Library frames: keep the path from the package name on
+        for marker in ('site-packages' + os.sep, 'lib' + os.sep + 'python'):
+            if marker in filename:
+                filename = filename.split(marker, 1)[1]
+                break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class RequestProfile:
+    """Stack samples and MongoDB commands collected for one request
+
+    Samples are taken from the thread running the endpoint. Samples where the
+    endpoint isn't on the stack (the request is awaiting, or another request
+    is running on the event loop) are counted as idle rather than attributed.
+    """
+
+    def __init__(self, scope: dict, interval: float):
+        self.id = uuid.uuid4().hex[:12]
+        self.scope = scope
+        self.method = scope.get('method')
+        self.path = scope.get('path')
+        self.interval = interval
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.stacks: Dict[tuple, int] = {}
+        self.idle_samples = 0
+        self.commands: List[dict] = []
+        self.db_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.status: Optional[int] = None
+        self._endpoint_code = None
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self):
+        self._sampler = threading.Thread(target=self._sample, name=f'profiler-{self.id}', daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    @property
+    def route(self) -> Optional[str]:
+        # The router stores the matched route in the shared scope
+        route = self.scope.get('route')
+        return route.path if route is not None else None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            if self._endpoint_code is None:
+                endpoint = getattr(self.scope.get('route'), 'endpoint', None)
+                self._endpoint_code = getattr(endpoint, '__code__', None)
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                if frame.f_code is self._endpoint_code:
+                    break
+                frame = frame.f_back
+            if frame is None:
+                self.idle_samples += 1
+                continue
+            key = tuple(_frame_label(code) for code in reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def record_command(self, event, seconds: float, failed: bool):
+        self.db_seconds += seconds
+        self.commands.append({
+            'command': event.command_name,
+            'database': event.database_name,
+            'duration_ms': round(seconds * 1000, 3),
+            'failed': failed,
+        })
+
+    def call_tree(self) -> dict:
+        """Nested {name, samples, children} tree rooted at the endpoint"""
+        root = {'name': self.route or self.path, 'samples': 0, 'children': {}}
+        for stack, count in self.stacks.items():
+            root['samples'] += count
+            node = root
+            for label in stack:
+                child = node['children'].get(label)
+                if child is None:
+                    child = node['children'][label] = {'name': label, 'samples': 0, 'children': {}}
+                child['samples'] += count
+                node = child
+
+        def finish(node):
+            children = sorted(node['children'].values(), key=lambda c: c['samples'], reverse=True)
+            return {'name': node['name'], 'samples': node['samples'],
+                    'ms': round(node['samples'] * self.interval * 1000, 1),
+                    'children': [finish(c) for c in children]}
+
+        return finish(root)
+
+    def folded(self) -> str:
+        """Collapsed stacks ("a;b;c count") for flamegraph.pl or speedscope"""
+        lines = [';'.join(stack) + f" {count}" for stack, count in self.stacks.items()]
+        return '\n'.join(sorted(lines)) + '\n'
+
+    def summary(self) -> dict:
+        samples = sum(self.stacks.values())
+        db_samples = sum(count for stack, count in self.stacks.items()
+                         if any(any(m in label for m in _DB_MODULES) for label in stack))
+        wall_ms = self.wall_seconds * 1000
+        db_ms = self.db_seconds * 1000
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'route': self.route,
+            'status': self.status,
+            'started_at': self.started_at,
+            'wall_ms': round(wall_ms, 2),
+            # Server-side command time from the driver; the rest is Python, awaiting or the network
+            'db_ms': round(db_ms, 2),
+            'python_ms': round(max(wall_ms - db_ms, 0.0), 2),
+            'db_commands': len(self.commands),
+            'samples': samples,
+            'db_samples': db_samples,
+            'python_samples': samples - db_samples,
+            'idle_samples': self.idle_samples,
+            'sample_interval_ms': self.interval * 1000,
+        }
+
+    def to_dict(self) -> dict:
+        return {**self.summary(), 'commands': self.commands, 'call_tree': self.call_tree()}
+
+
+class ProfileStore:
+    """Keeps the last `size` profiles by id"""
+
+    def __init__(self, size: int = PROFILE_STORE_SIZE):
+        self.size = size
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile):
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.size:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [p.summary() for p in reversed(profiles)]
+
+
+profile_store = ProfileStore()
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar('current_profile', default=None)
+
+
+class ProfileCommandListener(monitoring.CommandListener):
+    """Adds MongoDB command timings to the profile of the current request"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record_command(event, event.duration_micros / 1_000_000, failed=False)
+
+    def failed(self, event):
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.record_command(event, event.duration_micros / 1_000_000, failed=True)
+
+
+def profile_requested(request: Request) -> bool:
+    """Profiling flag present and the admin token matches"""
+    flag = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+    if not flag or flag.lower() in ('0', 'false', 'no'):
+        return False
+    return bool(ADMIN_TOKEN) and request.headers.get('x-admin-token') == ADMIN_TOKEN
+
+
+async def profiling_middleware(request: Request, call_next):
+    """Run flagged requests under the sampling profiler and store the result"""
+    if not profile_requested(request):
+        return await call_next(request)
+
+    profile = RequestProfile(request.scope, PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    _current_profile.set(profile)
+    started = time.perf_counter()
+    profile.start()
+    try:
+        response = await call_next(request)
+        profile.status = response.status_code
+    finally:
+        profile.stop()
+        profile.wall_seconds = time.perf_counter() - started
+        profile_store.add(profile)
+
+    summary = profile.summary()
+    response.headers['X-Profile-Id'] = profile.id
+    response.headers['X-Profile-Summary'] = (
+        f"wall={summary['wall_ms']}ms db={summary['db_ms']}ms python={summary['python_ms']}ms "
+        f"samples={summary['samples']}"
+    )
+    logger.info("Profiled %s %s: %s (GET /admin/profiles/%s)", request.method, request.url.path,
+                response.headers['X-Profile-Summary'], profile.id)
+    return response
@@ -0,0 +1,195 @@
+"""
+Slow Query Log
+Records MongoDB commands over a latency threshold, with a sampled explain()
+showing whether they used an index
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import monitoring
+
+from backend.config import (
+    SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_EXPLAIN, SLOW_QUERY_EXPLAIN_INTERVAL
+)
+from backend.monitoring.context import current_route
+
+logger = logging.getLogger(__name__)
+
+# Commands explain() understands, and the field holding the filter in each
+EXPLAINABLE = {
+    'find': 'filter',
+    'aggregate': 'pipeline',
+    'count': 'query',
+    'distinct': 'query',
+    'findAndModify': 'query',
+    'delete': 'deletes',
+    'update': 'updates',
+}
+
+# Driver-added fields that explain() rejects or that don't describe the query
+_SESSION_FIELDS = {'lsid', 'txnNumber', 'autocommit', 'startTransaction', 'readConcern', 'writeConcern'}
+
+
+def query_shape(value):
+    """Replace literal values with '?' keeping field names and operators"""
+    if isinstance(value, dict):
+        return {k: query_shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Pipelines and $and/$or lists keep their structure, value lists collapse
+        if value and all(isinstance(v, dict) for v in value):
+            return [query_shape(v) for v in value]
+        return '?'
+    return '?'
+
+
+def summarize_plan(explain: dict) -> dict:
+    """Pull stage names and index names out of an explain() result"""
+    stages, indexes = [], []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if 'stage' in node:
+                stages.append(node['stage'])
+            if 'indexName' in node:
+                indexes.append(node['indexName'])
+            for key, child in node.items():
+                # Only the chosen plan matters, not the rejected candidates
+                if key != 'rejectedPlans':
+                    walk(child)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child)
+
+    walk(explain)
+    return {
+        'uses_index': bool(indexes),
+        'collscan': 'COLLSCAN' in stages,
+        'indexes': sorted(set(indexes)),
+        'stages': stages,
+    }
+
+
+class SlowQueryLog:
+    """Ring buffer of slow commands plus a background explain worker
+
+    The listener callbacks only copy the command and append to the buffer;
+    explain() runs on a worker thread so it never blocks the request and
+    never issues a command from inside a driver callback.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS, size: int = SLOW_QUERY_LOG_SIZE,
+                 explain: bool = SLOW_QUERY_EXPLAIN, explain_interval: float = SLOW_QUERY_EXPLAIN_INTERVAL):
+        self.threshold_ms = threshold_ms
+        self.explain_enabled = explain
+        self.explain_interval = explain_interval
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._last_explained: Dict[str, float] = {}
+        self._explain_queue: "queue.Queue" = queue.Queue(maxsize=100)
+        self._worker: Optional[threading.Thread] = None
+
+    def add(self, entry: dict, command: Optional[dict] = None):
+        with self._lock:
+            self._entries.append(entry)
+        # Runs on the driver callback path - the logger formats only if the level is enabled
+        logger.warning("Slow query (%s ms) on %s: %s %s %s", entry['duration_ms'], entry['route'],
+                       entry['command'], entry['collection'], entry['shape'])
+        if command is not None and self._should_explain(entry):
+            self._start_worker()
+            try:
+                self._explain_queue.put_nowait((entry, command))
+            except queue.Full:
+                pass
+
+    def entries(self, limit: Optional[int] = None) -> List[dict]:
+        """Most recent entries first"""
+        with self._lock:
+            items = list(self._entries)
+        items.reverse()
+        return items[:limit] if limit else items
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._last_explained.clear()
+
+    def _should_explain(self, entry: dict) -> bool:
+        if not self.explain_enabled or entry['command'] not in EXPLAINABLE:
+            return False
+        key = f"{entry['database']}.{entry['collection']}:{entry['command']}:{entry['shape']}"
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_explained.get(key, float('-inf')) < self.explain_interval:
+                return False
+            self._last_explained[key] = now
+        return True
+
+    def _start_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run_explains, name='slow-query-explain', daemon=True)
+            self._worker.start()
+
+    def _run_explains(self):
+        # Imported here - connection.py imports this package to register listeners
+        from backend.database.connection import get_client
+        while True:
+            entry, command = self._explain_queue.get()
+            client = get_client()
+            if client is None:
+                continue
+            try:
+                result = client[entry['database']].command({'explain': command, 'verbosity': 'queryPlanner'})
+                entry['plan'] = summarize_plan(result)
+            except Exception as e:
+                entry['plan'] = {'error': str(e)}
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """Feeds commands slower than the threshold into a SlowQueryLog"""
+
+    def __init__(self, log: SlowQueryLog):
+        self.log = log
+        self._started: Dict[tuple, dict] = {}
+
+    def started(self, event):
+        if event.command_name == 'explain':
+            return
+        command = {k: v for k, v in event.command.items()
+                   if not k.startswith('$') and k not in _SESSION_FIELDS}
+        self._started[(event.connection_id, event.request_id)] = command
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        command = self._started.pop((event.connection_id, event.request_id), None)
+        if command is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms < self.log.threshold_ms:
+            return
+        filter_field = EXPLAINABLE.get(event.command_name)
+        collection = command.get(event.command_name)
+        self.log.add({
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'route': current_route(),
+            'database': event.database_name,
+            'collection': collection if isinstance(collection, str) else None,
+            'command': event.command_name,
+            'shape': str(query_shape(command.get(filter_field, {}))) if filter_field else None,
+            'duration_ms': round(duration_ms, 2),
+            'failed': isinstance(event, monitoring.CommandFailedEvent),
+            'plan': None,
+        }, command)
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,86 @@
+"""
+Reference Fields
+Cross-collection references are stored as ObjectIds and exchanged with clients as strings
+"""
+
+from typing import Dict, Iterable, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Reference fields of each collection (assigned_volunteers is a list of ids)
+REFERENCE_FIELDS = {
+    'animals': ['assigned_volunteers'],
+    'adoptions': ['animal_id', 'adopter_id'],
+    'medical_records': ['animal_id'],
+    'volunteer_activities': ['volunteer_id', 'animal_id'],
+}
+
+ID_FIELD_NAMES = frozenset({'animal_id', 'adopter_id', 'volunteer_id'})
+ID_LIST_FIELD_NAMES = frozenset({'assigned_volunteers'})
+
+
+def to_object_id(value) -> ObjectId:
+    """ObjectId or 24-character hex string -> ObjectId (raises bson.errors.InvalidId)"""
+    return value if isinstance(value, ObjectId) else ObjectId(value)
+
+
+def refs_to_storage(doc: dict) -> dict:
+    """Convert the reference fields of a document or $set payload to ObjectIds, in place"""
+    for field in ID_FIELD_NAMES.intersection(doc):
+        if doc[field] is not None:
+            doc[field] = to_object_id(doc[field])
+    for field in ID_LIST_FIELD_NAMES.intersection(doc):
+        if doc[field] is not None:
+            doc[field] = [to_object_id(value) for value in doc[field]]
+    return doc
+
+
+def refs_to_api(doc: dict) -> dict:
+    """Format the reference fields of a stored document as strings, in place"""
+    for field in ID_FIELD_NAMES.intersection(doc):
+        if isinstance(doc[field], ObjectId):
+            doc[field] = str(doc[field])
+    for field in ID_LIST_FIELD_NAMES.intersection(doc):
+        if doc[field]:
+            doc[field] = [str(value) for value in doc[field]]
+    return doc
+
+
+def find_by_ids(collection, ids: Iterable, projection: Optional[dict] = None) -> Dict[ObjectId, dict]:
+    """Documents of a collection keyed by _id, fetched with one $in query
+
+    Use instead of a find_one per item when joining a list to another
+    collection. Missing and malformed ids are skipped.
+    """
+    wanted = set()
+    for value in ids:
+        try:
+            wanted.add(to_object_id(value))
+        except (InvalidId, TypeError):
+            continue
+    if not wanted:
+        return {}
+    return {doc['_id']: doc for doc in collection.find({'_id': {'$in': list(wanted)}}, projection)}
+
+
+def animal_filter_stages(animal_filter: dict, local_field: str = 'animal_id') -> list:
+    """Aggregation stages keeping documents whose referenced animal matches animal_filter
+
+    The filter runs inside a $lookup on the animals _id index, so no id list
+    is built or sent; documents of deleted animals are dropped. No stages
+    when unfiltered.
+    """
+    if not animal_filter:
+        return []
+    return [
+        {'$lookup': {
+            'from': 'animals',
+            'localField': local_field,
+            'foreignField': '_id',
+            'pipeline': [{'$match': animal_filter}, {'$project': {'_id': 1}}],
+            'as': '_animal'
+        }},
+        {'$match': {'_animal': {'$ne': []}}},
+        {'$unset': '_animal'}
+    ]
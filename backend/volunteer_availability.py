@@ -0,0 +1,288 @@
+"""
+Volunteer Availability
+Weekly slot bitmap for volunteer availability and a cached skill index
+for "who is free now" lookups
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Each day is a 24-bit mask (bit N = hour N:00-N:59), Monday first
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+HOURS_PER_DAY = 24
+FULL_DAY = (1 << HOURS_PER_DAY) - 1
+
+# Day parts used by the legacy free-text values
+DAY_PARTS = {
+    "morning": (6, 12),
+    "mornings": (6, 12),
+    "afternoon": (12, 17),
+    "afternoons": (12, 17),
+    "evening": (17, 22),
+    "evenings": (17, 22),
+    "night": (20, 24),
+    "nights": (20, 24),
+}
+
+# Day groups used by the legacy free-text values
+DAY_GROUPS = {
+    "weekdays": [0, 1, 2, 3, 4],
+    "weekday": [0, 1, 2, 3, 4],
+    "weekends": [5, 6],
+    "weekend": [5, 6],
+    "daily": list(range(7)),
+    "everyday": list(range(7)),
+    "flexible": list(range(7)),
+    "anytime": list(range(7)),
+}
+
+# Shelter opening hours used when a value names days but no times
+DEFAULT_HOURS = (8, 20)
+
+
+def hour_mask(start_hour: int, end_hour: int) -> int:
+    """Mask for hours in [start_hour, end_hour) within one day"""
+    start_hour = max(0, min(start_hour, HOURS_PER_DAY))
+    end_hour = max(0, min(end_hour, HOURS_PER_DAY))
+    if end_hour <= start_hour:
+        return 0
+    return ((1 << (end_hour - start_hour)) - 1) << start_hour
+
+
+def day_index(name: str) -> Optional[int]:
+    """Resolve a day name, abbreviation or plural (Mon, Tues, Saturdays) to 0-6
+
+    The whole word has to be the start of a day name, so "monthly" or
+    "sunny" are not days.
+    """
+    name = name.strip().lower()
+    if len(name) > 3 and name.endswith("s") and name[:-1] in (day.lower() for day in DAYS):
+        name = name[:-1]
+    if len(name) < 2:
+        return None
+    for i, day in enumerate(DAYS):
+        if day.lower().startswith(name):
+            return i
+    return None
+
+
+def empty_slots() -> List[int]:
+    return [0] * len(DAYS)
+
+
+def _parse_hour(value: str) -> Optional[int]:
+    """Parse '9', '9am', '5pm', '17', '17:00' into an hour of day"""
+    match = re.fullmatch(r"(\d{1,2})(?::\d{2})?\s*(am|pm)?", value.strip().lower())
+    if not match:
+        return None
+    hour = int(match.group(1))
+    suffix = match.group(2)
+    if suffix == "pm" and hour < 12:
+        hour += 12
+    elif suffix == "am" and hour == 12:
+        hour = 0
+    return hour if 0 <= hour <= 24 else None
+
+
+def _parse_days(text: str) -> List[int]:
+    """Collect the days mentioned in a text fragment (names, groups, Mon-Fri ranges)"""
+    days = set()
+    for start, end in re.findall(r"\b([a-z]+)\s*(?:-|–|\bto\b)\s*([a-z]+)\b", text):
+        first, last = day_index(start), day_index(end)
+        if first is not None and last is not None:
+            i = first
+            while True:
+                days.add(i)
+                if i == last:
+                    break
+                i = (i + 1) % 7
+    for word in re.findall(r"[a-z]+", text):
+        if word in DAY_GROUPS:
+            days.update(DAY_GROUPS[word])
+        elif word not in DAY_PARTS:
+            index = day_index(word)
+            if index is not None and len(word) >= 3:
+                days.add(index)
+    return sorted(days)
+
+
+def _parse_hours(text: str) -> Tuple[int, int]:
+    """Collect the hours mentioned in a text fragment as 24-bit masks
+
+    Returns (mask, next_day_mask): overnight ranges ("10pm-2am") run to
+    midnight and carry on into the next day's mask.
+    """
+    mask = next_day = 0
+    time_pattern = r"\d{1,2}(?::\d{2})?\s*(?:am|pm)?"
+    for start, end in re.findall(rf"({time_pattern})\s*(?:-|–|to)\s*({time_pattern})", text):
+        start_hour, end_hour = _parse_hour(start), _parse_hour(end)
+        if start_hour is None or end_hour is None:
+            continue
+        # "9-5" style ranges without am/pm
+        if end_hour <= start_hour and not re.search(r"am|pm", start + end) and end_hour + 12 > start_hour:
+            end_hour += 12
+        if end_hour <= start_hour:
+            mask |= hour_mask(start_hour, HOURS_PER_DAY)
+            next_day |= hour_mask(0, end_hour)
+        else:
+            mask |= hour_mask(start_hour, end_hour)
+    for word in re.findall(r"[a-z]+", text):
+        if word in DAY_PARTS:
+            mask |= hour_mask(*DAY_PARTS[word])
+    return mask, next_day
+
+
+def parse_availability(text: Optional[str]) -> List[int]:
+    """Parse a legacy free-text availability string into 7 daily hour masks
+
+    Handles the values used so far ("Weekends", "Weekdays", "Flexible",
+    "Mornings", "Evenings") as well as day names, day ranges ("Mon-Fri")
+    and hour ranges ("9am-5pm", overnight "10pm-2am"), separated by commas
+    or semicolons. Hours without days apply to the days named just before
+    them ("Weekends, 10am-2pm"), or to every day when none were. Days
+    without hours get the shelter's opening hours. Unrecognised text
+    yields an empty schedule.
+    """
+    slots = empty_slots()
+    if not text:
+        return slots
+
+    def add(days: List[int], hours: int, next_day: int = 0):
+        for day in days:
+            slots[day] |= hours
+            slots[(day + 1) % len(DAYS)] |= next_day
+
+    # Days named without hours, waiting for an hours-only fragment
+    untimed: Optional[Tuple[List[int], int]] = None
+    last_days = list(range(7))
+    for fragment in re.split(r"[,;/]", text.lower()):
+        fragment = fragment.strip()
+        if not fragment:
+            continue
+        days = _parse_days(fragment)
+        hours, next_day = _parse_hours(fragment)
+        if not hours and not next_day:
+            if days:
+                if untimed:
+                    add(*untimed)
+                default = FULL_DAY if re.search(r"\b(flexible|anytime)\b", fragment) else hour_mask(*DEFAULT_HOURS)
+                untimed = (days, default)
+                last_days = days
+            continue
+        if days:
+            if untimed:
+                add(*untimed)
+        else:
+            days = untimed[0] if untimed else last_days
+        untimed = None
+        last_days = days
+        add(days, hours, next_day)
+    if untimed:
+        add(*untimed)
+    return slots
+
+
+def slots_to_bitmap(slots: List[int]) -> int:
+    """Pack 7 daily masks into a single 168-bit integer"""
+    bitmap = 0
+    for day, mask in enumerate(slots[:len(DAYS)]):
+        bitmap |= (int(mask) & FULL_DAY) << (day * HOURS_PER_DAY)
+    return bitmap
+
+
+def query_bitmap(day: int, start_hour: int, end_hour: int) -> int:
+    """Bitmap for a window on one day, in the same layout as slots_to_bitmap"""
+    return hour_mask(start_hour, end_hour) << (day * HOURS_PER_DAY)
+
+
+def fill_availability_slots(volunteer: dict):
+    """Parse availability_slots from the free-text value when not supplied"""
+    if volunteer.get('availability_slots') is None:
+        volunteer['availability_slots'] = parse_availability(volunteer.get('availability'))
+
+
+def get_volunteer_slots(volunteer: dict) -> List[int]:
+    """Stored slots for a volunteer, falling back to parsing the legacy string"""
+    slots = volunteer.get('availability_slots')
+    if isinstance(slots, list) and len(slots) == len(DAYS):
+        return slots
+    return parse_availability(volunteer.get('availability'))
+
+
+class VolunteerAvailabilityIndex:
+    """In-memory index of volunteer availability bitmaps grouped by skill
+
+    Built from one scan of the volunteers collection and invalidated by the
+    volunteer write routes. A lookup is a dict access for the skill plus one
+    integer AND per volunteer holding it.
+    """
+
+    def __init__(self):
+        self.bitmaps: Dict[str, int] = {}
+        self.names: Dict[str, str] = {}
+        self.skills: Dict[str, List[str]] = {}
+        self.by_skill: Dict[str, List[str]] = {}
+
+    @classmethod
+    def build(cls, volunteers) -> "VolunteerAvailabilityIndex":
+        index = cls()
+        for volunteer in volunteers:
+            volunteer_id = str(volunteer['_id'])
+            skills = volunteer.get('skills') or []
+            if isinstance(skills, str):
+                skills = [skills]
+            index.bitmaps[volunteer_id] = slots_to_bitmap(get_volunteer_slots(volunteer))
+            index.names[volunteer_id] = volunteer.get('name', 'Unknown')
+            index.skills[volunteer_id] = skills
+            for skill in skills:
+                index.by_skill.setdefault(skill, []).append(volunteer_id)
+        return index
+
+    def find_available(self, window: int, skills: Optional[List[str]] = None,
+                       require_all: bool = True) -> List[dict]:
+        """Volunteers holding any of the skills whose bitmap covers the window
+
+        With require_all the volunteer must be free for every hour in the
+        window, otherwise any overlap is enough.
+        """
+        if skills:
+            candidates = []
+            seen = set()
+            for skill in skills:
+                for volunteer_id in self.by_skill.get(skill, []):
+                    if volunteer_id not in seen:
+                        seen.add(volunteer_id)
+                        candidates.append(volunteer_id)
+        else:
+            candidates = list(self.bitmaps.keys())
+
+        matches = []
+        for volunteer_id in candidates:
+            overlap = self.bitmaps[volunteer_id] & window
+            if (overlap == window) if require_all else overlap:
+                matches.append({
+                    'id': volunteer_id,
+                    'name': self.names[volunteer_id],
+                    'skills': self.skills[volunteer_id],
+                    'matching_skills': [s for s in self.skills[volunteer_id] if skills and s in skills],
+                })
+        return matches
+
+
+_index: Optional[VolunteerAvailabilityIndex] = None
+
+
+def get_availability_index(db) -> VolunteerAvailabilityIndex:
+    """Return the cached availability index, building it on first use"""
+    global _index
+    if _index is None:
+        _index = VolunteerAvailabilityIndex.build(
+            db.volunteers.find({}, {'name': 1, 'skills': 1, 'availability': 1, 'availability_slots': 1})
+        )
+    return _index
+
+
+def invalidate_availability_index():
+    """Drop the cached index so the next lookup rebuilds it"""
+    global _index
+    _index = None
@@ -0,0 +1,93 @@
+"""
+Check Adoption Rate
+Compare the $lookup adoption rate pipeline with the previous in-Python
+computation (set of adopted animal ids) on a real database, and time both
+
+Usage:
+    python benchmarks/seed.py --scale 100k
+    python benchmarks/check_adoption_rate.py --db pet_adoption_bench --within-days 90
+"""
+
+from pymongo import MongoClient
+from collections import defaultdict
+from datetime import timedelta
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.config import MONGO_URI
+from backend.api.routes.charts import adoption_rate_pipeline
+from backend.animal_filters import AnimalFilter
+
+
+def rate_in_python(db, filter_dict: dict, within_days=None) -> dict:
+    """The previous implementation: every adoption loaded into memory, animals walked one by one"""
+    adoption_dates = defaultdict(list)
+    for adoption in db.adoptions.find({}, {'animal_id': 1, 'adoption_date': 1}):
+        adoption_dates[adoption['animal_id']].append(adoption.get('adoption_date'))
+
+    stats = defaultdict(lambda: {'total': 0, 'adopted': 0})
+    for animal in db.animals.find(filter_dict, {'species': 1, 'intake_date': 1}):
+        row = stats[animal.get('species') or 'Unknown']
+        row['total'] += 1
+        dates = adoption_dates.get(animal['_id'])
+        if dates is None:
+            continue
+        if within_days is None:
+            row['adopted'] += 1
+            continue
+        intake = animal.get('intake_date')
+        # Same rule as the pipeline: both dates must be BSON dates
+        if hasattr(intake, 'year') and any(hasattr(d, 'year') and d - intake <= timedelta(days=within_days)
+                                           for d in dates):
+            row['adopted'] += 1
+    return dict(stats)
+
+
+def rate_in_mongodb(db, filter_dict: dict, within_days=None) -> dict:
+    return {row['_id']: {'total': row['total'], 'adopted': row['adopted']}
+            for row in db.animals.aggregate(adoption_rate_pipeline(filter_dict, within_days))}
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the adoption rate pipeline against the Python version")
+    parser.add_argument("--db", default="pet_adoption_bench", help="Database to check")
+    parser.add_argument("--within-days", type=int, default=90, help="Window to check besides the all-time rate")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    db = client[args.db]
+    filters = [{}]
+    filters += [AnimalFilter({'species': [s]}).query() for s in sorted(db.animals.distinct('species'))]
+    filters += [AnimalFilter({'status': [s]}).query() for s in sorted(db.animals.distinct('status'))]
+
+    mismatches = 0
+    for filter_dict in filters:
+        for within_days in (None, args.within_days):
+            expected, python_ms = timed(rate_in_python, db, filter_dict, within_days)
+            actual, mongo_ms = timed(rate_in_mongodb, db, filter_dict, within_days)
+            ok = expected == actual
+            mismatches += not ok
+            window = f"within {within_days}d" if within_days else "all time"
+            print(f"{'✅' if ok else '❌'} {str(filter_dict or 'no filter'):40} {window:14} "
+                  f"python {python_ms:8.1f}ms  mongodb {mongo_ms:8.1f}ms")
+            if not ok:
+                print(f"   expected {expected}\n   got      {actual}")
+    client.close()
+
+    if mismatches:
+        print(f"\n❌ {mismatches} mismatches")
+        sys.exit(1)
+    print("\n✅ Pipeline matches the Python implementation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compare Configs
+Run the benchmark once per driver configuration (pool size, wire compression)
+and print p95 / throughput side by side
+
+Usage:
+    python benchmarks/compare_configs.py --routes "^(api|chart):" --output pool_matrix.json
+    python benchmarks/compare_configs.py --pool-sizes 10 50 100 --compressors none zlib zstd
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Chart and list endpoints - the ones that move the most data per request
+DEFAULT_ROUTES = r"^(chart:|api:(animals|adopters|adoptions|medical|volunteers|volunteer-activities)$)"
+
+
+def run_config(args, pool_size: int, compressor: str) -> dict:
+    """Benchmark one configuration; a run that fails gives {'failed': True, 'error': ...}"""
+    env = [f"MONGO_MAX_POOL_SIZE={pool_size}", f"MONGO_COMPRESSORS={'' if compressor == 'none' else compressor}"]
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        output = f.name
+    command = [
+        sys.executable, os.path.join(HERE, 'run_benchmarks.py'), '--start-server',
+        '--base-url', args.base_url, '--db', args.db, '--routes', args.routes,
+        '--requests', str(args.requests), '--concurrency', str(args.concurrency), '--output', output,
+    ]
+    for item in env:
+        command += ['--server-env', item]
+    try:
+        completed = subprocess.run(command, check=False)
+        if completed.returncode != 0:
+            return {'failed': True, 'error': f"run_benchmarks.py exited with {completed.returncode}"}
+        with open(output) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        return {'failed': True, 'error': str(e)}
+    finally:
+        os.unlink(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pool size and wire compression settings")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5001", help="Where the benchmark server listens")
+    parser.add_argument("--db", default="pet_adoption_bench", help="Seeded benchmark database")
+    parser.add_argument("--routes", default=DEFAULT_ROUTES, help="Route name regex")
+    parser.add_argument("--pool-sizes", type=int, nargs='+', default=[10, 50, 100])
+    parser.add_argument("--compressors", nargs='+', default=['none', 'zlib', 'zstd', 'snappy'])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients per route")
+    parser.add_argument("--output", help="Write all results to this JSON file")
+    args = parser.parse_args()
+
+    results = {}
+    for compressor in args.compressors:
+        for pool_size in args.pool_sizes:
+            label = f"pool={pool_size} compressors={compressor}"
+            print(f"\n⚙️  {label}")
+            results[label] = run_config(args, pool_size, compressor)
+            if results[label].get('failed'):
+                print(f"❌ {label} failed: {results[label]['error']}")
+
+    routes = sorted({name for result in results.values() for name in result.get('routes', {})})
+    labels = list(results)
+    print("\np95 ms / req/s per route")
+    print(f"{'route':34}" + ''.join(f"{label:>30}" for label in labels))
+    for name in routes:
+        cells = []
+        for label in labels:
+            stats = results[label].get('routes', {}).get(name)
+            cells.append(f"{stats['p95_ms']:>10} / {stats['rps']:<8}" if stats else 'n/a')
+        print(f"{name:34}" + ''.join(f"{cell:>30}" for cell in cells))
+    failed = [label for label in labels if results[label].get('failed')]
+    if failed:
+        print(f"\n⚠️  No results for {', '.join(failed)}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark Endpoints
+The routes driven by run_benchmarks.py and the sample values used to fill them
+"""
+
+import random
+from typing import Dict, List
+
+# (name, path template, query params); {animal_id} style placeholders are
+# replaced with ids sampled from the seeded database on every request
+ENDPOINTS = [
+    # HTML pages
+    ('page:dashboard', '/dashboard', {}),
+    ('page:animals', '/animals', {}),
+    ('page:animals?status', '/animals', {'status': 'Available'}),
+    ('page:adopters', '/adopters', {}),
+    ('page:adoptions', '/adoptions', {}),
+    ('page:medical', '/medical', {}),
+    ('page:volunteers', '/volunteers', {}),
+    ('page:volunteer-activities', '/volunteer-activities', {}),
+    ('page:charts', '/charts', {}),
+    ('page:search-adopter', '/search/adopter', {}),
+    ('page:search-medical', '/search/medical', {}),
+
+    # JSON lists and lookups
+    ('api:animals', '/api/animals', {}),
+    ('api:animals?species', '/api/animals', {'species': '{species}'}),
+    ('api:animal', '/api/animals/{animal_id}', {}),
+    ('api:species-breeds', '/api/animals/species-breeds', {}),
+    ('api:suggested-volunteers', '/api/animals/{animal_id}/suggested-volunteers', {}),
+    ('api:adopters', '/api/adopters', {}),
+    ('api:adopter', '/api/adopters/{adopter_id}', {}),
+    ('api:adoptions', '/api/adoptions', {}),
+    ('api:adoption', '/api/adoptions/{adoption_id}', {}),
+    ('api:medical', '/api/medical', {}),
+    ('api:medical-record', '/api/medical/{medical_record_id}', {}),
+    ('api:volunteers', '/api/volunteers', {}),
+    ('api:volunteer', '/api/volunteers/{volunteer_id}', {}),
+    ('api:volunteers-available', '/api/volunteers/available',
+     {'day': '{day}', 'start_hour': 9, 'end_hour': 12}),
+    ('api:volunteer-activities', '/api/volunteer-activities', {}),
+    ('api:volunteer-activity', '/api/volunteer-activities/{volunteer_activity_id}', {}),
+    ('api:activity-stats', '/api/volunteer-activities/stats/summary', {}),
+    ('api:search-adopter', '/api/search/adopter/{adopter_id}', {}),
+    ('api:search-medical', '/api/search/medical/{animal_id}', {}),
+
+    # Charts, unfiltered and filtered
+    ('chart:breed', '/api/charts/breed', {'species': '{species}'}),
+    ('chart:species', '/api/charts/species', {}),
+    ('chart:status', '/api/charts/status', {}),
+    ('chart:status?species', '/api/charts/status', {'species': '{species}'}),
+    ('chart:age-distribution', '/api/charts/age-distribution', {}),
+    ('chart:adoptions', '/api/charts/adoptions', {}),
+    ('chart:adoptions?range', '/api/charts/adoptions', {'start_date': '2020-01-01', 'end_date': '2022-12-31'}),
+    ('chart:adoptions?week', '/api/charts/adoptions', {'granularity': 'week'}),
+    ('chart:intakes', '/api/charts/intakes', {}),
+    ('chart:volunteer-activity', '/api/charts/volunteer-activity', {'granularity': 'quarter'}),
+    ('chart:occupancy', '/api/charts/occupancy', {}),
+    ('chart:days-to-adoption', '/api/charts/days-to-adoption', {}),
+    ('chart:days-to-adoption-percentiles', '/api/charts/days-to-adoption/percentiles', {'group_by': 'breed'}),
+    ('chart:forecast', '/api/charts/forecast', {'metric': 'intakes'}),
+    ('chart:adoption-rate', '/api/charts/adoption-rate', {}),
+    ('chart:gender-distribution', '/api/charts/gender-distribution', {}),
+    ('chart:medical-visits', '/api/charts/medical-visits', {}),
+    ('chart:medical-visits?species', '/api/charts/medical-visits', {'species': '{species}'}),
+    ('chart:medical-visits-by-species', '/api/charts/medical-visits-by-species', {}),
+    ('chart:medical-visits-by-breed', '/api/charts/medical-visits-by-breed', {'species': '{species}'}),
+]
+
+# Collections whose ids are sampled, keyed by the placeholder name
+ID_SOURCES = {
+    'animal_id': 'animals',
+    'adopter_id': 'adopters',
+    'adoption_id': 'adoptions',
+    'medical_record_id': 'medical_records',
+    'volunteer_id': 'volunteers',
+    'volunteer_activity_id': 'volunteer_activities',
+}
+
+ID_SAMPLE_SIZE = 1000
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def load_samples(db) -> Dict[str, List[str]]:
+    """Pick random ids from each collection, plus the species present"""
+    samples = {}
+    for placeholder, collection in ID_SOURCES.items():
+        docs = db[collection].aggregate([{'$sample': {'size': ID_SAMPLE_SIZE}}, {'$project': {'_id': 1}}])
+        samples[placeholder] = [str(doc['_id']) for doc in docs]
+    samples['species'] = [s for s in db.animals.distinct('species') if s]
+    samples['day'] = DAYS
+    return samples
+
+
+def fill(value, samples: Dict[str, List[str]], rng: random.Random):
+    """Replace {placeholder} markers in a path or param value"""
+    if not isinstance(value, str) or '{' not in value:
+        return value
+    for key, choices in samples.items():
+        marker = '{' + key + '}'
+        if marker in value:
+            if not choices:
+                raise LookupError(f"No sample values for {key}")
+            value = value.replace(marker, rng.choice(choices))
+    return value
+
+
+def build_request(path: str, params: dict, samples: Dict[str, List[str]], rng: random.Random):
+    return fill(path, samples, rng), {k: fill(v, samples, rng) for k, v in params.items()}
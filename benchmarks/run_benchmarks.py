@@ -0,0 +1,302 @@
+"""
+Run Benchmarks
+Drive every page and JSON endpoint with concurrent clients and report
+throughput and latency percentiles per route
+
+Usage:
+    python benchmarks/seed.py --scale 100k
+    python benchmarks/run_benchmarks.py --start-server --output results.json
+    python benchmarks/run_benchmarks.py --baseline baseline.json --tolerance 0.15
+"""
+
+from pymongo import MongoClient
+from bson import ObjectId
+from datetime import datetime
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.config import MONGO_URI
+from benchmarks.endpoints import ENDPOINTS, build_request, load_samples
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    # The smallest value with at least pct% of the values at or below it
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct * len(sorted_values) / 100) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        'requests': total,
+        'errors': errors,
+        'rps': round(total / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        'max_ms': round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+async def bench_route(client: httpx.AsyncClient, path: str, params: dict, samples: dict,
+                      requests: int, concurrency: int, seed: int) -> dict:
+    """Send `requests` GETs from `concurrency` workers and time each one"""
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            url, query = build_request(path, params, samples, rng)
+            started = time.perf_counter()
+            try:
+                response = await client.get(url, params=query)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def adoption_race(client: httpx.AsyncClient, db, attempts: int) -> dict:
+    """Fire parallel adoptions at one Available animal; exactly one may win"""
+    animal = db.animals.find_one({'status': 'Available'}, {'_id': 1})
+    adopters = [str(a['_id']) for a in db.adopters.find({}, {'_id': 1}).limit(attempts)]
+    if animal is None or not adopters:
+        return {'skipped': 'needs an Available animal and at least one adopter'}
+    animal_id = str(animal['_id'])
+
+    async def attempt(i):
+        response = await client.post('/api/adoptions', json={
+            'animal_id': animal_id,
+            'adopter_id': adopters[i % len(adopters)],
+            'adoption_date': datetime.now().strftime('%Y-%m-%d'),
+        })
+        created = response.json().get('_id') if response.status_code < 300 else None
+        return response.status_code, created
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(attempt(i) for i in range(attempts)))
+    elapsed = time.perf_counter() - started
+    codes = [code for code, _ in outcomes]
+
+    # Put the data back so the run can be repeated
+    created = [ObjectId(doc_id) for _, doc_id in outcomes if doc_id]
+    if created:
+        db.adoptions.delete_many({'_id': {'$in': created}})
+    db.animals.update_one({'_id': animal['_id']}, {'$set': {'status': 'Available'}})
+
+    succeeded = sum(1 for code in codes if code < 300)
+    return {
+        'attempts': attempts,
+        'succeeded': succeeded,
+        'conflicts': sum(1 for code in codes if code == 409),
+        'other_errors': sum(1 for code in codes if code >= 300 and code != 409),
+        'passed': succeeded == 1,
+        'elapsed_ms': round(elapsed * 1000, 2),
+    }
+
+
+async def activity_ingest(client: httpx.AsyncClient, db, requests: int, concurrency: int, seed: int) -> dict:
+    """POST volunteer activities concurrently; compare runs with ACTIVITY_BUFFER_ENABLED on/off"""
+    rng = random.Random(seed)
+    volunteers = [str(v['_id']) for v in db.volunteers.find({}, {'_id': 1}).limit(100)]
+    animals = [str(a['_id']) for a in db.animals.find({}, {'_id': 1}).limit(1000)]
+    if not volunteers or not animals:
+        return {'skipped': 'needs volunteers and animals'}
+    marker = f"benchmark-{seed}"
+    latencies, errors = [], 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.post('/api/volunteer-activities', json={
+                'volunteer_id': rng.choice(volunteers),
+                'animal_id': rng.choice(animals),
+                'activity_type': 'Walking',
+                'activity_date': '2024-01-01',
+                'duration_minutes': 30,
+                'notes': marker,
+            })
+            if response.status_code < 300:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(latencies, errors, time.perf_counter() - started)
+    db.volunteer_activities.delete_many({'notes': marker})
+    return result
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Routes whose p95 grew or throughput fell by more than `tolerance`"""
+    regressions = []
+    for name, current in results['routes'].items():
+        previous = baseline.get('routes', {}).get(name)
+        if not previous:
+            continue
+        if previous['p95_ms'] and current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+        if previous['rps'] and current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {previous['rps']} -> {current['rps']} req/s")
+        if current['errors'] > previous['errors']:
+            regressions.append(f"{name}: errors {previous['errors']} -> {current['errors']}")
+    return regressions
+
+
+def start_server(db_name: str, port: int, env_overrides: list) -> subprocess.Popen:
+    env = dict(os.environ, DB_NAME=db_name)
+    for item in env_overrides:
+        key, _, value = item.partition('=')
+        env[key] = value
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=ROOT, env=env
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/animals/species-breeds", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError("Server did not start within 30s")
+
+
+async def run(args, db) -> dict:
+    samples = load_samples(db)
+    pattern = re.compile(args.routes) if args.routes else None
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'base_url': args.base_url,
+        'db': args.db,
+        'counts': {name: db[name].estimated_document_count() for name in
+                   ['animals', 'adopters', 'adoptions', 'medical_records', 'volunteers', 'volunteer_activities']},
+        'concurrency': args.concurrency,
+        'requests_per_route': args.requests,
+        'routes': {},
+        'scenarios': {},
+    }
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        for name, path, params in ENDPOINTS:
+            if pattern and not pattern.search(name):
+                continue
+            # Warm caches and connections so the first request doesn't skew p99
+            await bench_route(client, path, params, samples, min(args.concurrency, 5), 1, args.seed)
+            stats = await bench_route(client, path, params, samples, args.requests, args.concurrency, args.seed)
+            results['routes'][name] = stats
+            print(f"   {name:38} {stats['rps']:>8} req/s  p50 {stats['p50_ms']:>8} ms  "
+                  f"p95 {stats['p95_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms  errors {stats['errors']}")
+
+        if 'adoption-race' in args.scenario:
+            results['scenarios']['adoption_race'] = await adoption_race(client, db, args.race_attempts)
+            print(f"   adoption race: {results['scenarios']['adoption_race']}")
+        if 'activity-ingest' in args.scenario:
+            results['scenarios']['activity_ingest'] = await activity_ingest(
+                client, db, args.requests, args.concurrency, args.seed)
+            print(f"   activity ingest: {results['scenarios']['activity_ingest']}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the shelter API and report latency per route")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5001", help="Server to benchmark")
+    parser.add_argument("--db", default="pet_adoption_bench", help="Database the server is using (for id samples)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per route")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    parser.add_argument("--routes", help="Only run routes whose name matches this regex")
+    parser.add_argument("--scenario", action="append", default=[], choices=['adoption-race', 'activity-ingest'],
+                        help="Also run a write scenario (repeatable)")
+    parser.add_argument("--race-attempts", type=int, default=100, help="Parallel requests in the adoption race")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for id sampling")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", help="Compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression before failing (0.2 = 20%%)")
+    parser.add_argument("--start-server", action="store_true", help="Launch uvicorn against --db for the run")
+    parser.add_argument("--server-env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for --start-server, e.g. ACTIVITY_BUFFER_ENABLED=true")
+    args = parser.parse_args()
+
+    client = MongoClient(MONGO_URI)
+    db = client[args.db]
+    if db.animals.estimated_document_count() == 0:
+        print(f"❌ {args.db} is empty - run benchmarks/seed.py first")
+        sys.exit(1)
+
+    server = None
+    if args.start_server:
+        port = int(args.base_url.rsplit(':', 1)[-1])
+        server = start_server(args.db, port, args.server_env)
+
+    print(f"🏁 Benchmarking {args.base_url} ({args.requests} requests x {args.concurrency} clients per route)")
+    try:
+        results = asyncio.run(run(args, db))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+        client.close()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+
+    race = results['scenarios'].get('adoption_race')
+    failed = bool(race and race.get('passed') is False)
+    if race and failed:
+        print(f"❌ Adoption race let {race['succeeded']} requests adopt the same animal")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   - {line}")
+            failed = True
+        else:
+            print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
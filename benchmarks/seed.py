@@ -0,0 +1,40 @@
+"""
+Benchmark Seeder
+Fill a benchmark database with proportional synthetic data at a given scale
+
+Usage:
+    python benchmarks/seed.py --scale 100k --db pet_adoption_bench
+"""
+
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.generate_data import ANIMALS_PER_SCALE, generate
+
+# Number of animals per named scale; other collections are proportional
+SCALES = {
+    '1k': 1_000,
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a benchmark database")
+    parser.add_argument("--scale", default="1k", choices=list(SCALES), help="Number of animals")
+    parser.add_argument("--db", default="pet_adoption_bench", help="Database to (re)fill")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible data")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel insert processes")
+    args = parser.parse_args()
+
+    print(f"🌱 Seeding {args.db} at scale {args.scale}...")
+    written = generate(args.db, SCALES[args.scale] / ANIMALS_PER_SCALE, seed=args.seed, workers=args.workers,
+                       progress=None)
+    for name, count in written.items():
+        print(f"   - {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,26 @@ function showAlert(message, type = 'info') {
     }, 5000);
 }
 
+// Show how many animals each filter option would match, e.g. "Dog (120)"
+// selects maps a facet field (species, status, ...) to its <select>
+async function updateFacetCounts(selects, query) {
+    try {
+        const response = await fetch(`/api/animals/facets${query ? '?' + query : ''}`);
+        if (!response.ok) return;
+        const result = await response.json();
+        for (const [field, select] of Object.entries(selects)) {
+            const counts = result.facets[field] || {};
+            for (const option of select.options) {
+                if (!option.value) continue;
+                if (option.dataset.label === undefined) option.dataset.label = option.textContent;
+                option.textContent = `${option.dataset.label} (${counts[option.value] || 0})`;
+            }
+        }
+    } catch (error) {
+        console.error('Error loading filter counts:', error);
+    }
+}
+
 // Handle form submissions
 document.addEventListener('DOMContentLoaded', function() {
     // Add active class to current nav link
@@ -4,15 +4,26 @@ Main FastAPI Application Entry Point
 """
 
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from contextlib import asynccontextmanager
+import asyncio
 from typing import Optional
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, PyMongoError
 import uvicorn
 
-from backend.database.connection import get_database, close_database
-from backend.api.routes import dashboard, animals, adopters, adoptions, medical, volunteers, search, charts, volunteer_activities
+from backend.database.connection import get_database, close_database, start_health_probe, report_database_failure, breaker, warm_up_pool
+from backend.database.circuit_breaker import DatabaseUnavailableError
+from backend.database.activity_buffer import close_activity_buffer
+from backend.database.indexes import ensure_indexes
+from backend.database.deadlines import deadline_middleware, is_deadline_exceeded, deadline_exceeded_response
+from backend.config import METRICS_ENABLED, PROFILING_ENABLED, MONGO_MIN_POOL_SIZE, REQUEST_DEADLINE_SECONDS
+from backend.config import ANALYTICS_SNAPSHOT_ENABLED, ANALYTICS_SNAPSHOT_REFRESH_SECONDS
+from backend.analytics.snapshot import start_animal_snapshot, stop_animal_snapshot
+from backend.monitoring.middleware import monitoring_middleware, MONITORING_ENABLED
+from backend.monitoring.profiler import profiling_middleware
+from backend.api.routes import dashboard, animals, adopters, adoptions, medical, volunteers, search, charts, volunteer_activities, imports, metrics, admin, health
 
 
 @asynccontextmanager
@@ -20,16 +31,32 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
     # Startup
     print("Starting Pet Adoption System...")
-    db = get_database()
-    if db is None:
-        print("⚠️  Warning: Database connection failed. Some features may not work.")
-    else:
+    try:
+        db = get_database()
         print("✅ Connected to MongoDB successfully!")
+        try:
+            # Joins on the reference fields scan whole collections without these
+            await asyncio.to_thread(ensure_indexes, db)
+        except PyMongoError as e:
+            print(f"⚠️  Warning: Could not create indexes: {e}")
+        if MONGO_MIN_POOL_SIZE:
+            elapsed_ms = await asyncio.to_thread(warm_up_pool, MONGO_MIN_POOL_SIZE)
+            print(f"   Opened {MONGO_MIN_POOL_SIZE} pooled connections in {elapsed_ms:.0f} ms")
+    except DatabaseUnavailableError:
+        print("⚠️  Warning: Database connection failed. Retrying in the background; requests get 503 until then.")
+    # Keeps /health/ready current and notices outages between requests
+    start_health_probe()
+    # Charts read from memory once the snapshot has loaded (MongoDB until then)
+    if ANALYTICS_SNAPSHOT_ENABLED:
+        start_animal_snapshot(get_database, ANALYTICS_SNAPSHOT_REFRESH_SECONDS)
     
     yield
     
     # Shutdown
     print("Shutting down Pet Adoption System...")
+    stop_animal_snapshot()
+    # Flush buffered activity writes before the connection goes away
+    await close_activity_buffer()
     close_database()
 
 
@@ -41,6 +68,46 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+@app.exception_handler(DatabaseUnavailableError)
+async def database_unavailable_handler(request: Request, exc: DatabaseUnavailableError):
+    """Fail fast with 503 while the circuit breaker is open"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database unavailable, please retry shortly", "retry_after": round(exc.retry_after, 1)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+    )
+
+
+@app.exception_handler(ExecutionTimeout)
+async def execution_timeout_handler(request: Request, exc: ExecutionTimeout):
+    """MongoDB stopped a command at its maxTimeMS"""
+    if is_deadline_exceeded(request, exc):
+        return deadline_exceeded_response(request)
+    return JSONResponse(status_code=504, content={"detail": "Database operation timed out"})
+
+
+@app.exception_handler(ConnectionFailure)
+async def database_connection_failure_handler(request: Request, exc: ConnectionFailure):
+    """A query hit a connection error - open the circuit so the next requests fail fast"""
+    if is_deadline_exceeded(request, exc):
+        # The request ran out of time, the database itself is fine
+        return deadline_exceeded_response(request)
+    report_database_failure(exc)
+    return await database_unavailable_handler(request, DatabaseUnavailableError(breaker.retry_after(), str(exc)))
+
+
+# Per-request database tracking (metrics, N+1 detection)
+if MONITORING_ENABLED:
+    app.middleware("http")(monitoring_middleware)
+if METRICS_ENABLED:
+    app.include_router(metrics.router, tags=["Monitoring"])
+# Per-request time budgets, passed to MongoDB as maxTimeMS
+if REQUEST_DEADLINE_SECONDS > 0:
+    app.middleware("http")(deadline_middleware)
+# On-demand profiling of single requests (admin only)
+if PROFILING_ENABLED:
+    app.middleware("http")(profiling_middleware)
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="frontend/static"), name="static")
 
@@ -94,6 +161,9 @@ app.include_router(volunteers.router, prefix="/api/volunteers", tags=["Volunteer
 app.include_router(volunteer_activities.router, prefix="/api/volunteer-activities", tags=["Volunteer Activities API"])
 app.include_router(search.router, prefix="/api/search", tags=["Search API"])
 app.include_router(charts.router, prefix="/api/charts", tags=["Charts API"])
+app.include_router(imports.router, prefix="/api/import", tags=["Import API"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
 
 
 @app.get("/")
@@ -0,0 +1,47 @@
+"""
+Test Fixtures
+Tests that need MongoDB run against MONGO_URI in a throwaway database
+(DB_NAME, default pet_adoption_test) and are skipped when it isn't reachable
+"""
+
+import os
+
+# Before the backend reads its config
+os.environ.setdefault("DB_NAME", "pet_adoption_test")
+os.environ.setdefault("MONGO_SERVER_SELECTION_TIMEOUT_MS", "1000")
+# Any request repeating a query shape more than N_PLUS_ONE_THRESHOLD times fails with a 500
+os.environ.setdefault("N_PLUS_ONE_DETECTION", "strict")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.config import DB_NAME
+from backend.database.circuit_breaker import DatabaseUnavailableError
+from backend.database.connection import get_database
+
+COLLECTIONS = ('animals', 'adopters', 'adoptions', 'medical_records', 'volunteers', 'volunteer_activities')
+
+
+@pytest.fixture
+def db():
+    """Empty test database (every collection dropped before the test)"""
+    if not DB_NAME.endswith('_test'):
+        pytest.skip(f"DB_NAME={DB_NAME} doesn't end in _test, refusing to drop its collections")
+    try:
+        database = get_database()
+    except DatabaseUnavailableError:
+        pytest.skip("MongoDB not reachable at MONGO_URI")
+    for name in COLLECTIONS:
+        database.drop_collection(name)
+    return database
+
+
+@pytest.fixture
+def client():
+    """Test client without the lifespan (no snapshot, probe or pool warm-up)
+
+    Not entered as a context manager, so every request gets its own event
+    loop thread and requests sent from several threads really overlap.
+    """
+    from main import app
+    return TestClient(app)
@@ -0,0 +1,85 @@
+"""
+Activity Write Buffer Tests
+In-memory stand-ins for the collections, no MongoDB needed
+"""
+
+import asyncio
+from contextvars import ContextVar
+
+import pytest
+from bson import ObjectId
+
+from backend.database.activity_buffer import ActivityWriteBuffer, MissingReferenceError
+
+request_marker = ContextVar('request_marker', default=None)
+
+
+class _Collection:
+    def __init__(self, ids=()):
+        self.ids = set(ids)
+        self.finds = 0
+        self.inserted = []
+        self.insert_contexts = []
+
+    def find(self, query, projection=None):
+        self.finds += 1
+        return [{'_id': _id} for _id in query['_id']['$in'] if _id in self.ids]
+
+    def insert_many(self, docs, ordered=True):
+        self.insert_contexts.append(request_marker.get())
+        for doc in docs:
+            doc['_id'] = ObjectId()
+        self.inserted.extend(docs)
+
+
+class _Database:
+    def __init__(self, volunteers, animals):
+        self.volunteers = _Collection(volunteers)
+        self.animals = _Collection(animals)
+        self.volunteer_activities = _Collection()
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+
+def activity(volunteer_id, animal_id):
+    return {'volunteer_id': str(volunteer_id), 'animal_id': str(animal_id),
+            'activity_type': 'Walking', 'activity_date': '2024-03-01', 'duration_minutes': 30}
+
+
+def test_batch_checks_references_with_one_query_per_collection():
+    volunteer, animal = ObjectId(), ObjectId()
+    db = _Database([volunteer], [animal])
+    buffer = ActivityWriteBuffer(db, max_docs=3, max_delay_ms=1000)
+
+    async def submit_all():
+        return await asyncio.gather(
+            buffer.submit(activity(volunteer, animal)),
+            buffer.submit(activity(ObjectId(), animal)),
+            buffer.submit(activity(volunteer, ObjectId())),
+            return_exceptions=True
+        )
+
+    written, no_volunteer, no_animal = asyncio.run(submit_all())
+
+    assert written['animal_id'] == str(animal) and isinstance(written['_id'], str)
+    assert isinstance(no_volunteer, MissingReferenceError) and str(no_volunteer) == "Volunteer not found"
+    assert isinstance(no_animal, MissingReferenceError) and str(no_animal) == "Animal not found"
+    assert db.volunteers.finds == 1 and db.animals.finds == 1
+    assert len(db.volunteer_activities.inserted) == 1
+
+
+@pytest.mark.parametrize("max_docs", [1, 100])
+def test_batch_is_written_outside_the_submitting_request_context(max_docs):
+    volunteer, animal = ObjectId(), ObjectId()
+    db = _Database([volunteer], [animal])
+    buffer = ActivityWriteBuffer(db, max_docs=max_docs, max_delay_ms=1)
+
+    async def request():
+        # Stands in for the request's pymongo.timeout() deadline and RequestStats
+        request_marker.set('request')
+        return await buffer.submit(activity(volunteer, animal))
+
+    asyncio.run(request())
+
+    assert db.volunteer_activities.insert_contexts == [None]
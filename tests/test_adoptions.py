@@ -0,0 +1,42 @@
+"""
+Adoption Tests
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+def test_concurrent_adoptions_of_one_animal(db, client):
+    animal_id = db.animals.insert_one({
+        'name': 'Rex', 'species': 'Dog', 'breed': 'Beagle', 'age': 3,
+        'gender': 'Male', 'status': 'Available'
+    }).inserted_id
+    adopter_ids = db.adopters.insert_many([
+        {'name': f'Adopter {i}', 'phone': '555-0100', 'email': f'adopter{i}@example.com', 'address': '1 Main St'}
+        for i in range(100)
+    ]).inserted_ids
+
+    def adopt(adopter_id):
+        return client.post('/api/adoptions', json={'animal_id': str(animal_id), 'adopter_id': str(adopter_id)})
+
+    with ThreadPoolExecutor(max_workers=100) as pool:
+        statuses = [response.status_code for response in pool.map(adopt, adopter_ids)]
+
+    assert statuses.count(200) == 1
+    assert statuses.count(409) == 99
+    assert db.adoptions.count_documents({'animal_id': animal_id}) == 1
+    assert db.animals.find_one({'_id': animal_id})['status'] == 'Adopted'
+
+
+def test_adopting_an_unavailable_animal_conflicts(db, client):
+    animal_id = db.animals.insert_one({
+        'name': 'Tom', 'species': 'Cat', 'breed': 'Siamese', 'age': 2,
+        'gender': 'Male', 'status': 'Medical'
+    }).inserted_id
+    adopter_id = db.adopters.insert_one(
+        {'name': 'Ann', 'phone': '555-0100', 'email': 'ann@example.com', 'address': '1 Main St'}
+    ).inserted_id
+
+    response = client.post('/api/adoptions', json={'animal_id': str(animal_id), 'adopter_id': str(adopter_id)})
+
+    assert response.status_code == 409
+    assert db.adoptions.count_documents({}) == 0
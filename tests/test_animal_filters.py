@@ -0,0 +1,106 @@
+"""
+Animal Filter Tests
+"""
+
+import csv
+import io
+from datetime import datetime
+
+import pytest
+
+from backend.animal_filters import AnimalFilter
+from backend.database.deadlines import deadline_for
+
+
+def test_single_value_is_an_equality_and_several_an_in():
+    filters = AnimalFilter({'species': ['Dog'], 'status': ['Available', 'Medical'], 'breed': []})
+
+    assert filters.query() == {'species': 'Dog', 'status': {'$in': ['Available', 'Medical']}}
+
+
+def test_duplicate_values_collapse_to_an_equality():
+    assert AnimalFilter({'species': ['Dog', 'Dog']}).query() == {'species': 'Dog'}
+
+
+def test_age_and_intake_ranges_are_inclusive():
+    filters = AnimalFilter(age_min=1, age_max=3,
+                           intake_from=datetime(2024, 1, 1), intake_to=datetime(2024, 6, 30))
+
+    assert filters.query() == {
+        'age': {'$gte': 1, '$lte': 3},
+        'intake_date': {'$gte': datetime(2024, 1, 1), '$lte': datetime(2024, 6, 30)}
+    }
+    assert not filters.in_snapshot
+
+
+def test_open_ended_ranges():
+    assert AnimalFilter(age_min=2).query() == {'age': {'$gte': 2}}
+    assert AnimalFilter(intake_to=datetime(2024, 6, 30)).query() == {
+        'intake_date': {'$lte': datetime(2024, 6, 30)}
+    }
+
+
+def test_empty_filter_matches_everything():
+    filters = AnimalFilter()
+
+    assert filters.query() == {}
+    assert not filters
+    assert filters.in_snapshot
+
+
+@pytest.mark.parametrize("params, detail", [
+    ({'age_min': 5, 'age_max': 2}, "age_min must be less than or equal to age_max"),
+    ({'intake_from': '2024-06-30', 'intake_to': '2024-01-01'}, "intake_from must be before or equal to intake_to"),
+])
+@pytest.mark.parametrize("path", ["/api/animals", "/api/animals/export", "/api/charts/species"])
+def test_reversed_range_is_a_400(client, path, params, detail):
+    # Rejected by the dependency, before the route touches MongoDB
+    response = client.get(path, params=params)
+
+    assert response.status_code == 400
+    assert response.json()['detail'] == detail
+
+
+def test_bad_intake_date_is_a_400(client):
+    assert client.get("/api/animals", params={'intake_from': '2024-13-01'}).status_code == 400
+
+
+def test_negative_age_is_a_422(client):
+    assert client.get("/api/animals", params={'age_min': -1}).status_code == 422
+
+
+def test_export_has_no_deadline():
+    assert deadline_for('/api/animals/export') is None
+    assert deadline_for('/api/animals') is not None
+
+
+def seed(db):
+    db.animals.insert_many([
+        {'name': 'Rex', 'species': 'Dog', 'breed': 'Beagle', 'age': 2, 'gender': 'Male',
+         'status': 'Available', 'intake_date': datetime(2024, 1, 10)},
+        {'name': 'Tom', 'species': 'Cat', 'breed': 'Siamese', 'age': 5, 'gender': 'Male',
+         'status': 'Medical', 'intake_date': datetime(2024, 3, 1)},
+        {'name': 'Bea', 'species': 'Rabbit', 'breed': 'Lop', 'age': 1, 'gender': 'Female',
+         'status': 'Adopted', 'intake_date': datetime(2024, 5, 20)},
+    ])
+
+
+@pytest.mark.parametrize("params, names", [
+    ({'species': 'Dog'}, {'Rex'}),
+    ({'species': ['Dog', 'Cat']}, {'Rex', 'Tom'}),
+    ({'species': ['Dog', 'Cat'], 'status': 'Medical'}, {'Tom'}),
+    ({'age_min': 1, 'age_max': 2}, {'Rex', 'Bea'}),
+    ({'intake_from': '2024-03-01', 'intake_to': '2024-05-20'}, {'Tom', 'Bea'}),
+    ({}, {'Rex', 'Tom', 'Bea'}),
+])
+def test_list_and_export_apply_the_filter(db, client, params, names):
+    seed(db)
+
+    listed = client.get("/api/animals", params=params)
+    exported = client.get("/api/animals/export", params=params)
+
+    assert listed.status_code == 200
+    assert {animal['name'] for animal in listed.json()} == names
+    assert exported.status_code == 200
+    assert exported.headers['content-type'].startswith('text/csv')
+    assert {row['name'] for row in csv.DictReader(io.StringIO(exported.text))} == names
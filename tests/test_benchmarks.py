@@ -0,0 +1,34 @@
+"""
+Benchmark Helper Tests
+"""
+
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks import compare_configs
+from benchmarks.run_benchmarks import percentile
+
+
+@pytest.mark.parametrize("pct, expected", [
+    (50, 50), (95, 95), (99, 99), (100, 100), (7, 7), (0.5, 1), (0, 1),
+])
+def test_percentile_is_nearest_rank(pct, expected):
+    assert percentile(list(range(1, 101)), pct) == expected
+
+
+def test_percentile_of_small_samples():
+    assert percentile([10, 20, 30, 40], 50) == 20
+    assert percentile([10, 20, 30, 40], 51) == 30
+    assert percentile([5], 95) == 5
+    assert percentile([], 95) == 0.0
+
+
+def test_failed_run_is_recorded_not_raised(monkeypatch):
+    args = SimpleNamespace(base_url='http://127.0.0.1:5001', db='bench', routes='.*', requests=1, concurrency=1)
+    monkeypatch.setattr(subprocess, 'run', lambda *a, **kw: SimpleNamespace(returncode=1))
+
+    result = compare_configs.run_config(args, 10, 'zlib')
+
+    assert result['failed'] and '1' in result['error']
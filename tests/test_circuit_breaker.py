@@ -0,0 +1,48 @@
+"""
+Circuit Breaker Tests
+"""
+
+from pymongo.errors import NetworkTimeout
+
+from backend.database.circuit_breaker import CircuitBreaker
+
+
+def test_stays_closed_below_the_threshold():
+    breaker = CircuitBreaker(base_delay=0.5, max_delay=30, failure_threshold=3)
+
+    breaker.record_failure(NetworkTimeout("timed out"))
+    breaker.record_failure(NetworkTimeout("timed out"))
+
+    assert not breaker.is_open
+    assert breaker.retry_after() == 0
+    assert breaker.last_error == "timed out"
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(base_delay=0.5, max_delay=30, failure_threshold=3)
+
+    for _ in range(3):
+        breaker.record_failure(NetworkTimeout("timed out"))
+
+    assert breaker.is_open
+    # First backoff step: base_delay with up to 20% jitter
+    assert 0.35 <= breaker.retry_after() <= 0.6
+
+
+def test_success_resets_the_count():
+    breaker = CircuitBreaker(base_delay=0.5, max_delay=30, failure_threshold=2)
+
+    breaker.record_failure(NetworkTimeout("timed out"))
+    breaker.record_success(1.0)
+    breaker.record_failure(NetworkTimeout("timed out"))
+
+    assert not breaker.is_open
+    assert breaker.failures == 1
+
+
+def test_threshold_of_one_opens_on_the_first_failure():
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    breaker.record_failure(NetworkTimeout("timed out"))
+
+    assert breaker.is_open
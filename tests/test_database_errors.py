@@ -0,0 +1,87 @@
+"""
+Database Error Tests
+Driver errors raised inside the CRUD routes reach the app's handlers
+instead of being reported as a bad ID
+"""
+
+import importlib
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import ExecutionTimeout, ServerSelectionTimeoutError
+
+ID = str(ObjectId())
+
+ROUTES = [
+    ('adopters', 'put', f"/api/adopters/{ID}", {'name': 'Ann'}),
+    ('adopters', 'delete', f"/api/adopters/{ID}", None),
+    ('medical', 'get', f"/api/medical/{ID}", None),
+    ('medical', 'put', f"/api/medical/{ID}", {'treatment': 'Rest'}),
+    ('medical', 'delete', f"/api/medical/{ID}", None),
+    ('volunteers', 'get', f"/api/volunteers/{ID}", None),
+    ('volunteers', 'put', f"/api/volunteers/{ID}", {'name': 'Bo'}),
+    ('volunteers', 'delete', f"/api/volunteers/{ID}", None),
+    ('adoptions', 'get', f"/api/adoptions/{ID}", None),
+    ('adoptions', 'put', f"/api/adoptions/{ID}", {'notes': 'Settled in'}),
+    ('adoptions', 'delete', f"/api/adoptions/{ID}", None),
+    ('volunteer_activities', 'get', f"/api/volunteer-activities/{ID}", None),
+    ('volunteer_activities', 'put', f"/api/volunteer-activities/{ID}", {'notes': 'Walked'}),
+    ('volunteer_activities', 'delete', f"/api/volunteer-activities/{ID}", None),
+    ('search', 'get', f"/api/search/adopter/{ID}", None),
+    ('search', 'get', f"/api/search/medical/{ID}", None),
+]
+
+
+class _FailingDatabase:
+    """Every collection method raises the given driver error"""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def __getattr__(self, collection):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        raise self.error
+
+
+@pytest.fixture
+def failing_database(monkeypatch):
+    def patch(module: str, error: Exception):
+        routes = importlib.import_module(f"backend.api.routes.{module}")
+        monkeypatch.setattr(routes, 'get_database', lambda: _FailingDatabase(error))
+    return patch
+
+
+@pytest.mark.parametrize("module, method, path, body", ROUTES)
+def test_execution_timeout_is_a_504(client, failing_database, module, method, path, body):
+    failing_database(module, ExecutionTimeout("operation exceeded time limit", 50))
+
+    response = client.request(method, path, json=body)
+
+    assert response.status_code == 504
+
+
+@pytest.mark.parametrize("module, method, path, body", ROUTES)
+def test_connection_failure_is_a_503_seen_by_the_breaker(client, failing_database, monkeypatch,
+                                                         module, method, path, body):
+    import main
+    reported = []
+    monkeypatch.setattr(main, 'report_database_failure', reported.append)
+    failing_database(module, ServerSelectionTimeoutError("No servers found"))
+
+    response = client.request(method, path, json=body)
+
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
+    assert len(reported) == 1
+
+
+@pytest.mark.parametrize("module, method, path, body", ROUTES)
+def test_invalid_id_is_still_a_400(client, failing_database, module, method, path, body):
+    # Rejected before any query runs
+    failing_database(module, ExecutionTimeout("operation exceeded time limit", 50))
+
+    response = client.request(method, path.replace(ID, 'not-an-id'), json=body)
+
+    assert response.status_code == 400
@@ -0,0 +1,123 @@
+"""
+Importer Tests
+"""
+
+import io
+from datetime import datetime
+
+import pytest
+
+from backend.importer import iter_csv_rows, iter_rows, map_row, resolve_references, run_import
+
+
+def csv_rows(text: str):
+    return iter_csv_rows(io.BytesIO(text.encode('utf-8')))
+
+
+def test_map_row_applies_aliases_and_drops_empty_cells():
+    row = map_row({'Pet Name': 'Rex', 'Vet': ' Dr. Lee ', 'Date': '2024-03-01', 'Notes': ''}, 'medical_records')
+
+    assert row == {'animal_name': 'Rex', 'vet_name': 'Dr. Lee', 'visit_date': '2024-03-01'}
+
+
+def test_map_row_splits_list_fields():
+    assert map_row({'Skills': 'Dog Walking; Grooming|'}, 'volunteers')['skills'] == ['Dog Walking', 'Grooming']
+
+
+@pytest.mark.parametrize("row, error, animal_id", [
+    ({'animal_name': 'rex'}, None, 'id-rex'),
+    ({'animal_name': 'Bella'}, "animal_name is ambiguous (several records named 'Bella'), use animal_id", None),
+    ({'animal_name': 'Nobody'}, "animal_name not found: Nobody", None),
+    ({}, "Missing animal_id or animal_name", None),
+    ({'animal_id': 'id-rex', 'animal_name': 'ignored'}, None, 'id-rex'),
+    ({'animal_id': 'id-gone'}, "animal_id not found: id-gone", 'id-gone'),
+])
+def test_resolve_references(row, error, animal_id):
+    lookups = {'animals': ({'rex': 'id-rex', 'bella': None}, {'id-rex', 'id-bella-1', 'id-bella-2'})}
+
+    assert resolve_references(row, {'animal_id': ('animals', 'animal_name')}, lookups) == error
+    assert row.get('animal_id') == animal_id
+    assert 'animal_name' not in row
+
+
+@pytest.mark.parametrize("filename", ["animals.json", "animals", "broken.xlsx"])
+def test_unreadable_files_fail_before_any_row(filename):
+    with pytest.raises(ValueError):
+        iter_rows(io.BytesIO(b"not a spreadsheet"), filename)
+
+
+def test_broken_excel_upload_is_a_400_even_when_streaming(client, monkeypatch):
+    from backend.api.routes import imports
+    monkeypatch.setattr(imports, 'get_database', lambda: None)
+
+    response = client.post("/api/import/animals", params={'progress': True},
+                           files={'file': ('animals.xlsx', b"not a workbook")})
+
+    assert response.status_code == 400
+
+
+MEDICAL_CSV = """Pet Name,Vet,Date,Diagnosis,Treatment
+Rex,Dr. Lee,2024-03-01,Checkup,None
+bella,Dr. Lee,2024-03-02,Checkup,None
+Max,Dr. Lee,2024-03-03,Checkup,None
+Nobody,Dr. Lee,2024-03-04,Checkup,None
+Rex,Dr. Lee,not a date,Checkup,None
+,,,,
+Rex,Dr. Kim,2024-03-05,Limp,Rest
+"""
+
+
+@pytest.fixture
+def animals(db):
+    names = ['Rex', 'Bella', 'Max', 'Max']
+    ids = db.animals.insert_many([
+        {'name': name, 'species': 'Dog', 'age': 2, 'gender': 'Male', 'status': 'Available',
+         'intake_date': datetime(2024, 1, 1)}
+        for name in names
+    ]).inserted_ids
+    return dict(zip(names[:3], ids[:3]))
+
+
+def test_import_resolves_names_and_reports_row_errors(db, animals):
+    reports = list(run_import(db, csv_rows(MEDICAL_CSV), 'medical_records', batch_size=2))
+
+    summary = reports[-1]
+    assert summary['done'] and not any(report['done'] for report in reports[:-1])
+    # Blank rows are skipped, not counted
+    assert summary['rows'] == 6
+    assert summary['inserted'] == 3
+    assert summary['failed'] == 3
+    errors = {error['row']: error['error'] for error in summary['errors']}
+    assert sorted(errors) == [4, 5, 6]
+    assert errors[4] == "animal_name is ambiguous (several records named 'Max'), use animal_id"
+    assert errors[5] == "animal_name not found: Nobody"
+    assert 'visit_date' in errors[6]
+    assert not summary['errors_truncated']
+
+    stored = list(db.medical_records.find().sort('visit_date', 1))
+    # Names match case-insensitively
+    assert [record['animal_id'] for record in stored] == [animals['Rex'], animals['Bella'], animals['Rex']]
+    assert stored[0]['visit_date'] == datetime(2024, 3, 1)
+
+
+def test_import_reports_progress_per_batch(db, animals):
+    text = "animal_name,vet_name,visit_date,diagnosis,treatment\n" + \
+        "Rex,Dr. Lee,2024-03-01,Checkup,None\n" * 5
+
+    reports = list(run_import(db, csv_rows(text), 'medical_records', batch_size=2))
+
+    assert [report['inserted'] for report in reports] == [2, 4, 5]
+    assert db.medical_records.count_documents({}) == 5
+
+
+def test_dry_run_validates_without_writing(db, animals):
+    summary = list(run_import(db, csv_rows(MEDICAL_CSV), 'medical_records', dry_run=True))[-1]
+
+    assert summary['dry_run']
+    assert summary['inserted'] == 3 and summary['failed'] == 3
+    assert db.medical_records.count_documents({}) == 0
+
+
+def test_unknown_target_is_rejected(db):
+    with pytest.raises(ValueError):
+        list(run_import(db, csv_rows("name\nRex\n"), 'cats'))
@@ -0,0 +1,37 @@
+"""
+Index Tests
+"""
+
+from datetime import datetime
+
+from backend.database.indexes import REFERENCE_INDEXES, ensure_indexes
+
+
+def test_ensure_indexes_creates_the_reference_indexes(db):
+    ensure_indexes(db)
+    ensure_indexes(db)
+
+    for collection, fields in REFERENCE_INDEXES.items():
+        keys = [list(index['key']) for index in db[collection].list_indexes()]
+        for field in fields:
+            assert [field] in keys
+
+
+def test_adoption_rate_joins_on_animal_id(db, client):
+    ensure_indexes(db)
+    adopted, _, slow = db.animals.insert_many([
+        {'name': 'Rex', 'species': 'Dog', 'intake_date': datetime(2024, 1, 1)},
+        {'name': 'Max', 'species': 'Dog', 'intake_date': datetime(2024, 1, 1)},
+        {'name': 'Tom', 'species': 'Cat', 'intake_date': datetime(2024, 1, 1)},
+    ]).inserted_ids
+    db.adoptions.insert_many([
+        {'animal_id': adopted, 'adoption_date': datetime(2024, 1, 10)},
+        {'animal_id': slow, 'adoption_date': datetime(2024, 6, 1)},
+    ])
+
+    every = client.get("/api/charts/adoption-rate").json()
+    within = client.get("/api/charts/adoption-rate", params={'within_days': 30}).json()
+
+    assert every['labels'] == ['Cat', 'Dog']
+    assert every['adopted'] == [1, 1] and every['available'] == [0, 1]
+    assert within['adopted'] == [0, 1] and within['available'] == [1, 1]
@@ -0,0 +1,74 @@
+"""
+N+1 Query Tests
+Every page and JSON GET route driven by the benchmarks is requested against a
+seeded database with N+1 detection in strict mode
+"""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from backend.config import DB_NAME, MONGO_URI, N_PLUS_ONE_DETECTION, N_PLUS_ONE_THRESHOLD
+from backend.database.circuit_breaker import DatabaseUnavailableError
+from backend.database.connection import get_database
+from backend.monitoring.context import start_request
+from backend.monitoring.n_plus_one import QueryShapeListener, find_repeated_queries
+from benchmarks.endpoints import ENDPOINTS, build_request, load_samples
+from utils.generate_data import generate
+
+# 50 animals: enough adoptions, records and activities per page to exceed the threshold
+SEED_SCALE = 0.05
+
+
+def command_started(name: str, command: dict):
+    return SimpleNamespace(command_name=name, command=command)
+
+
+def test_repeated_shapes_are_flagged():
+    stats = start_request({})
+    listener = QueryShapeListener()
+    for i in range(N_PLUS_ONE_THRESHOLD + 1):
+        listener.started(command_started('find', {'find': 'animals', 'filter': {'_id': i}}))
+    listener.started(command_started('find', {'find': 'adopters', 'filter': {'name': 'Ann'}}))
+    listener.started(command_started('getMore', {'getMore': 1, 'collection': 'animals'}))
+
+    repeated = find_repeated_queries(stats)
+
+    assert repeated == [{'command': 'find', 'collection': 'animals', 'shape': "{'_id': '?'}",
+                         'count': N_PLUS_ONE_THRESHOLD + 1}]
+
+
+def test_distinct_values_of_one_shape_under_threshold_pass():
+    stats = start_request({})
+    listener = QueryShapeListener()
+    for i in range(N_PLUS_ONE_THRESHOLD):
+        listener.started(command_started('find', {'find': 'animals', 'filter': {'_id': i}}))
+
+    assert find_repeated_queries(stats) == []
+
+
+@pytest.fixture(scope='module')
+def samples():
+    """Seeded test database (once for the module) and ids sampled from it"""
+    if N_PLUS_ONE_DETECTION != 'strict':
+        pytest.skip("N_PLUS_ONE_DETECTION is not strict")
+    if not DB_NAME.endswith('_test'):
+        pytest.skip(f"DB_NAME={DB_NAME} doesn't end in _test, refusing to replace its data")
+    try:
+        db = get_database()
+    except DatabaseUnavailableError:
+        pytest.skip("MongoDB not reachable at MONGO_URI")
+    generate(DB_NAME, SEED_SCALE, workers=1, uri=MONGO_URI, progress=None)
+    return load_samples(db)
+
+
+@pytest.mark.parametrize('path, params', [(path, params) for _, path, params in ENDPOINTS],
+                         ids=[name for name, _, _ in ENDPOINTS])
+def test_route_has_no_n_plus_one(samples, client, path, params):
+    path, params = build_request(path, params, samples, random.Random(0))
+
+    response = client.get(path, params=params)
+
+    assert response.status_code < 500, response.text
+    assert 'X-N-Plus-One' not in response.headers
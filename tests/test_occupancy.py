@@ -0,0 +1,94 @@
+"""
+Occupancy Tests
+The sweep and the chart window, no MongoDB needed
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from backend.analytics.occupancy import OccupancySeries, sweep
+from backend.analytics.timeseries import MAX_BUCKETS
+
+
+def day(text: str) -> np.datetime64:
+    return np.datetime64(text, 'D')
+
+
+def series(events, last_day='2024-01-10'):
+    """OccupancySeries from (species, day, delta) events"""
+    species = np.array([e[0] for e in events], dtype=object)
+    days = np.array([e[1] for e in events], dtype='datetime64[D]')
+    deltas = np.array([e[2] for e in events], dtype=np.int64)
+    return OccupancySeries.from_events(species, days, deltas, day(last_day))
+
+
+def test_sweep_reads_the_total_at_the_end_of_each_day():
+    days = np.array(['2024-01-03', '2024-01-01', '2024-01-03', '2024-01-05'], dtype='datetime64[D]')
+    deltas = np.array([2, 1, -1, -2])
+    sample_days = np.arange(day('2023-12-31'), day('2024-01-07'))
+
+    assert sweep(days, deltas, sample_days).tolist() == [0, 1, 1, 2, 2, 0, 0]
+
+
+def test_same_day_intake_and_adoption_is_never_counted():
+    occupancy = series([('Dog', '2024-01-02', 1), ('Dog', '2024-01-02', -1), ('Dog', '2024-01-03', 1)],
+                       last_day='2024-01-04')
+
+    result = occupancy.window()
+
+    assert result['labels'] == ['2024-01-02', '2024-01-03', '2024-01-04']
+    assert result['data'] == [0, 1, 1]
+
+
+def test_counts_per_species_and_in_total():
+    occupancy = series([('Dog', '2024-01-01', 2), ('Cat', '2024-01-02', 1), ('Dog', '2024-01-03', -1)],
+                       last_day='2024-01-03')
+
+    result = occupancy.window()
+
+    assert result['series'] == {'Cat': [0, 1, 1], 'Dog': [2, 2, 1]}
+    assert result['data'] == [2, 3, 2]
+
+
+def test_window_before_the_first_event_is_zero():
+    occupancy = series([('Dog', '2024-01-05', 1)])
+
+    result = occupancy.window(datetime(2024, 1, 2), datetime(2024, 1, 6))
+
+    assert result['labels'] == ['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05', '2024-01-06']
+    assert result['data'] == [0, 0, 0, 1, 1]
+
+
+def test_window_after_the_last_day_is_cut_there():
+    occupancy = series([('Dog', '2024-01-05', 1)], last_day='2024-01-06')
+
+    assert occupancy.window(datetime(2024, 1, 5), datetime(2024, 2, 1))['labels'] == ['2024-01-05', '2024-01-06']
+    assert occupancy.window(datetime(2024, 1, 7), datetime(2024, 2, 1)) == {'labels': [], 'data': [], 'series': {}}
+
+
+def test_coarser_buckets_take_the_headcount_on_their_last_day():
+    occupancy = series([('Dog', '2024-01-01', 3), ('Dog', '2024-01-31', -2), ('Dog', '2024-02-10', 1)],
+                       last_day='2024-02-15')
+
+    result = occupancy.window(granularity='month')
+
+    # January ends with one animal, February is cut at last_day
+    assert result['labels'] == ['2024-01', '2024-02']
+    assert result['data'] == [1, 2]
+
+
+def test_no_events():
+    assert series([]).window() == {'labels': [], 'data': [], 'series': {}}
+
+
+def test_default_window_is_clamped_to_max_buckets():
+    occupancy = series([('Dog', '2000-01-01', 1)], last_day='2024-01-10')
+
+    result = occupancy.window()
+
+    assert len(result['labels']) == MAX_BUCKETS
+    assert result['labels'][-1] == '2024-01-10'
+    assert set(result['data']) == {1}
+    # Coarser buckets reach back to the first intake
+    assert occupancy.window(granularity='month')['labels'][0] == '2000-01'
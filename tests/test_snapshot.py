@@ -0,0 +1,121 @@
+"""
+Animal Snapshot Tests
+Loaded from a list of documents, or from the test database to compare the
+bitmap facets with the MongoDB $facet aggregation
+"""
+
+import pytest
+from bson import ObjectId
+
+from backend.animal_filters import AnimalFilter
+from backend.analytics.facets import animal_facets, parse_exclusions
+from backend.analytics.snapshot import AnimalSnapshot
+
+
+class _Cursor(list):
+    def batch_size(self, size):
+        return self
+
+
+class _Animals:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def estimated_document_count(self):
+        return len(self.docs)
+
+    def find(self, filter=None, projection=None):
+        return _Cursor(dict(doc) for doc in self.docs)
+
+
+class _Database:
+    def __init__(self, docs):
+        self.animals = _Animals(docs)
+
+
+def loaded_snapshot(docs) -> AnimalSnapshot:
+    snapshot = AnimalSnapshot()
+    snapshot.load(_Database(docs))
+    return snapshot
+
+
+def animal(**fields) -> dict:
+    return {'_id': ObjectId(), 'species': 'Dog', 'breed': 'Beagle', 'status': 'Available',
+            'gender': 'Male', 'age': 3, 'assigned_volunteers': [], **fields}
+
+
+def test_updates_after_an_empty_load_find_their_row():
+    snapshot = loaded_snapshot([])
+    doc = animal()
+
+    snapshot.saved(doc)
+    snapshot.saved({**doc, 'status': 'Adopted'})
+    assert snapshot.distribution('status', {}) == {'Adopted': 1}
+
+    snapshot.fields_changed(doc['_id'], {'status': 'Medical'})
+    assert snapshot.distribution('status', {}) == {'Medical': 1}
+
+    snapshot.deleted(doc['_id'])
+    assert snapshot.distribution('status', {}) == {}
+    assert snapshot.count({}) == 0
+
+
+def test_updates_find_loaded_and_appended_rows():
+    loaded = animal()
+    snapshot = loaded_snapshot([loaded])
+    added = animal(species='Cat')
+
+    snapshot.saved(added)
+    snapshot.fields_changed(loaded['_id'], {'status': 'Adopted'})
+    snapshot.fields_changed(added['_id'], {'status': 'Adopted'})
+
+    assert snapshot.distribution('status', {}) == {'Adopted': 2}
+    snapshot.deleted(added['_id'])
+    assert snapshot.count({}) == 1
+    assert snapshot.ids({}) == [str(loaded['_id'])]
+
+
+def test_has_volunteer_exclusions_parse_true_and_false():
+    with_volunteer, without = animal(assigned_volunteers=[ObjectId()]), animal()
+    snapshot = loaded_snapshot([with_volunteer, without])
+
+    assert snapshot.ids({}, parse_exclusions(['has_volunteer:false'])) == [str(with_volunteer['_id'])]
+    assert snapshot.ids({}, parse_exclusions(['has_volunteer:true'])) == [str(without['_id'])]
+    assert snapshot.ids({'has_volunteer': False}) == [str(without['_id'])]
+
+
+FACET_CASES = [
+    ({}, []),
+    ({'species': ['Dog', 'Cat']}, []),
+    ({'status': ['Available']}, ['has_volunteer:false']),
+    ({}, ['has_volunteer:true', 'species:Bird']),
+    ({'has_volunteer': True}, ['status:Adopted']),
+    ({'age_band': ['1-3 years', '10+ years']}, ['gender:Female']),
+]
+
+
+@pytest.mark.parametrize('filters, exclude', FACET_CASES)
+def test_bitmap_facets_match_mongodb(db, filters, exclude):
+    db.animals.insert_many([
+        animal(species=species, status=status, gender=gender, age=age,
+               assigned_volunteers=[ObjectId()] if i % 3 == 0 else [])
+        for i, (species, status, gender, age) in enumerate(
+            (species, status, gender, age)
+            for species in ('Dog', 'Cat', 'Bird')
+            for status in ('Available', 'Adopted')
+            for gender in ('Male', 'Female')
+            for age in (0.5, 2, 4, 12)
+        )
+    ])
+    snapshot = AnimalSnapshot()
+    snapshot.load(db)
+    excluded = parse_exclusions(exclude)
+    values = {f: v for f, v in filters.items() if f in ('species', 'breed', 'status', 'gender')}
+    facet_filters = {f: v for f, v in filters.items() if f not in values}
+
+    from_mongodb = animal_facets(db, AnimalFilter(values), facet_filters, excluded)
+    from_bitmaps = snapshot.facets(filters, excluded)
+
+    assert from_mongodb['source'] == 'mongodb'
+    assert from_bitmaps['total'] == from_mongodb['total']
+    assert from_bitmaps['facets'] == from_mongodb['facets']
@@ -0,0 +1,104 @@
+"""
+Time Series Tests
+Bucketing and gap filling, no MongoDB needed
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from backend.analytics.timeseries import (
+    MAX_BUCKETS, bucket_labels, bucket_range, earliest_bucket, fill_series, truncate
+)
+
+
+def day(text: str) -> np.datetime64:
+    return np.datetime64(text, 'D')
+
+
+@pytest.mark.parametrize("value, granularity, expected", [
+    ('2024-03-06', 'day', '2024-03-06'),
+    # Weeks start on Monday
+    ('2024-03-06', 'week', '2024-03-04'),
+    ('2024-03-04', 'week', '2024-03-04'),
+    ('2024-03-10', 'week', '2024-03-04'),
+    ('2024-03-11', 'week', '2024-03-11'),
+    ('1969-12-31', 'week', '1969-12-29'),
+    ('2024-05-15', 'month', '2024-05-01'),
+    ('2024-05-15', 'quarter', '2024-04-01'),
+    ('2024-03-31', 'quarter', '2024-01-01'),
+    ('2024-12-31', 'quarter', '2024-10-01'),
+    ('1969-11-20', 'quarter', '1969-10-01'),
+    ('2024-05-15', 'year', '2024-01-01'),
+])
+def test_truncate(value, granularity, expected):
+    assert truncate(np.array([day(value)]), granularity)[0] == day(expected)
+
+
+@pytest.mark.parametrize("first, last, granularity, expected", [
+    ('2024-02-27', '2024-03-02', 'day', ['2024-02-27', '2024-02-28', '2024-02-29', '2024-03-01', '2024-03-02']),
+    ('2024-03-06', '2024-03-18', 'week', ['2024-03-04', '2024-03-11', '2024-03-18']),
+    ('2023-12-15', '2024-02-01', 'month', ['2023-12', '2024-01', '2024-02']),
+    ('2023-11-15', '2024-04-01', 'quarter', ['2023-Q4', '2024-Q1', '2024-Q2']),
+    ('1969-11-20', '1970-01-01', 'quarter', ['1969-Q4', '1970-Q1']),
+    ('2022-06-01', '2024-01-01', 'year', ['2022', '2023', '2024']),
+])
+def test_bucket_range_and_labels(first, last, granularity, expected):
+    buckets = bucket_range(day(first), day(last), granularity)
+
+    assert bucket_labels(buckets, granularity) == expected
+
+
+def test_bucket_range_is_capped():
+    first = day('2000-01-01')
+
+    assert bucket_range(first, first + MAX_BUCKETS - 1, 'day').size == MAX_BUCKETS
+    with pytest.raises(ValueError, match="Range too long"):
+        bucket_range(first, first + MAX_BUCKETS, 'day')
+
+
+@pytest.mark.parametrize("granularity", ['day', 'week', 'month', 'quarter', 'year'])
+def test_earliest_bucket_gives_exactly_max_buckets(granularity):
+    last = day('2024-05-15')
+
+    assert bucket_range(earliest_bucket(last, granularity), last, granularity).size == MAX_BUCKETS
+
+
+def test_fill_series_fills_gaps_between_the_data():
+    counts = {datetime(2024, 1, 1): 3, datetime(2024, 4, 1): 2}
+
+    assert fill_series(counts, 'month') == (['2024-01', '2024-02', '2024-03', '2024-04'], [3, 0, 0, 2])
+
+
+def test_fill_series_range_starting_before_the_data():
+    counts = {datetime(2024, 3, 4): 5}
+
+    labels, data = fill_series(counts, 'week', start_dt=datetime(2024, 2, 21), end_dt=datetime(2024, 3, 13))
+
+    assert labels == ['2024-02-19', '2024-02-26', '2024-03-04', '2024-03-11']
+    assert data == [0, 0, 5, 0]
+
+
+def test_fill_series_open_end_runs_to_now_when_a_start_is_given():
+    labels, data = fill_series({}, 'quarter', start_dt=datetime(2023, 8, 1), now=datetime(2024, 2, 1))
+
+    assert labels == ['2023-Q3', '2023-Q4', '2024-Q1']
+    assert data == [0, 0, 0]
+
+
+def test_fill_series_ignores_counts_outside_the_range():
+    counts = {datetime(2023, 12, 1): 7, datetime(2024, 1, 1): 1, datetime(2024, 3, 1): 9}
+
+    assert fill_series(counts, 'month', start_dt=datetime(2024, 1, 15), end_dt=datetime(2024, 2, 10)) == \
+        (['2024-01', '2024-02'], [1, 0])
+
+
+def test_fill_series_without_data_or_range():
+    assert fill_series({}, 'day') == ([], [])
+    assert fill_series({}, 'day', start_dt=datetime(2024, 2, 1), end_dt=datetime(2024, 1, 1)) == ([], [])
+
+
+def test_fill_series_too_many_buckets():
+    with pytest.raises(ValueError):
+        fill_series({}, 'day', start_dt=datetime(1990, 1, 1), end_dt=datetime(2024, 1, 1))
@@ -0,0 +1,82 @@
+"""
+Volunteer Availability Tests
+"""
+
+import pytest
+
+from backend.volunteer_availability import (
+    DEFAULT_HOURS, FULL_DAY, VolunteerAvailabilityIndex, day_index, hour_mask, parse_availability, query_bitmap
+)
+
+NONE = 0
+OPEN = hour_mask(*DEFAULT_HOURS)
+MON, TUE, WED, THU, FRI, SAT, SUN = range(7)
+
+
+def week(**days):
+    """Expected slots, e.g. week(sat=OPEN, sun=OPEN)"""
+    names = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+    return [days.get(name, NONE) for name in names]
+
+
+def every_day(mask):
+    return [mask] * 7
+
+
+@pytest.mark.parametrize("text, expected", [
+    (None, week()),
+    ("", week()),
+    ("Weekends", week(sat=OPEN, sun=OPEN)),
+    ("Weekdays", week(mon=OPEN, tue=OPEN, wed=OPEN, thu=OPEN, fri=OPEN)),
+    ("Flexible", every_day(FULL_DAY)),
+    ("Mornings", every_day(hour_mask(6, 12))),
+    ("Evenings", every_day(hour_mask(17, 22))),
+    ("Mon-Fri 9-5", week(**{day: hour_mask(9, 17) for day in ['mon', 'tue', 'wed', 'thu', 'fri']})),
+    ("Tues to Thurs 6pm-9pm", week(tue=hour_mask(18, 21), wed=hour_mask(18, 21), thu=hour_mask(18, 21))),
+    ("Fri-Mon", week(fri=OPEN, sat=OPEN, sun=OPEN, mon=OPEN)),
+    ("Saturdays; Sunday mornings", week(sat=OPEN, sun=hour_mask(6, 12))),
+    # Overnight ranges run into the next day
+    ("Sun 10pm-2am", week(sun=hour_mask(22, 24), mon=hour_mask(0, 2))),
+    ("Fri 9pm-12am", week(fri=hour_mask(21, 24))),
+    ("22-2", every_day(hour_mask(22, 24) | hour_mask(0, 2))),
+    # Day names only on word boundaries
+    ("monthly meetings", week()),
+    ("Sunny afternoons", every_day(hour_mask(12, 17))),
+    # Hours after a comma belong to the days named before them
+    ("Weekends, 10am-2pm", week(sat=hour_mask(10, 14), sun=hour_mask(10, 14))),
+    ("Mon 9am-12pm, 2pm-4pm", week(mon=hour_mask(9, 12) | hour_mask(14, 16))),
+    ("Wed, Sat 1pm-3pm", week(wed=OPEN, sat=hour_mask(13, 15))),
+    ("Evenings, Weekends", week(**{day: hour_mask(17, 22) for day in ['mon', 'tue', 'wed', 'thu', 'fri']},
+                                sat=OPEN | hour_mask(17, 22), sun=OPEN | hour_mask(17, 22))),
+])
+def test_parse_availability(text, expected):
+    assert parse_availability(text) == expected
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Mon", MON), ("tues", TUE), ("Thursday", THU), ("saturdays", SAT), ("su", SUN),
+    ("monthly", None), ("sunny", None), ("t", None), ("weekend", None),
+])
+def test_day_index(name, expected):
+    assert day_index(name) == expected
+
+
+def test_index_finds_volunteers_free_for_the_whole_window():
+    index = VolunteerAvailabilityIndex.build([
+        {'_id': 'a', 'name': 'Ann', 'skills': ['Dog Walking'], 'availability': 'Weekends, 10am-2pm'},
+        {'_id': 'b', 'name': 'Bo', 'skills': ['Dog Walking', 'Grooming'], 'availability': 'Flexible'},
+        {'_id': 'c', 'name': 'Cy', 'skills': 'Grooming', 'availability': 'Sun 10pm-2am'},
+        {'_id': 'd', 'name': 'Di', 'skills': ['Cat Care'], 'availability_slots': [FULL_DAY] * 7},
+    ])
+
+    saturday_noon = query_bitmap(SAT, 11, 13)
+    assert [v['id'] for v in index.find_available(saturday_noon, ['Dog Walking'])] == ['a', 'b']
+    assert [v['id'] for v in index.find_available(query_bitmap(SAT, 13, 15), ['Dog Walking'])] == ['b']
+    assert [v['id'] for v in index.find_available(query_bitmap(SAT, 13, 15), ['Dog Walking'],
+                                                  require_all=False)] == ['a', 'b']
+
+    monday_1am = query_bitmap(MON, 1, 2)
+    groomers = index.find_available(monday_1am, ['Grooming'])
+    assert [v['id'] for v in groomers] == ['b', 'c']
+    assert groomers[0]['matching_skills'] == ['Grooming']
+    assert [v['id'] for v in index.find_available(monday_1am)] == ['b', 'c', 'd']
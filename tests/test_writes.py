@@ -0,0 +1,54 @@
+"""
+Write Helper Tests
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+
+from backend.database.writes import insert_and_return, update_and_return
+
+
+def test_insert_and_return_gives_the_api_shape(db):
+    animal_id, adopter_id = ObjectId(), ObjectId()
+    created = insert_and_return(db.adoptions, {
+        'animal_id': str(animal_id), 'adopter_id': str(adopter_id),
+        'adoption_date': '2024-03-01', 'notes': 'Met twice'
+    })
+
+    assert isinstance(created['_id'], str)
+    assert created['animal_id'] == str(animal_id)
+    assert created['adopter_id'] == str(adopter_id)
+    assert created['adoption_date'] == '2024-03-01'
+    assert created['notes'] == 'Met twice'
+
+    stored = db.adoptions.find_one({'_id': ObjectId(created['_id'])})
+    assert stored['animal_id'] == animal_id
+    assert stored['adoption_date'] == datetime(2024, 3, 1)
+
+
+def test_update_and_return_gives_the_updated_document(db):
+    volunteer_id = ObjectId()
+    animal_id = db.animals.insert_one({
+        'name': 'Rex', 'species': 'Dog', 'age': 3, 'gender': 'Male', 'status': 'Available',
+        'intake_date': datetime(2024, 1, 5)
+    }).inserted_id
+
+    updated = update_and_return(db.animals, animal_id, {
+        'status': 'Medical', 'intake_date': '2024-01-06', 'assigned_volunteers': [str(volunteer_id)]
+    })
+
+    assert updated['_id'] == str(animal_id)
+    assert updated['status'] == 'Medical'
+    assert updated['name'] == 'Rex'
+    assert updated['intake_date'] == '2024-01-06'
+    assert updated['assigned_volunteers'] == [str(volunteer_id)]
+
+    stored = db.animals.find_one({'_id': animal_id})
+    assert stored['intake_date'] == datetime(2024, 1, 6)
+    assert stored['assigned_volunteers'] == [volunteer_id]
+
+
+def test_update_and_return_missing_id_returns_none(db):
+    assert update_and_return(db.animals, ObjectId(), {'status': 'Adopted'}) is None
+    assert db.animals.count_documents({}) == 0
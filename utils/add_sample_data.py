@@ -4,7 +4,7 @@ Populate the database with sample data for testing
 Creates comprehensive data for all collections including multiple medical records for each animal
 """
 
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from bson import ObjectId
 from datetime import datetime, timedelta
 import random
@@ -12,6 +12,9 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from backend.config import MONGO_URI, DB_NAME
+from backend.volunteer_availability import parse_availability
+from backend.dates import dates_to_storage
+from backend.analytics.stays import refresh_days_to_adoption
 
 # Connect to MongoDB
 try:
@@ -345,7 +348,7 @@ print("✅ Cleared all collections")
 
 # Insert animals
 print("\n🐾 Adding animals...")
-animals_result = db.animals.insert_many(animals_data)
+animals_result = db.animals.insert_many([dates_to_storage(doc) for doc in animals_data])
 animal_ids = list(animals_result.inserted_ids)
 print(f"✅ Added {len(animal_ids)} animals")
 
@@ -382,10 +385,13 @@ adoption_dates = [
     "2025-11-03", "2025-11-10", "2025-11-17", "2025-11-24"
 ]
 
+# Animals keep their insertion order, so look them up by name in memory
+animal_ids_by_name = {animal["name"]: animal_id for animal, animal_id in zip(animals_data, animal_ids)}
+adoptions_data = []
+
 # Assign adoption dates to adopted animals
 for i, animal_data in enumerate(adopted_animals):
-    animal = db.animals.find_one({"name": animal_data["name"]})
-    if animal and i < len(adopter_ids):
+    if i < len(adopter_ids):
         # Use predefined dates, or generate random if we run out
         if i < len(adoption_dates):
             adoption_date = adoption_dates[i]
@@ -395,13 +401,12 @@ for i, animal_data in enumerate(adopted_animals):
             days_ago = random.randint(0, 30)
             adoption_date = (datetime.now() - timedelta(days=months_ago*30 + days_ago)).strftime('%Y-%m-%d')
         
-        adoption_data = {
-            "animal_id": str(animal["_id"]),
-            "adopter_id": str(adopter_ids[i % len(adopter_ids)]),  # Cycle through adopters
+        adoptions_data.append({
+            "animal_id": animal_ids_by_name[animal_data["name"]],
+            "adopter_id": adopter_ids[i % len(adopter_ids)],  # Cycle through adopters
             "adoption_date": adoption_date,
             "notes": f"Great match! {animal_data['name']} is settling in well."
-        }
-        db.adoptions.insert_one(adoption_data)
+        })
         adoptions_count += 1
 
 # Add more adoptions for available animals (change some to adopted status)
@@ -412,43 +417,46 @@ available_animals = [animal for animal in animals_data if animal["status"] == "A
 animals_to_adopt = random.sample(available_animals, min(25, len(available_animals)))
 
 for i, animal_data in enumerate(animals_to_adopt):
-    animal = db.animals.find_one({"name": animal_data["name"]})
-    if animal:
-        # Use remaining adoption dates
-        date_index = adoptions_count + i
-        if date_index < len(adoption_dates):
-            adoption_date = adoption_dates[date_index]
-        else:
-            # Generate date in the past 6 months
-            months_ago = random.randint(0, 6)
-            days_ago = random.randint(0, 30)
-            adoption_date = (datetime.now() - timedelta(days=months_ago*30 + days_ago)).strftime('%Y-%m-%d')
-        
-        adoption_data = {
-            "animal_id": str(animal["_id"]),
-            "adopter_id": str(adopter_ids[(adoptions_count + i) % len(adopter_ids)]),
-            "adoption_date": adoption_date,
-            "notes": f"Great match! {animal_data['name']} is settling in well."
-        }
-        db.adoptions.insert_one(adoption_data)
-        # Update animal status to Adopted
-        db.animals.update_one({"_id": animal["_id"]}, {"$set": {"status": "Adopted"}})
-        additional_adoptions += 1
+    # Use remaining adoption dates
+    date_index = adoptions_count + i
+    if date_index < len(adoption_dates):
+        adoption_date = adoption_dates[date_index]
+    else:
+        # Generate date in the past 6 months
+        months_ago = random.randint(0, 6)
+        days_ago = random.randint(0, 30)
+        adoption_date = (datetime.now() - timedelta(days=months_ago*30 + days_ago)).strftime('%Y-%m-%d')
+    
+    adoptions_data.append({
+        "animal_id": animal_ids_by_name[animal_data["name"]],
+        "adopter_id": adopter_ids[(adoptions_count + i) % len(adopter_ids)],
+        "adoption_date": adoption_date,
+        "notes": f"Great match! {animal_data['name']} is settling in well."
+    })
+    additional_adoptions += 1
+
+if adoptions_data:
+    db.adoptions.insert_many([dates_to_storage(doc) for doc in adoptions_data])
+# Update animal status to Adopted
+newly_adopted_ids = [animal_ids_by_name[animal["name"]] for animal in animals_to_adopt]
+db.animals.update_many({"_id": {"$in": newly_adopted_ids}}, {"$set": {"status": "Adopted"}})
+# Days from intake to adoption, for the time to adoption charts
+refresh_days_to_adoption(db)
+newly_adopted = set(newly_adopted_ids)
 
 total_adoptions = adoptions_count + additional_adoptions
 print(f"✅ Added {total_adoptions} adoptions ({adoptions_count} from originally adopted animals, {additional_adoptions} newly adopted)")
 
 # Insert medical records - MULTIPLE RECORDS FOR EACH ANIMAL
 print("\n🏥 Adding medical records for each animal...")
-medical_records_count = 0
+medical_records_data = []
 
-for animal_id in animal_ids:
-    animal = db.animals.find_one({"_id": animal_id})
-    if not animal:
-        continue
+for animal_id, animal in zip(animal_ids, animals_data):
+    status = "Adopted" if animal_id in newly_adopted else animal.get("status")
     
     # Get intake date
-    intake_date = datetime.strptime(animal.get("intake_date", datetime.now().strftime('%Y-%m-%d')), '%Y-%m-%d')
+    # Stored as a datetime by now (see dates_to_storage above)
+    intake_date = animal.get("intake_date") or datetime.now()
     days_since_intake = (datetime.now() - intake_date).days
     
     # Determine number of visits based on days in shelter (more time = more visits)
@@ -488,7 +496,7 @@ for animal_id in animal_ids:
                 medical_scenarios[1],  # Spay/Neuter
                 medical_scenarios[4],  # Vaccination
             ])
-        elif visit_num == 1 and animal.get("status") == "Medical":
+        elif visit_num == 1 and status == "Medical":
             # If animal is in medical status, might have ongoing treatment
             scenario = random.choice([
                 medical_scenarios[2],  # Upper respiratory
@@ -499,21 +507,24 @@ for animal_id in animal_ids:
             # Random scenario for other visits
             scenario = random.choice(medical_scenarios)
         
-        medical_data = {
-            "animal_id": str(animal_id),
+        medical_records_data.append({
+            "animal_id": animal_id,
             "vet_name": random.choice(vet_names),
             "visit_date": visit_date.strftime('%Y-%m-%d'),
             "diagnosis": scenario["diagnosis"],
             "treatment": scenario["treatment"],
             "notes": scenario["notes"]
-        }
-        db.medical_records.insert_one(medical_data)
-        medical_records_count += 1
+        })
+
+db.medical_records.insert_many([dates_to_storage(doc) for doc in medical_records_data])
+medical_records_count = len(medical_records_data)
 
 print(f"✅ Added {medical_records_count} medical records across all animals")
 
 # Insert volunteers
 print("\n🙋 Adding volunteers...")
+for volunteer in volunteers_data:
+    volunteer["availability_slots"] = parse_availability(volunteer["availability"])
 volunteers_result = db.volunteers.insert_many(volunteers_data)
 volunteer_ids = list(volunteers_result.inserted_ids)
 print(f"✅ Added {len(volunteer_ids)} volunteers")
@@ -534,6 +545,8 @@ species_volunteer_mapping = {
 }
 
 # Assign volunteers based on skills
+assignment_updates = []
+assigned_by_animal = {}
 for idx, animal in enumerate(animals_data):
     animal_id = animal_ids[idx]
     species = animal.get("species", "")
@@ -554,13 +567,17 @@ for idx, animal in enumerate(animals_data):
         
         if has_relevant_skill or has_general_skill:
             if len(assigned_volunteers) < 2:  # Assign max 2 volunteers per animal
-                assigned_volunteers.append(str(volunteer_id))
+                assigned_volunteers.append(volunteer_id)
     
     # Assign volunteers to animal (only if animal is Available)
     if assigned_volunteers and animal.get("status") == "Available":
-        db.animals.update_one({'_id': animal_id}, {'$set': {'assigned_volunteers': assigned_volunteers}})
+        assignment_updates.append(UpdateOne({'_id': animal_id}, {'$set': {'assigned_volunteers': assigned_volunteers}}))
+        assigned_by_animal[animal_id] = assigned_volunteers
         volunteer_assignments += len(assigned_volunteers)
 
+if assignment_updates:
+    db.animals.bulk_write(assignment_updates)
+
 print(f"✅ Assigned volunteers to {volunteer_assignments} animal-volunteer pairs")
 
 # Add volunteer activities
@@ -569,11 +586,10 @@ volunteer_activities_data = []
 activity_types = ["Walking", "Feeding", "Grooming", "Training", "Socialization", "Medical Assistance", "Cleaning"]
 
 # Get all animals with assigned volunteers
-animals_with_volunteers = []
-for animal_id in animal_ids:
-    animal = db.animals.find_one({'_id': animal_id})
-    if animal and animal.get('assigned_volunteers'):
-        animals_with_volunteers.append(animal)
+animals_with_volunteers = [
+    {'_id': animal_id, 'assigned_volunteers': volunteers}
+    for animal_id, volunteers in assigned_by_animal.items()
+]
 
 # Generate activities for the past 30 days
 if animals_with_volunteers:
@@ -607,7 +623,7 @@ if animals_with_volunteers:
                 
                 volunteer_activities_data.append({
                     "volunteer_id": volunteer_id,
-                    "animal_id": str(animal_id),
+                    "animal_id": animal_id,
                     "activity_type": activity_type,
                     "activity_date": activity_date,
                     "duration_minutes": duration,
@@ -615,7 +631,7 @@ if animals_with_volunteers:
                 })
 
 if volunteer_activities_data:
-    activities_result = db.volunteer_activities.insert_many(volunteer_activities_data)
+    activities_result = db.volunteer_activities.insert_many([dates_to_storage(doc) for doc in volunteer_activities_data])
     print(f"✅ Added {len(activities_result.inserted_ids)} volunteer activities")
 else:
     print("⚠️  No activities added (no animals have assigned volunteers)")
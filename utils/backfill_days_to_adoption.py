@@ -0,0 +1,59 @@
+"""
+Backfill Days to Adoption
+Store days_to_adoption (days from the animal's intake_date to adoption_date)
+on adoptions recorded before the field existed or loaded outside the API
+
+Runs as one aggregation per run that $merges the values back into the
+adoptions collection. Adoptions whose animal has no intake date get null.
+Run utils/migrate_dates.py and utils/migrate_references.py first, since
+only BSON dates and ObjectId references can be joined. Requires MongoDB 5.0+.
+
+Usage:
+    python utils/backfill_days_to_adoption.py
+    python utils/backfill_days_to_adoption.py --missing-only
+"""
+
+from pymongo import MongoClient
+import argparse
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.config import MONGO_URI, DB_NAME
+from backend.analytics.stays import refresh_days_to_adoption
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store days_to_adoption on every adoption")
+    parser.add_argument("--missing-only", action="store_true",
+                        help="Only adoptions without the field (default: recompute all)")
+    parser.add_argument("--db", default=DB_NAME, help="Database to backfill")
+    args = parser.parse_args()
+
+    try:
+        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+        db = client[args.db]
+        db.command('ping')
+        print("✅ Connected to MongoDB")
+    except Exception as e:
+        print(f"❌ Connection error: {e}")
+        sys.exit(1)
+
+    try:
+        match = {'days_to_adoption': {'$exists': False}} if args.missing_only else {}
+        print(f"\n⏱️  Computing days_to_adoption for {db.adoptions.count_documents(match)} adoptions...")
+        started = time.perf_counter()
+        refresh_days_to_adoption(db, match)
+        elapsed = time.perf_counter() - started
+        without = db.adoptions.count_documents({'days_to_adoption': None})
+        print(f"   Done in {elapsed:.1f}s")
+        if without:
+            print(f"   ⚠️  {without} adoptions have no interval (missing or non-date intake/adoption date)")
+    finally:
+        client.close()
+
+    print("\n✅ Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Generate Data
+Deterministic synthetic data at any scale, built in NumPy batches and written
+by parallel insert_many workers
+
+Scale 1 is 1,000 animals; everything else is proportional (about 250 adopters,
+10 volunteers, about 5 medical records and 2 activities per animal). The same seed
+and scale always produce the same documents, including their _ids, whatever
+the number of workers.
+
+Usage:
+    python utils/generate_data.py --scale 10
+    python utils/generate_data.py --scale 3000 --workers 8 --db pet_adoption_bench
+"""
+
+from pymongo import MongoClient
+from bson import ObjectId
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import time
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.config import MONGO_URI, DB_NAME
+from backend.database.indexes import ensure_indexes
+from backend.species_breeds import SPECIES_BREEDS
+from backend.volunteer_skills import VOLUNTEER_SKILLS
+from backend.volunteer_availability import parse_availability
+
+ANIMALS_PER_SCALE = 1000
+ADOPTERS_PER_ANIMAL = 0.25
+VOLUNTEERS_PER_ANIMAL = 0.01
+ACTIVITIES_PER_ANIMAL = 2.0
+BATCH_SIZE = 5000
+
+COLLECTIONS = ['animals', 'adopters', 'adoptions', 'medical_records', 'volunteers', 'volunteer_activities']
+
+# Share of intakes per species; species not listed share what is left
+SPECIES_WEIGHTS = {
+    'Dog': 0.42, 'Cat': 0.33, 'Rabbit': 0.06, 'Bird': 0.04, 'Guinea Pig': 0.03,
+    'Hamster': 0.03, 'Reptile': 0.03, 'Ferret': 0.02, 'Fish': 0.02,
+}
+
+# Mean days from intake to adoption, and the share of animals ever adopted
+DAYS_TO_ADOPTION = {'Dog': 35, 'Cat': 45, 'default': 60}
+ADOPTION_SHARE = 0.7
+MEDICAL_HOLD_SHARE = 0.05
+
+# Days between medical visits: first exam soon after intake, then follow-ups
+FIRST_VISIT_DAYS = (1, 8)
+FOLLOW_UP_DAYS = (14, 57)
+MAX_VISITS = 20
+MAX_ACTIVITIES = 16
+
+# Shelter history covered by intake dates, ending at END_DATE
+HISTORY_DAYS = 365 * 5
+END_DATE = np.datetime64('2025-12-31')
+
+VET_NAMES = [
+    "Dr. Sarah Johnson", "Dr. Michael Chen", "Dr. Emily Rodriguez", "Dr. David Kim",
+    "Dr. Lisa Thompson", "Dr. James Wilson", "Dr. Maria Garcia", "Dr. Robert Brown",
+]
+FIRST_VISITS = [
+    ("Routine health checkup", "Physical examination, vaccinations (DHPP and Rabies)"),
+    ("Spay/Neuter procedure", "Surgical sterilization, post-operative care"),
+    ("Vaccination booster", "Annual vaccination booster shots"),
+]
+FOLLOW_UPS = FIRST_VISITS + [
+    ("Upper respiratory infection", "Antibiotics, rest"),
+    ("Dental cleaning", "Professional dental scaling and polishing under anesthesia"),
+    ("Minor skin irritation", "Topical ointment, medicated shampoo"),
+    ("Parasite treatment", "Flea and tick prevention, deworming medication"),
+    ("Eye infection", "Antibiotic eye drops"),
+    ("Annual wellness exam", "Complete physical exam, blood work, vaccinations"),
+]
+ACTIVITY_TYPES = ["Walking", "Feeding", "Grooming", "Training", "Socialization", "Medical Assistance", "Cleaning"]
+AVAILABILITIES = ["Weekdays", "Weekends", "Flexible", "Mornings", "Afternoons", "Evenings", "Mon-Fri 9am-5pm"]
+
+# Collection codes baked into generated ObjectIds so references need no lookups
+_ID_CODES = {name: code for code, name in enumerate(COLLECTIONS, start=1)}
+_ID_TIMESTAMP = 0x5e0be100  # 2020-01-01
+
+
+def make_id(collection: str, index: int) -> ObjectId:
+    """The _id of the index-th generated document in a collection"""
+    return ObjectId(f"{_ID_TIMESTAMP:08x}{_ID_CODES[collection]:02x}{index:014x}")
+
+
+def plan(scale: float) -> dict:
+    """Document counts for a scale factor"""
+    animals = max(1, int(round(scale * ANIMALS_PER_SCALE)))
+    return {
+        'animals': animals,
+        'adopters': max(1, int(animals * ADOPTERS_PER_ANIMAL)),
+        'volunteers': max(10, int(animals * VOLUNTEERS_PER_ANIMAL)),
+    }
+
+
+def _rng(seed: int, collection: str, batch: int) -> np.random.Generator:
+    # One stream per (collection, batch) so batches can run in any order or process
+    return np.random.default_rng([seed, _ID_CODES[collection], batch])
+
+
+def _species_table():
+    species = list(SPECIES_BREEDS)
+    weights = np.array([SPECIES_WEIGHTS.get(s, 0.0) for s in species])
+    unlisted = weights == 0
+    if unlisted.any():
+        weights[unlisted] = max(1.0 - weights.sum(), 0.01) / unlisted.sum()
+    # Breeds follow a Zipf-like popularity curve within each species
+    breed_weights = []
+    for name in species:
+        ranks = np.arange(1, len(SPECIES_BREEDS[name]) + 1)
+        breed_weights.append((1 / ranks) / (1 / ranks).sum())
+    return species, weights / weights.sum(), breed_weights
+
+
+def _dates(days: np.ndarray) -> list:
+    """Day offsets from the start of the history to datetimes (stored as BSON dates)"""
+    start = END_DATE - HISTORY_DAYS
+    return (start + days.astype('timedelta64[D]')).astype('datetime64[us]').tolist()
+
+
+def _expand(counts: np.ndarray):
+    """Owner row and position within the owner for `counts[i]` children of row i"""
+    owner = np.repeat(np.arange(counts.size), counts)
+    position = np.arange(owner.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, position
+
+
+def generate_people(collection: str, start: int, stop: int, seed: int) -> list:
+    """Adopters or volunteers [start, stop)"""
+    rng = _rng(seed, collection, start // BATCH_SIZE)
+    count = stop - start
+    docs = []
+    if collection == 'adopters':
+        streets = rng.integers(1, 9999, count).tolist()
+        for offset, street in enumerate(streets):
+            i = start + offset
+            docs.append({
+                '_id': make_id('adopters', i), 'name': f"Adopter {i}", 'phone': f"555-{i:07d}",
+                'email': f"adopter{i}@example.com", 'address': f"{street} Main St, Anytown, ST {i % 100000:05d}",
+            })
+        return docs
+
+    availability = rng.integers(0, len(AVAILABILITIES), count).tolist()
+    slots = {text: parse_availability(text) for text in AVAILABILITIES}
+    for offset, choice in enumerate(availability):
+        i = start + offset
+        skills = rng.choice(len(VOLUNTEER_SKILLS), size=3, replace=False).tolist()
+        docs.append({
+            '_id': make_id('volunteers', i), 'name': f"Volunteer {i}", 'phone': f"555-{i:06d}",
+            'email': f"volunteer{i}@example.com", 'skills': [VOLUNTEER_SKILLS[s] for s in skills],
+            'availability': AVAILABILITIES[choice], 'availability_slots': slots[AVAILABILITIES[choice]],
+        })
+    return docs
+
+
+def generate_animal_batch(batch: int, counts: dict, seed: int) -> dict:
+    """Animals for one batch plus their adoptions, medical records and activities
+
+    Child documents only depend on the batch's own animals, so each batch is
+    generated and written independently.
+    """
+    rng = _rng(seed, 'animals', batch)
+    start = batch * BATCH_SIZE
+    n = min(BATCH_SIZE, counts['animals'] - start)
+    index = np.arange(start, start + n)
+    species_names, species_weights, breed_weights = _species_table()
+
+    species = rng.choice(len(species_names), size=n, p=species_weights)
+    breeds = np.empty(n, dtype=object)
+    for s, name in enumerate(species_names):
+        mask = species == s
+        if mask.any():
+            picks = rng.choice(len(SPECIES_BREEDS[name]), size=int(mask.sum()), p=breed_weights[s])
+            breeds[mask] = np.array(SPECIES_BREEDS[name], dtype=object)[picks]
+    ages = np.clip(np.round(rng.gamma(2.0, 2.0, n)), 1, 20).astype(int)
+    genders = np.where(rng.random(n) < 0.5, 'Male', 'Female')
+    intake = rng.integers(0, HISTORY_DAYS, n)
+
+    # Length of stay is exponential around a per-species mean; stays running
+    # past the end of the history are animals still in the shelter
+    mean_stay = np.array([DAYS_TO_ADOPTION.get(species_names[s], DAYS_TO_ADOPTION['default']) for s in species])
+    stay = np.ceil(rng.exponential(mean_stay)).astype(int)
+    adopted = (rng.random(n) < ADOPTION_SHARE) & (intake + stay < HISTORY_DAYS)
+    medical_hold = ~adopted & (rng.random(n) < MEDICAL_HOLD_SHARE)
+    status = np.where(adopted, 'Adopted', np.where(medical_hold, 'Medical', 'Available'))
+    stay_end = np.where(adopted, intake + stay, HISTORY_DAYS)
+
+    # Up to two volunteers on about a third of the animals still in the shelter
+    assigned = ~adopted & (rng.random(n) < 0.35)
+    volunteer_picks = rng.integers(0, counts['volunteers'], (n, 2))
+
+    intake_dates = _dates(intake)
+    animals = []
+    for k, i in enumerate(index.tolist()):
+        doc = {
+            '_id': make_id('animals', i), 'name': f"Animal {i}", 'species': species_names[species[k]],
+            'breed': breeds[k], 'age': int(ages[k]), 'gender': str(genders[k]), 'status': str(status[k]),
+            'intake_date': intake_dates[k], 'behavioral_notes': None,
+        }
+        if assigned[k]:
+            doc['assigned_volunteers'] = sorted({make_id('volunteers', v) for v in volunteer_picks[k].tolist()})
+        animals.append(doc)
+
+    # Adoptions: one per adopted animal, ids follow the animal index
+    adopted_index = np.flatnonzero(adopted)
+    adopters = rng.integers(0, counts['adopters'], adopted_index.size)
+    adoption_dates = _dates(stay_end[adopted_index])
+    adoptions = [{
+        '_id': make_id('adoptions', int(index[k])), 'animal_id': animals[k]['_id'],
+        'adopter_id': make_id('adopters', a), 'adoption_date': date, 'notes': None,
+        'days_to_adoption': days,
+    } for k, a, date, days in zip(adopted_index.tolist(), adopters.tolist(), adoption_dates,
+                                  stay[adopted_index].tolist())]
+
+    # Medical visits: first exam within a week of intake, then a follow-up
+    # every 2-8 weeks while the animal is in the shelter
+    visits = np.minimum(1 + rng.poisson((stay_end - intake) / 60), MAX_VISITS)
+    owner, visit_number = _expand(visits)
+    first = visit_number == 0
+    gaps = np.where(first, rng.integers(*FIRST_VISIT_DAYS, owner.size), rng.integers(*FOLLOW_UP_DAYS, owner.size))
+    running = np.cumsum(gaps)
+    visit_day = intake[owner] + running - np.repeat(running[first] - gaps[first], visits)
+    keep = (visit_day < HISTORY_DAYS) & (first | (visit_day <= stay_end[owner]))
+    scenarios = np.where(first, rng.integers(0, len(FIRST_VISITS), owner.size),
+                         rng.integers(0, len(FOLLOW_UPS), owner.size))
+    vets = rng.integers(0, len(VET_NAMES), owner.size)
+    owner, visit_number, visit_day, scenarios, vets = (
+        a[keep] for a in (owner, visit_number, visit_day, scenarios, vets))
+    medical = []
+    for k, visit, scenario, vet, date in zip(owner.tolist(), visit_number.tolist(), scenarios.tolist(),
+                                            vets.tolist(), _dates(visit_day)):
+        diagnosis, treatment = FOLLOW_UPS[scenario]
+        medical.append({
+            '_id': make_id('medical_records', int(index[k]) * MAX_VISITS + visit),
+            'animal_id': animals[k]['_id'], 'vet_name': VET_NAMES[vet], 'visit_date': date,
+            'diagnosis': diagnosis, 'treatment': treatment, 'notes': None,
+        })
+
+    # Volunteer activities spread over each animal's stay
+    per_animal = np.minimum(rng.poisson(ACTIVITIES_PER_ANIMAL, n), MAX_ACTIVITIES)
+    act_owner, act_number = _expand(per_animal)
+    act_day = intake[act_owner] + (rng.random(act_owner.size) * (stay_end - intake)[act_owner]).astype(int)
+    act_volunteer = rng.integers(0, counts['volunteers'], act_owner.size)
+    act_type = rng.integers(0, len(ACTIVITY_TYPES), act_owner.size)
+    act_minutes = rng.integers(1, 9, act_owner.size) * 15
+    activities = [{
+        '_id': make_id('volunteer_activities', int(index[k]) * MAX_ACTIVITIES + number),
+        'volunteer_id': make_id('volunteers', v), 'animal_id': animals[k]['_id'],
+        'activity_type': ACTIVITY_TYPES[t], 'activity_date': date, 'duration_minutes': m, 'notes': None,
+    } for k, number, v, t, m, date in zip(act_owner.tolist(), act_number.tolist(), act_volunteer.tolist(),
+                                          act_type.tolist(), act_minutes.tolist(), _dates(act_day))]
+
+    return {'animals': animals, 'adoptions': adoptions, 'medical_records': medical,
+            'volunteer_activities': activities}
+
+
+_worker_db = None
+
+
+def _init_worker(uri: str, db_name: str):
+    # Each worker process opens its own client; MongoClient isn't fork-safe
+    global _worker_db
+    _worker_db = MongoClient(uri)[db_name]
+
+
+def _write(docs_by_collection: dict) -> dict:
+    for collection, docs in docs_by_collection.items():
+        if docs:
+            _worker_db[collection].insert_many(docs, ordered=False)
+    return {collection: len(docs) for collection, docs in docs_by_collection.items()}
+
+
+def _write_people(collection: str, start: int, stop: int, seed: int) -> dict:
+    return _write({collection: generate_people(collection, start, stop, seed)})
+
+
+def _write_animal_batch(batch: int, counts: dict, seed: int) -> dict:
+    return _write(generate_animal_batch(batch, counts, seed))
+
+
+def generate(db_name: str, scale: float, seed: int = 42, workers: int = os.cpu_count() or 1,
+             uri: str = MONGO_URI, progress=print) -> dict:
+    """Replace the six collections in db_name with generated data
+
+    Returns the number of documents written per collection. With workers=1
+    everything runs in this process, which is handy for small test fixtures.
+    The reference indexes are built once the data is in.
+    """
+    counts = plan(scale)
+    client = MongoClient(uri)
+    for collection in COLLECTIONS:
+        client[db_name][collection].delete_many({})
+    client.close()
+
+    tasks = []
+    for collection in ('adopters', 'volunteers'):
+        for start in range(0, counts[collection], BATCH_SIZE):
+            tasks.append((_write_people, collection, start, min(start + BATCH_SIZE, counts[collection]), seed))
+    for batch in range((counts['animals'] + BATCH_SIZE - 1) // BATCH_SIZE):
+        tasks.append((_write_animal_batch, batch, counts, seed))
+
+    written = {collection: 0 for collection in COLLECTIONS}
+    started = time.perf_counter()
+
+    def record(result):
+        for collection, count in result.items():
+            written[collection] += count
+        if progress:
+            elapsed = time.perf_counter() - started
+            total = sum(written.values())
+            progress(f"   {written['animals']}/{counts['animals']} animals, "
+                     f"{total} documents ({total / elapsed:,.0f} docs/s)")
+
+    if workers <= 1:
+        _init_worker(uri, db_name)
+        for task, *args in tasks:
+            record(task(*args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(uri, db_name)) as pool:
+            futures = [pool.submit(task, *args) for task, *args in tasks]
+            for future in futures:
+                record(future.result())
+
+    # Built after the bulk load rather than maintained on every insert
+    client = MongoClient(uri)
+    try:
+        ensure_indexes(client[db_name])
+    finally:
+        client.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill a database with deterministic synthetic shelter data")
+    parser.add_argument("--scale", type=float, default=1, help=f"Scale factor ({ANIMALS_PER_SCALE} animals per unit)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; same seed and scale give the same data")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel insert processes")
+    parser.add_argument("--db", default=DB_NAME, help="Database to replace the collections in")
+    args = parser.parse_args()
+
+    print(f"🌱 Generating scale {args.scale:g} into {args.db} with {args.workers} workers...")
+    started = time.perf_counter()
+    try:
+        written = generate(args.db, args.scale, seed=args.seed, workers=args.workers)
+    except Exception as e:
+        print(f"❌ Generation failed: {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - started
+
+    print("\n" + "=" * 50)
+    for collection in COLLECTIONS:
+        print(f"   {collection:22} {written[collection]:>12,}")
+    total = sum(written.values())
+    print(f"\n✅ {total:,} documents in {elapsed:.1f}s ({total / elapsed:,.0f} docs/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Import Data
+Load animals, adopters, medical records, volunteers or volunteer activities
+from a CSV/Excel file
+
+Usage:
+    python utils/import_data.py animals intake.csv
+    python utils/import_data.py medical_records vet_visits.xlsx --dry-run
+"""
+
+from pymongo import MongoClient
+import argparse
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.config import MONGO_URI, DB_NAME, IMPORT_BATCH_SIZE
+from backend.importer import IMPORT_TARGETS, iter_rows, run_import
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a CSV/Excel file into the shelter database")
+    parser.add_argument("target", choices=list(IMPORT_TARGETS), help="Collection to import into")
+    parser.add_argument("file", help="Path to a .csv or .xlsx file with a header row")
+    parser.add_argument("--dry-run", action="store_true", help="Validate rows without writing")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="Rows per batch")
+    args = parser.parse_args()
+
+    try:
+        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+        db = client[DB_NAME]
+        db.command('ping')
+        print("✅ Connected to MongoDB")
+    except Exception as e:
+        print(f"❌ Connection error: {e}")
+        sys.exit(1)
+
+    mode = " (dry run)" if args.dry_run else ""
+    print(f"\n📥 Importing {args.file} into {args.target}{mode}...")
+
+    try:
+        with open(args.file, 'rb') as stream:
+            summary = None
+            for summary in run_import(db, iter_rows(stream, args.file), args.target,
+                                      dry_run=args.dry_run, batch_size=args.batch_size):
+                if not summary['done']:
+                    print(f"   {summary['rows']} rows, {summary['inserted']} ok, "
+                          f"{summary['failed']} failed ({summary['rows_per_second']} rows/s)")
+    except (OSError, ValueError) as e:
+        print(f"❌ Import failed: {e}")
+        sys.exit(1)
+    finally:
+        client.close()
+
+    verb = "validated" if args.dry_run else "inserted"
+    print(f"\n✅ {summary['rows']} rows read, {summary['inserted']} {verb}, {summary['failed']} failed "
+          f"in {summary['elapsed_ms'] / 1000:.1f}s")
+    for error in summary['errors']:
+        print(f"   Row {error['row']}: {error['error']}")
+    if summary['errors_truncated']:
+        print(f"   ... only the first {len(summary['errors'])} errors are shown")
+
+
+if __name__ == "__main__":
+    main()
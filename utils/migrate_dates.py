@@ -0,0 +1,132 @@
+"""
+Migrate Dates
+Convert YYYY-MM-DD strings in intake_date, adoption_date, visit_date and
+activity_date to BSON dates, in batches, while the app keeps running
+
+Each update only applies if the field still holds the string that was read,
+so edits made during the migration are never overwritten. Values that are not
+valid dates are copied to the date_quarantine collection and removed from
+the document. Blank strings are removed. Running it again only touches values
+that are still strings. Finishes by indexing each date field.
+
+Usage:
+    python utils/migrate_dates.py --dry-run
+    python utils/migrate_dates.py --batch-size 500 --pause 0.1
+"""
+
+from pymongo import MongoClient, UpdateOne
+from datetime import datetime
+import argparse
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.config import MONGO_URI, DB_NAME
+from backend.dates import DATE_FIELDS, parse_date
+
+QUARANTINE_COLLECTION = 'date_quarantine'
+DEFAULT_BATCH_SIZE = 1000
+
+
+def migrate_field(db, collection: str, field: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                  dry_run: bool = False, pause: float = 0.0) -> dict:
+    """Convert the string values of one date field, batch by batch in _id order"""
+    stats = {'scanned': 0, 'converted': 0, 'cleared': 0, 'quarantined': 0, 'changed_meanwhile': 0}
+    last_id = None
+
+    while True:
+        query = {field: {'$type': 'string'}}
+        if last_id is not None:
+            query['_id'] = {'$gt': last_id}
+        batch = list(db[collection].find(query, {field: 1}).sort('_id', 1).limit(batch_size))
+        if not batch:
+            break
+        last_id = batch[-1]['_id']
+
+        updates, quarantined = [], []
+        for doc in batch:
+            value = doc[field]
+            # Only touch the document if nobody changed the field since we read it
+            unchanged = {'_id': doc['_id'], field: value}
+            try:
+                parsed = parse_date(value)
+            except ValueError as e:
+                quarantined.append({
+                    'collection': collection,
+                    'document_id': doc['_id'],
+                    'field': field,
+                    'value': value,
+                    'error': str(e),
+                    'quarantined_at': datetime.utcnow(),
+                })
+                updates.append(UpdateOne(unchanged, {'$unset': {field: ''}}))
+                continue
+            if parsed is None:
+                stats['cleared'] += 1
+                updates.append(UpdateOne(unchanged, {'$unset': {field: ''}}))
+            else:
+                stats['converted'] += 1
+                updates.append(UpdateOne(unchanged, {'$set': {field: parsed}}))
+
+        stats['scanned'] += len(batch)
+        stats['quarantined'] += len(quarantined)
+        if not dry_run:
+            if quarantined:
+                db[QUARANTINE_COLLECTION].insert_many(quarantined)
+            result = db[collection].bulk_write(updates, ordered=False)
+            stats['changed_meanwhile'] += len(updates) - result.modified_count
+        if pause:
+            # Leave room for application traffic between batches
+            time.sleep(pause)
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert date strings to BSON dates")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Documents per bulk write")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    parser.add_argument("--collections", nargs='+', choices=list(DATE_FIELDS), default=list(DATE_FIELDS),
+                        help="Collections to migrate (default: all)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--db", default=DB_NAME, help="Database to migrate")
+    args = parser.parse_args()
+
+    try:
+        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+        db = client[args.db]
+        db.command('ping')
+        print("✅ Connected to MongoDB")
+    except Exception as e:
+        print(f"❌ Connection error: {e}")
+        sys.exit(1)
+
+    mode = " (dry run)" if args.dry_run else ""
+    quarantined = 0
+    try:
+        for collection in args.collections:
+            field = DATE_FIELDS[collection]
+            print(f"\n📅 {collection}.{field}{mode}...")
+            started = time.perf_counter()
+            stats = migrate_field(db, collection, field, batch_size=args.batch_size,
+                                  dry_run=args.dry_run, pause=args.pause)
+            elapsed = time.perf_counter() - started
+            quarantined += stats['quarantined']
+            print(f"   {stats['scanned']} strings: {stats['converted']} converted, {stats['cleared']} blank removed, "
+                  f"{stats['quarantined']} quarantined in {elapsed:.1f}s")
+            if stats['changed_meanwhile']:
+                print(f"   {stats['changed_meanwhile']} skipped because they were edited during the migration, "
+                      f"run again to pick them up")
+            if not args.dry_run:
+                # Range queries and monthly grouping on the date field
+                db[collection].create_index(field)
+    finally:
+        client.close()
+
+    print(f"\n✅ Done{mode}")
+    if quarantined:
+        print(f"⚠️  {quarantined} invalid values are in {QUARANTINE_COLLECTION}; fix them there and set them again via the API")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Migrate References
+Convert animal_id, adopter_id, volunteer_id and assigned_volunteers from id
+strings to ObjectIds, in batches, while the app keeps running
+
+Each update only applies if the field still holds the value that was read,
+so edits made during the migration are never overwritten. Strings that are
+not valid ObjectIds are left as they are and reported. Running it again only
+touches values that are still strings. Finishes by indexing each single
+reference field.
+
+Usage:
+    python utils/migrate_references.py --dry-run
+    python utils/migrate_references.py --batch-size 500 --pause 0.1
+"""
+
+from pymongo import MongoClient, UpdateOne
+from bson import ObjectId
+import argparse
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.config import MONGO_URI, DB_NAME
+from backend.references import REFERENCE_FIELDS, ID_LIST_FIELD_NAMES
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_INVALID = 20
+
+
+def convert(value):
+    """Id string -> ObjectId, None when it isn't a valid ObjectId"""
+    return ObjectId(value) if ObjectId.is_valid(value) else None
+
+
+def migrate_field(db, collection: str, field: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                  dry_run: bool = False, pause: float = 0.0) -> dict:
+    """Convert the string values of one reference field, batch by batch in _id order"""
+    stats = {'scanned': 0, 'converted': 0, 'invalid': 0, 'changed_meanwhile': 0, 'invalid_ids': []}
+    is_list = field in ID_LIST_FIELD_NAMES
+    last_id = None
+
+    while True:
+        # For arrays this matches documents with at least one string element
+        query = {field: {'$type': 'string'}}
+        if last_id is not None:
+            query['_id'] = {'$gt': last_id}
+        batch = list(db[collection].find(query, {field: 1}).sort('_id', 1).limit(batch_size))
+        if not batch:
+            break
+        last_id = batch[-1]['_id']
+
+        updates = []
+        for doc in batch:
+            value = doc[field]
+            if is_list:
+                converted = [convert(v) if isinstance(v, str) else v for v in value]
+                # Keep invalid elements as they were rather than dropping an assignment
+                new_value = [c if c is not None else v for c, v in zip(converted, value)]
+                valid = None not in converted
+            else:
+                new_value = convert(value)
+                valid = new_value is not None
+            if not valid:
+                stats['invalid'] += 1
+                if len(stats['invalid_ids']) < MAX_REPORTED_INVALID:
+                    stats['invalid_ids'].append(str(doc['_id']))
+                if not is_list:
+                    continue
+            stats['converted'] += 1
+            # Only touch the document if nobody changed the field since we read it
+            updates.append(UpdateOne({'_id': doc['_id'], field: value}, {'$set': {field: new_value}}))
+
+        stats['scanned'] += len(batch)
+        if updates and not dry_run:
+            result = db[collection].bulk_write(updates, ordered=False)
+            stats['changed_meanwhile'] += len(updates) - result.modified_count
+        if pause:
+            # Leave room for application traffic between batches
+            time.sleep(pause)
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert id string references to ObjectIds")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Documents per bulk write")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    parser.add_argument("--collections", nargs='+', choices=list(REFERENCE_FIELDS), default=list(REFERENCE_FIELDS),
+                        help="Collections to migrate (default: all)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--db", default=DB_NAME, help="Database to migrate")
+    args = parser.parse_args()
+
+    try:
+        client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+        db = client[args.db]
+        db.command('ping')
+        print("✅ Connected to MongoDB")
+    except Exception as e:
+        print(f"❌ Connection error: {e}")
+        sys.exit(1)
+
+    mode = " (dry run)" if args.dry_run else ""
+    try:
+        for collection in args.collections:
+            for field in REFERENCE_FIELDS[collection]:
+                print(f"\n🔗 {collection}.{field}{mode}...")
+                started = time.perf_counter()
+                stats = migrate_field(db, collection, field, batch_size=args.batch_size,
+                                      dry_run=args.dry_run, pause=args.pause)
+                elapsed = time.perf_counter() - started
+                print(f"   {stats['scanned']} documents with string ids: {stats['converted']} converted "
+                      f"in {elapsed:.1f}s")
+                if stats['invalid']:
+                    print(f"   ⚠️  {stats['invalid']} hold strings that are not ObjectIds and were left as is: "
+                          f"{', '.join(stats['invalid_ids'])}")
+                if stats['changed_meanwhile']:
+                    print(f"   {stats['changed_meanwhile']} skipped because they were edited during the migration, "
+                          f"run again to pick them up")
+                if not args.dry_run and field not in ID_LIST_FIELD_NAMES:
+                    # $in batch loads and $lookup joins on the reference
+                    db[collection].create_index(field)
+    finally:
+        client.close()
+
+    print(f"\n✅ Done{mode}")
+
+
+if __name__ == "__main__":
+    main()